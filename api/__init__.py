@@ -0,0 +1 @@
+"""Stock quote and news API. See README.md for how to run it."""
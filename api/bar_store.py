@@ -0,0 +1,172 @@
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# One OHLCV bar. Timestamps are UTC epoch seconds of the bar open.
+BAR_DTYPE = np.dtype([
+    ("ts", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+
+
+def frame_to_bars(hist: pd.DataFrame) -> np.ndarray:
+    """Convert a yfinance history frame into a sorted array of BAR_DTYPE records."""
+    if hist is None or hist.empty:
+        return np.empty(0, BAR_DTYPE)
+    index = pd.DatetimeIndex(hist.index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    bars = np.empty(len(hist), BAR_DTYPE)
+    bars["ts"] = index.values.astype("datetime64[s]").astype("int64")
+    for column in ("open", "high", "low", "close", "volume"):
+        bars[column] = hist[column.capitalize()].to_numpy(dtype="float64")
+    bars = bars[np.argsort(bars["ts"], kind="stable")]
+    # Keep the last row for any repeated timestamp
+    keep = np.append(bars["ts"][1:] != bars["ts"][:-1], True)
+    return bars[keep]
+
+
+class BarSeries:
+    """
+    Bars of one symbol at one interval.
+
+    The most recent `capacity` bars live in an in-memory ring buffer. Every bar
+    is also appended to a flat file of BAR_DTYPE records which is memory-mapped
+    on startup, so the series survives restarts and windows longer than the
+    ring can still be served without going upstream.
+    """
+
+    def __init__(self, path: Path, capacity: int = 4096):
+        self.path = path
+        self.capacity = capacity
+        self.version = 0
+        self._ring = np.zeros(capacity, BAR_DTYPE)
+        self._start = 0  # ring index of the oldest bar held in memory
+        self._count = 0  # bars held in memory
+        self._total = 0  # bars on disk
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        size = self.path.stat().st_size
+        if size % BAR_DTYPE.itemsize:
+            # A crash mid-append left a partial record behind
+            with open(self.path, "r+b") as f:
+                f.truncate(size - size % BAR_DTYPE.itemsize)
+        disk = self._disk()
+        if disk is None:
+            return
+        self._total = len(disk)
+        tail = np.array(disk[-self.capacity:])
+        self._ring[:len(tail)] = tail
+        self._count = len(tail)
+
+    def _disk(self) -> Optional[np.memmap]:
+        if not self.path.exists() or self.path.stat().st_size < BAR_DTYPE.itemsize:
+            return None
+        return np.memmap(self.path, dtype=BAR_DTYPE, mode="r")
+
+    def __len__(self) -> int:
+        return self._total
+
+    @property
+    def last_ts(self) -> Optional[int]:
+        if not self._count:
+            return None
+        return int(self._ring[(self._start + self._count - 1) % self.capacity]["ts"])
+
+    def append(self, bars: np.ndarray) -> int:
+        """
+        Add bars newer than the last stored one and return how many were added.
+
+        A bar with the same timestamp as the last stored bar replaces it, which
+        is how the still-forming bar picks up its latest close and volume.
+        """
+        with self._lock:
+            last = self.last_ts
+            changed = False
+            if last is not None and len(bars):
+                bars = bars[bars["ts"] >= last]
+                if len(bars) and bars[0]["ts"] == last:
+                    if bars[0] != self._ring[(self._start + self._count - 1) % self.capacity]:
+                        self._replace_last(bars[0])
+                        changed = True
+                    bars = bars[1:]
+            if len(bars):
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "ab") as f:
+                    f.write(bars.tobytes())
+                self._total += len(bars)
+                self._push(bars)
+                changed = True
+            if changed:
+                self.version += 1
+            return len(bars)
+
+    def _replace_last(self, bar: np.void) -> None:
+        self._ring[(self._start + self._count - 1) % self.capacity] = bar
+        disk = np.memmap(self.path, dtype=BAR_DTYPE, mode="r+")
+        disk[-1] = bar
+        disk.flush()
+        del disk
+
+    def _push(self, bars: np.ndarray) -> None:
+        bars = bars[-self.capacity:]
+        end = (self._start + self._count) % self.capacity
+        idx = (end + np.arange(len(bars))) % self.capacity
+        self._ring[idx] = bars
+        overflow = max(0, self._count + len(bars) - self.capacity)
+        self._start = (self._start + overflow) % self.capacity
+        self._count = min(self.capacity, self._count + len(bars))
+
+    def window(self, n: int) -> np.ndarray:
+        """The last n bars, oldest first."""
+        with self._lock:
+            n = max(0, min(n, self._total))
+            if n <= self._count:
+                idx = (self._start + self._count - n + np.arange(n)) % self.capacity
+                return self._ring[idx]
+            return np.array(self._disk()[-n:])
+
+    def since(self, ts: int) -> np.ndarray:
+        """All bars with a timestamp at or after ts, oldest first."""
+        with self._lock:
+            recent = self._ring[(self._start + np.arange(self._count)) % self.capacity]
+            if self._count and (recent["ts"][0] <= ts or self._count == self._total):
+                return recent[recent["ts"] >= ts]
+            disk = self._disk()
+            if disk is None:
+                return np.empty(0, BAR_DTYPE)
+            start = np.searchsorted(disk["ts"], ts, side="left")
+            return np.array(disk[start:])
+
+
+class BarStore:
+    """Per-symbol, per-interval bar series kept under one directory."""
+
+    def __init__(self, root: Path, capacity: int = 4096):
+        self.root = Path(root)
+        self.capacity = capacity
+        self._series: Dict[Tuple[str, str], BarSeries] = {}
+        self._lock = threading.Lock()
+
+    def series(self, symbol: str, interval: str = "5m") -> BarSeries:
+        key = (symbol.upper(), interval)
+        with self._lock:
+            if key not in self._series:
+                name = re.sub(r"[^A-Za-z0-9._-]", "_", key[0])
+                self._series[key] = BarSeries(self.root / interval / f"{name}.bars", self.capacity)
+            return self._series[key]
+
+    def window(self, symbol: str, n: int, interval: str = "5m") -> np.ndarray:
+        return self.series(symbol, interval).window(n)
@@ -0,0 +1,137 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Flight:
+    """An upstream fetch in progress that other callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class TTLCache:
+    """
+    Thread-safe in-process cache keyed by (key, field).
+
+    Every field has its own time-to-live, so a symbol's quote info can expire
+    faster than its intraday bars. The number of keys is bounded and the least
+    recently used key is evicted with all of its fields. Concurrent misses for
+    the same (key, field) are coalesced: one caller runs the loader and the
+    others wait for its result instead of hitting the upstream again.
+    """
+
+    def __init__(self, ttls: Dict[str, float], default_ttl: float = 60.0, maxsize: int = 512):
+        self.ttls = dict(ttls)
+        self.default_ttl = default_ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Dict[str, tuple]]" = OrderedDict()
+        self._flights: Dict[tuple, _Flight] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "coalesced": 0, "evictions": 0, "errors": 0}
+
+    def ttl_for(self, field: str) -> float:
+        return self.ttls.get(field, self.default_ttl)
+
+    def get(self, key: Hashable, field: str, loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for (key, field), calling loader() on a miss.
+
+        A stale entry is refreshed like a miss, but if the refresh fails the
+        stale value is served rather than propagating the upstream error.
+        """
+        now = time.monotonic()
+        with self._lock:
+            fields = self._entries.get(key)
+            cached = fields.get(field) if fields else None
+            if cached is not None:
+                self._entries.move_to_end(key)
+                if now - cached[1] < self.ttl_for(field):
+                    self.stats["hits"] += 1
+                    return cached[0]
+                self.stats["stale"] += 1
+            else:
+                self.stats["misses"] += 1
+            flight, leader = self._join(key, field)
+
+        if leader:
+            self._run(key, field, flight, loader)
+        else:
+            flight.done.wait()
+
+        if flight.error is not None:
+            if cached is not None:
+                return cached[0]
+            raise flight.error
+        return flight.value
+
+    def _join(self, key: Hashable, field: str):
+        """The flight loading (key, field) and whether the caller has to run it. Call with the lock held."""
+        flight = self._flights.get((key, field))
+        if flight is not None:
+            self.stats["coalesced"] += 1
+            return flight, False
+        flight = self._flights[(key, field)] = _Flight()
+        return flight, True
+
+    def _run(self, key: Hashable, field: str, flight: _Flight, loader: Callable[[], Any]) -> None:
+        try:
+            flight.value = loader()
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self.stats["errors"] += 1
+        else:
+            self.put(key, field, flight.value)
+        finally:
+            with self._lock:
+                self._flights.pop((key, field), None)
+            flight.done.set()
+
+    def refresh(self, key: Hashable, field: str, loader: Callable[[], Any]) -> Any:
+        """
+        Reload (key, field) now regardless of its age, for background refreshers.
+
+        A load already in flight for (key, field), e.g. from a concurrent get(),
+        is joined instead of fetching again. If the load fails the cached value
+        stays in place and the error propagates.
+        """
+        with self._lock:
+            flight, leader = self._join(key, field)
+        if leader:
+            self._run(key, field, flight, loader)
+        else:
+            flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def put(self, key: Hashable, field: str, value: Any) -> None:
+        with self._lock:
+            fields = self._entries.setdefault(key, {})
+            fields[field] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def invalidate(self, key: Hashable, field: Optional[str] = None) -> None:
+        with self._lock:
+            if field is None:
+                self._entries.pop(key, None)
+            elif key in self._entries:
+                self._entries[key].pop(field, None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters plus current size, suitable for a JSON response."""
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"] + self.stats["stale"]
+            return {
+                **self.stats,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,98 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .metrics import REGISTRY
+
+# Quote fields a delta response repeats when they change
+SCALAR_FIELDS = ("name", "price", "change")
+
+encode_seconds = REGISTRY.histogram("api_encode_seconds", "Time spent serializing response payloads")
+encoded_bytes = REGISTRY.counter("api_encoded_bytes_total", "Bytes of serialized response payloads")
+
+
+def encode(payload: Any) -> Tuple[bytes, str]:
+    """Serialize payload once and derive a strong ETag from the bytes."""
+    with encode_seconds.time():
+        body = json.dumps(payload, separators=(",", ":")).encode()
+    encoded_bytes.inc(len(body))
+    return body, hashlib.blake2b(body, digest_size=12).hexdigest()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/").strip('"') == etag for tag in candidates)
+
+
+class SnapshotLog:
+    """
+    The per-symbol state behind recently served versions.
+
+    Delta requests name the version the client already has; the log tells us
+    what that version contained so only the differences need to be sent. Old
+    versions are forgotten in LRU order and fall back to a full response.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._versions: "OrderedDict[str, Dict[str, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, version: str, quotes: List[Dict]) -> None:
+        state = {
+            q["symbol"]: {
+                **{f: q.get(f) for f in SCALAR_FIELDS + ("lastBarTime",)},
+                "lastClose": q["chartData"][-1] if q.get("chartData") else None,
+            }
+            for q in quotes
+        }
+        with self._lock:
+            self._versions[version] = state
+            self._versions.move_to_end(version)
+            while len(self._versions) > self.maxsize:
+                self._versions.popitem(last=False)
+
+    def get(self, version: str) -> Optional[Dict[str, Dict]]:
+        with self._lock:
+            state = self._versions.get(version)
+            if state is not None:
+                self._versions.move_to_end(version)
+            return state
+
+
+def quote_delta(
+    previous: Dict[str, Dict],
+    quotes: List[Dict],
+    chart_tail: Callable[[str, int, int], List[float]],
+) -> Tuple[List[Dict], List[str]]:
+    """
+    Differences between a previously served state and the current quotes.
+
+    Returns (changes, removed). A symbol the client did not have is sent as a
+    full quote with chartData. A known symbol only carries its changed scalar
+    fields and, if bars moved on, a chartTail whose first point replaces the
+    client's last chart point and whose remaining points are appended.
+    """
+    changes = []
+    for quote in quotes:
+        symbol = quote["symbol"]
+        before = previous.get(symbol)
+        if before is None:
+            changes.append(quote)
+            continue
+        change = {f: quote[f] for f in SCALAR_FIELDS if quote.get(f) != before.get(f)}
+        last, now = before.get("lastBarTime"), quote.get("lastBarTime")
+        last_close = quote["chartData"][-1] if quote.get("chartData") else None
+        if last is None and now is not None:
+            change["chartData"] = quote["chartData"]
+        elif now is not None and (now != last or last_close != before.get("lastClose")):
+            change["chartTail"] = chart_tail(symbol, last, now)
+        if change:
+            changes.append({"symbol": symbol, **change})
+    current = {q["symbol"] for q in quotes}
+    removed = [symbol for symbol in previous if symbol not in current]
+    return changes, removed
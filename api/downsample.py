@@ -0,0 +1,60 @@
+import numpy as np
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Returns the indices of at most n_out points that preserve the visual shape
+    of the series. The first and last points are always kept and every bucket
+    in between contributes the point forming the largest triangle with the
+    previously selected point and the average of the next bucket.
+    """
+    n = len(x)
+    if n_out >= n or n <= 2:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])[:max(n_out, 0)]
+
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    # n_out - 2 buckets covering every point except the first and the last
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    # The "next bucket" averages do not depend on the selection, so compute them up front
+    next_lo = np.append(edges[1:-1], n - 1)
+    next_hi = np.append(edges[2:], n)
+    csx = np.concatenate(([0.0], np.cumsum(x)))
+    csy = np.concatenate(([0.0], np.cumsum(y)))
+    avg_x = (csx[next_hi] - csx[next_lo]) / (next_hi - next_lo)
+    avg_y = (csy[next_hi] - csy[next_lo]) / (next_hi - next_lo)
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - avg_x[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Min/max bucketing: keep the lowest and highest point of n_out // 2 buckets.
+
+    Cheaper than LTTB and fully vectorized, and it never hides a spike.
+    """
+    n = len(y)
+    buckets = n_out // 2
+    if n_out >= n or buckets < 1:
+        return np.arange(n)
+    edges = np.linspace(0, n, buckets + 1).astype(int)
+    bucket = np.repeat(np.arange(buckets), np.diff(edges))
+    # Sorting by (bucket, y) leaves every bucket in place, ordered by value
+    order = np.lexsort((np.asarray(y), bucket))
+    picked = np.concatenate((order[edges[:-1]], order[edges[1:] - 1]))
+    return np.unique(picked)
+
+
+METHODS = {"lttb": lttb, "minmax": minmax}
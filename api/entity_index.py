@@ -0,0 +1,236 @@
+import heapq
+import json
+import math
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# The companies download_data/dl.py downloads news for, shared with it as data
+COMPANIES_FILE = Path(__file__).resolve().parent.parent / "download_data" / "companies.json"
+
+# Names a ticker goes by beyond the company names dl.py searches for
+EXTRA_ALIASES = {
+    "AAPL": ["Apple"],
+    "MSFT": ["Microsoft"],
+    "GOOGL": ["Google", "Alphabet"],
+    "GOOG": ["Google", "Alphabet"],
+    "AMZN": ["Amazon"],
+    "NVDA": ["Nvidia"],
+    "META": ["Meta Platforms", "Facebook"],
+    "TSLA": ["Tesla"],
+    "JPM": ["JPMorgan", "JP Morgan", "JPMorgan Chase"],
+    "BAC": ["Bank of America", "BofA"],
+    "WMT": ["Walmart"],
+    "LLY": ["Eli Lilly"],
+    "PG": ["Procter & Gamble", "P&G"],
+    "AMAT": ["Applied Materials"],
+    "PANW": ["Palo Alto Networks"],
+    "SMCI": ["Super Micro Computer", "Super Micro"],
+    "MSTR": ["MicroStrategy"],
+    "HIMS": ["Hims & Hers"],
+    "UNH": ["UnitedHealth Group"],
+    "XOM": ["ExxonMobil", "Exxon Mobil"],
+    "AVGO": ["Broadcom"],
+    "AMD": ["Advanced Micro Devices"],
+}
+
+# Tickers that are also everyday words, matched only in ticker context
+AMBIGUOUS_TICKERS = {"APP", "HOOD", "ALL", "NOW", "ON", "IT", "AI", "CAT"}
+
+TICKER_CONTEXT = re.compile(
+    r"\$([A-Z]{1,5})\b"
+    r"|\(([A-Z]{1,5})\)"
+    r"|\b(?:NYSE|NASDAQ|Nasdaq|NYSEARCA|AMEX)\s*:\s*([A-Z]{1,5})\b"
+)
+WORD = re.compile(r"\w+")
+
+# Left out of BM25 terms: they match nearly every article and only add noise
+STOPWORDS = frozenset("""
+a about after all also an and are as at be been but by can could did do does for from had has have how
+in into is it its may more new not of on or our over said say says than that the their them then there
+these they this to up was we were what when which who will with would you
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    return [token.lower() for token in WORD.findall(text or "")]
+
+
+def terms(text: str) -> List[str]:
+    """tokenize(text) without STOPWORDS, for BM25."""
+    return [token for token in tokenize(text) if token not in STOPWORDS]
+
+
+def load_company_tickers(path: Path = COMPANIES_FILE) -> Dict[str, str]:
+    """Company name -> ticker from download_data/companies.json, or {} if it is missing."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return dict(json.load(f))
+    except FileNotFoundError:
+        return {}
+
+
+def build_entities(tickers: Iterable[str] = ()) -> Dict[str, Set[str]]:
+    """
+    ticker -> names it is mentioned by.
+
+    Covers every company dl.py downloads, the given tickers, and the
+    EXTRA_ALIASES of both. CamelCase company names such as "PaloAlto" are
+    also matched as separate words.
+    """
+    entities: Dict[str, Set[str]] = {}
+    for company, ticker in load_company_tickers().items():
+        names = entities.setdefault(ticker, set())
+        names.add(company)
+        names.add(re.sub(r"(?<=[a-z])(?=[A-Z])", " ", company))
+    for ticker in tickers:
+        entities.setdefault(ticker.upper(), set())
+    for ticker, names in entities.items():
+        names.update(EXTRA_ALIASES.get(ticker, []))
+    return entities
+
+
+class EntityMatcher:
+    """
+    Finds the tickers a text mentions.
+
+    Company names match as whole-word phrases; a one-word name must be
+    capitalised ("Apple", not "apple"). Tickers match as cashtags ($NVDA), in
+    parentheses ((V)) or after an exchange prefix (NYSE: V). Bare uppercase
+    tickers of three or more letters also count unless they are everyday
+    words. With strict=False, used for typed queries, case is ignored.
+    """
+
+    def __init__(self, entities: Dict[str, Iterable[str]]):
+        self.tickers = set(entities)
+        self._bare = {t for t in self.tickers if len(t) >= 3 and t not in AMBIGUOUS_TICKERS}
+        self._phrases: Dict[str, List[Tuple[Tuple[str, ...], str]]] = {}
+        for ticker, names in entities.items():
+            for name in names:
+                phrase = tuple(tokenize(name))
+                if phrase:
+                    self._phrases.setdefault(phrase[0], []).append((phrase, ticker))
+
+    def find(self, text: str, strict: bool = True) -> Set[str]:
+        text = text or ""
+        found = set()
+        for match in TICKER_CONTEXT.finditer(text):
+            ticker = next(group for group in match.groups() if group)
+            if ticker in self.tickers:
+                found.add(ticker)
+        words = WORD.findall(text)
+        lowered = [word.lower() for word in words]
+        for i, word in enumerate(words):
+            if (word if strict else word.upper()) in self._bare:
+                found.add(word.upper())
+            for phrase, ticker in self._phrases.get(lowered[i], ()):
+                if strict and len(phrase) == 1 and not word[:1].isupper():
+                    continue
+                if tuple(lowered[i:i + len(phrase)]) == phrase:
+                    found.add(ticker)
+        return found
+
+
+class EntityIndex:
+    """
+    Inverted index of documents by term and by mentioned ticker.
+
+    Terms carry BM25 statistics for lexical ranking; entity postings answer
+    "which documents mention X" in O(postings). Adding a document id again
+    replaces its previous entry.
+    """
+
+    def __init__(self, entities: Optional[Dict[str, Iterable[str]]] = None, k1: float = 1.2, b: float = 0.75):
+        self.matcher = EntityMatcher(entities if entities is not None else build_entities())
+        self.k1 = k1
+        self.b = b
+        self._terms: Dict[str, Dict[str, int]] = {}
+        self._doc_terms: Dict[str, Dict[str, int]] = {}
+        self._doc_len: Dict[str, int] = {}
+        self._total_len = 0
+        self._entities: Dict[str, Set[str]] = {}
+        self._doc_entities: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._doc_len)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._doc_len
+
+    def add(self, doc_id: str, text: str) -> Set[str]:
+        """Index a document and return the tickers it mentions."""
+        mentioned = self.matcher.find(text)
+        counts: Dict[str, int] = {}
+        for term in terms(text):
+            counts[term] = counts.get(term, 0) + 1
+        with self._lock:
+            self._remove(doc_id)
+            for term, tf in counts.items():
+                self._terms.setdefault(term, {})[doc_id] = tf
+            self._doc_terms[doc_id] = counts
+            self._doc_len[doc_id] = sum(counts.values())
+            self._total_len += self._doc_len[doc_id]
+            for ticker in mentioned:
+                self._entities.setdefault(ticker, set()).add(doc_id)
+            self._doc_entities[doc_id] = mentioned
+        return mentioned
+
+    def remove(self, doc_id: str) -> None:
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id: str) -> None:
+        for term in self._doc_terms.pop(doc_id, {}):
+            postings = self._terms[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._terms[term]
+        self._total_len -= self._doc_len.pop(doc_id, 0)
+        for ticker in self._doc_entities.pop(doc_id, set()):
+            self._entities[ticker].discard(doc_id)
+
+    def entities(self, doc_id: str) -> Set[str]:
+        """Tickers a document mentions."""
+        return set(self._doc_entities.get(doc_id, ()))
+
+    def postings(self, ticker: str) -> Set[str]:
+        """Ids of the documents that mention ticker."""
+        with self._lock:
+            return set(self._entities.get(ticker.upper(), ()))
+
+    def bm25(self, query: str, limit: int = 50, candidates: Optional[Set[str]] = None) -> List[Tuple[str, float]]:
+        """Top (doc_id, score) by BM25 for query, optionally only among candidates."""
+        with self._lock:
+            n = len(self._doc_len)
+            if not n:
+                return []
+            avg_len = self._total_len / n
+            scores: Dict[str, float] = {}
+            for term in set(terms(query)):
+                postings = self._terms.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    if candidates is not None and doc_id not in candidates:
+                        continue
+                    norm = tf + self.k1 * (1 - self.b + self.b * self._doc_len[doc_id] / avg_len)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+    def prefilter(self, query: str, limit: int = 200) -> Optional[Set[str]]:
+        """
+        Candidate ids for a query that names a company or ticker: the documents
+        mentioning it plus the top BM25 matches. None when the query names no
+        entity, since lexical overlap alone is too narrow a net for semantic search.
+        """
+        mentioned = self.matcher.find(query, strict=False)
+        if not mentioned:
+            return None
+        candidates = set()
+        for ticker in mentioned:
+            candidates |= self.postings(ticker)
+        candidates.update(doc_id for doc_id, _ in self.bm25(query, limit=limit))
+        return candidates
@@ -0,0 +1,90 @@
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+INDICATORS = ("sma", "ema", "vwap", "volatility", "rsi", "return")
+EXCHANGE_TZ = "America/New_York"
+BARS_PER_YEAR = {"5m": 78 * 252, "1h": 7 * 252, "1d": 252}
+
+
+def align(bars_by_symbol: Dict[str, np.ndarray]) -> Dict[str, pd.DataFrame]:
+    """
+    Stack per-symbol bar arrays into time x symbol frames, one per field.
+
+    Timestamps are the union over all symbols. Prices are carried forward over
+    a symbol's missing bars and missing volume counts as zero.
+    """
+    frames = {}
+    for field in ("open", "high", "low", "close", "volume"):
+        frame = pd.DataFrame({
+            symbol: pd.Series(bars[field], index=pd.to_datetime(bars["ts"], unit="s", utc=True))
+            for symbol, bars in bars_by_symbol.items()
+        }).sort_index()
+        frames[field] = frame.fillna(0.0) if field == "volume" else frame.ffill()
+    return frames
+
+
+def _latest_session(index: pd.DatetimeIndex) -> np.ndarray:
+    """Mask of rows that belong to the most recent exchange trading day."""
+    if not len(index):
+        return np.zeros(0, dtype=bool)
+    days = index.tz_convert(EXCHANGE_TZ).normalize()
+    return np.asarray(days == days[-1])
+
+
+def compute(
+    bars_by_symbol: Dict[str, np.ndarray],
+    indicators: Iterable[str],
+    window: int,
+    interval: str = "5m",
+) -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    Latest value of each requested indicator for every symbol.
+
+    All symbols are computed together on the aligned frames, so the cost is a
+    handful of vectorized column operations regardless of the symbol count.
+    Symbols without bars are left out.
+    """
+    bars_by_symbol = {symbol: bars for symbol, bars in bars_by_symbol.items() if len(bars)}
+    if not bars_by_symbol:
+        return {}
+    frames = align(bars_by_symbol)
+    close, volume = frames["close"], frames["volume"]
+    session = _latest_session(close.index)
+    latest = {}
+
+    for name in indicators:
+        if name == "sma":
+            latest[name] = close.rolling(window).mean().iloc[-1]
+        elif name == "ema":
+            latest[name] = close.ewm(span=window, adjust=False).mean().iloc[-1]
+        elif name == "vwap":
+            typical = (frames["high"] + frames["low"] + close) / 3
+            latest[name] = (typical * volume)[session].sum() / volume[session].sum().replace(0.0, np.nan)
+        elif name == "volatility":
+            log_returns = np.log(close).diff()
+            annualize = np.sqrt(BARS_PER_YEAR.get(interval, 252))
+            latest[name] = log_returns.rolling(window).std().iloc[-1] * annualize
+        elif name == "rsi":
+            delta = close.diff()
+            gain = delta.clip(lower=0).ewm(alpha=1 / window, adjust=False).mean()
+            loss = (-delta.clip(upper=0)).ewm(alpha=1 / window, adjust=False).mean()
+            latest[name] = (100 - 100 / (1 + gain / loss)).iloc[-1]
+        elif name == "return":
+            opening = frames["open"][session].bfill().iloc[0]
+            latest[name] = close.iloc[-1] / opening - 1
+        else:
+            raise ValueError(f"Unknown indicator: {name}")
+
+    table = pd.DataFrame(latest).replace([np.inf, -np.inf], np.nan)
+    table = table.astype(object).where(table.notna(), None)
+    return table.to_dict(orient="index")
+
+
+def parse_indicators(indicators: str) -> List[str]:
+    names = [name.strip().lower() for name in indicators.split(",") if name.strip()]
+    unknown = [name for name in names if name not in INDICATORS]
+    if unknown:
+        raise ValueError(f"Unknown indicators: {', '.join(unknown)}. Choose from {', '.join(INDICATORS)}")
+    return names
@@ -1,12 +1,116 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-import yfinance as yf
-import pandas as pd
-from typing import List, Dict
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import Response, StreamingResponse
+from typing import List, Dict, Optional
+
+from .bar_store import BarStore, frame_to_bars
+from .cache import TTLCache
+from .conditional import SnapshotLog, encode, etag_matches, quote_delta
+from .downsample import METHODS as DOWNSAMPLE_METHODS
+from . import indicators
+from .metrics import REGISTRY, SamplingProfiler, profile_threshold
+from .news_index import NewsIndex
+from .providers import market_data_from_env
+from .rate_limit import TokenBucket
+from .scheduler import RefreshPolicy, RefreshScheduler, realized_volatility
+from .streaming import QuoteHub
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
+# yfinance, or with MARKET_DATA=fake a deterministic offline stand-in for
+# benchmarks (latency and error rate from FAKE_LATENCY_MS / FAKE_ERROR_RATE)
+market_data = market_data_from_env()
+
+# Quote info changes on every tick while 5 minute bars only change every few
+# minutes, so they expire independently.
+quote_cache = TTLCache(ttls={"info": 15, "bars:5m": 60, "bars:1h": 600, "bars:1d": 3600}, maxsize=1024)
+
+# Intraday bars are kept locally and only the bars after the last stored one
+# are fetched on refresh.
+bar_store = BarStore(Path(os.getenv("BAR_STORE_DIR", Path(__file__).parent / "data" / "bars")))
+BACKFILL_PERIOD = {"5m": "1mo", "1h": "6mo", "1d": "5y"}
+# yfinance only serves intraday bars for a limited lookback
+MAX_LOOKBACK = {"5m": timedelta(days=59), "1h": timedelta(days=729), "1d": timedelta(days=365 * 50)}
+CHART_POINTS = 20
+
+# Chart ranges and the bar interval each one is drawn from
+HISTORY_RANGES = {
+    "1d": ("5m", timedelta(days=1)),
+    "1w": ("5m", timedelta(days=7)),
+    "1mo": ("1h", timedelta(days=31)),
+    "6mo": ("1h", timedelta(days=183)),
+    "1y": ("1d", timedelta(days=366)),
+    "5y": ("1d", timedelta(days=5 * 366)),
+}
+MAX_HISTORY_POINTS = 5000
+# Downsampled series only change when new bars arrive, so they are keyed by the
+# series version and never need to expire on their own.
+history_cache = TTLCache(ttls={}, default_ttl=24 * 3600, maxsize=2048)
+indicator_cache = TTLCache(ttls={}, default_ttl=24 * 3600, maxsize=512)
+
+class UpstreamPool(ThreadPoolExecutor):
+    """ThreadPoolExecutor that counts the calls still waiting for a thread."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._counts_lock = threading.Lock()
+        self._submitted = 0
+        self._dequeued = 0  # started, or cancelled before they started
+
+    def _dequeue(self) -> None:
+        with self._counts_lock:
+            self._dequeued += 1
+
+    def submit(self, fn, /, *args, **kwargs):
+        def run():
+            self._dequeue()
+            return fn(*args, **kwargs)
+
+        with self._counts_lock:
+            self._submitted += 1
+        try:
+            future = super().submit(run)
+        except RuntimeError:  # shut down
+            self._dequeue()
+            raise
+        future.add_done_callback(lambda f: f.cancelled() and self._dequeue())
+        return future
+
+    def waiting(self) -> int:
+        with self._counts_lock:
+            return self._submitted - self._dequeued
+
+# yfinance is blocking, so upstream calls run on a bounded pool instead of the
+# event loop. The pool size caps how many requests we have in flight upstream.
+upstream_pool = UpstreamPool(max_workers=16, thread_name_prefix="upstream")
+SYMBOL_TIMEOUT = 10.0  # seconds
+MAX_SYMBOLS = 50
+
+upstream_seconds = REGISTRY.histogram("api_upstream_seconds", "Latency of yfinance calls by call")
+upstream_errors = REGISTRY.counter("api_upstream_errors_total", "Failed yfinance calls by call")
+request_seconds = REGISTRY.histogram("api_request_seconds", "HTTP request latency by route, method and status")
+
+# Requests slower than PROFILE_SLOW_REQUESTS_MS leave folded stacks in
+# PROFILE_DIR, e.g. for flamegraph.pl. Off by default: every request is
+# sampled while it runs, which costs a thread per request.
+PROFILE_THRESHOLD = profile_threshold()
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", Path(__file__).parent / "data" / "profiles"))
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -14,46 +118,423 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
+# Multi-symbol payloads with chart data compress well
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+@app.middleware("http")
+async def record_request(request: Request, call_next):
+    profiler = SamplingProfiler().start() if PROFILE_THRESHOLD is not None else None
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - start
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        request_seconds.observe(elapsed, route=path, method=request.method, status=status)
+        if profiler is not None:
+            # stop() joins the sampling thread; keep that off the event loop
+            await asyncio.to_thread(profiler.stop)
+            if elapsed >= PROFILE_THRESHOLD:
+                name = f"{int(time.time() * 1000)}-{re.sub(r'[^A-Za-z0-9]+', '_', path).strip('_') or 'root'}.folded"
+                dumped = await asyncio.to_thread(profiler.dump, PROFILE_DIR / name)
+                logger.warning("Slow request %s %s took %.3fs, stacks in %s",
+                               request.method, request.url.path, elapsed, dumped)
+
+@contextmanager
+def upstream_call(call: str):
+    """Time a yfinance call and count its failures."""
+    try:
+        with upstream_seconds.time(call=call):
+            yield
+    except Exception:
+        upstream_errors.inc(call=call)
+        raise
+
+def load_info(symbol: str) -> Dict:
+    with upstream_call("info"):
+        return market_data.info(symbol)
+
+def fetch_info(symbol: str) -> Dict:
+    return quote_cache.get(symbol.upper(), "info", lambda: load_info(symbol))
+
+def sync_bars(symbol: str, interval: str = "5m") -> int:
+    """Fetch bars newer than the last stored one and return the series version."""
+    series = bar_store.series(symbol, interval)
+    last = series.last_ts
+    start = datetime.fromtimestamp(last, tz=timezone.utc) if last is not None else None
+    with upstream_call("history"):
+        if start is None or datetime.now(timezone.utc) - start > MAX_LOOKBACK[interval]:
+            hist = market_data.history(symbol, interval, period=BACKFILL_PERIOD[interval])
+        else:
+            hist = market_data.history(symbol, interval, start=start)
+    series.append(frame_to_bars(hist))
+    return series.version
+
+def fetch_bars(symbol: str, points: int, interval: str = "5m"):
+    quote_cache.get(symbol.upper(), f"bars:{interval}", lambda: sync_bars(symbol, interval))
+    return bar_store.window(symbol, points, interval)
+
+def build_quote(symbol: str, points: int = CHART_POINTS) -> Dict:
+    info = fetch_info(symbol)
+    bars = fetch_bars(symbol, points)
+    return {
+        "symbol": symbol,
+        "name": info.get("longName", "Unknown"),
+        "price": info.get("currentPrice", 0),
+        "change": info.get("regularMarketChangePercent", 0),
+        "chartData": bars["close"].tolist(),
+        "lastBarTime": int(bars["ts"][-1]) if len(bars) else None,
+    }
+
+def parse_symbols(symbols: str) -> List[str]:
+    """Split a comma separated symbol list, dropping blanks and duplicates; 400 above MAX_SYMBOLS."""
+    seen = []
+    for symbol in symbols.split(","):
+        symbol = symbol.strip().upper()
+        if symbol and symbol not in seen:
+            seen.append(symbol)
+    if len(seen) > MAX_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_SYMBOLS} symbols per request, got {len(seen)}")
+    return seen
+
+async def fetch_quote(symbol: str, points: int = CHART_POINTS) -> Dict:
+    """Run build_quote on the upstream pool with a per-symbol timeout."""
+    loop = asyncio.get_running_loop()
+    return await asyncio.wait_for(loop.run_in_executor(upstream_pool, build_quote, symbol, points), SYMBOL_TIMEOUT)
+
+async def fetch_quotes(symbols: List[str], points: int = CHART_POINTS):
+    """
+    Fetch quotes for all symbols concurrently.
+
+    Returns (results, failed) where results keeps the requested order and
+    failed lists the symbols that errored or timed out with the reason.
+    """
+    outcomes = await asyncio.gather(*(fetch_quote(s, points) for s in symbols), return_exceptions=True)
+    results, failed = [], []
+    for symbol, outcome in zip(symbols, outcomes):
+        if isinstance(outcome, asyncio.TimeoutError):
+            failed.append({"symbol": symbol, "error": f"timed out after {SYMBOL_TIMEOUT}s"})
+        elif isinstance(outcome, Exception):
+            failed.append({"symbol": symbol, "error": str(outcome)})
+        else:
+            results.append(outcome)
+    return results, failed
+
+# Versions of /api/stocks responses that delta requests can refer back to
+quote_snapshots = SnapshotLog()
+
+def versioned_response(body: bytes, etag: str, request: Request, not_modified: bool = False) -> Response:
+    """Send an encoded body with its ETag, or 304 if the client already has that version."""
+    headers = {"ETag": f'"{etag}"', "Cache-Control": "no-cache"}
+    if not_modified or etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def chart_tail(symbol: str, since_ts: int, until_ts: int) -> List[float]:
+    bars = bar_store.series(symbol).since(since_ts)
+    return bars["close"][bars["ts"] <= until_ts].tolist()
+
+def keep_warm(quotes: List[Dict]) -> None:
+    """
+    Have the scheduler refresh the symbols of quotes that came back with bars.
+    Failed and unknown symbols are not refreshed in the background.
+    """
+    refresh_scheduler.touch(quote["symbol"] for quote in quotes if quote.get("lastBarTime") is not None)
 
 @app.get("/api/stocks/{symbol}")
-async def get_stock_data(symbol: str):
+async def get_stock_data(symbol: str, request: Request, points: int = CHART_POINTS):
+    # Same normalization as parse_symbols, so both routes share cache entries
+    symbol = symbol.strip().upper()
     try:
-        stock = yf.Ticker(symbol)
-        info = stock.info
-        
-        # Get historical data for the chart
-        hist = stock.history(period="1d", interval="5m")
-        
+        quote = await fetch_quote(symbol, points)
+        keep_warm([quote])
+        body, etag = encode(quote)
+        return versioned_response(body, etag, request)
+    except asyncio.TimeoutError:
+        return {"error": f"timed out after {SYMBOL_TIMEOUT}s"}
+    except Exception as e:
+        return {"error": str(e)}
+
+@app.get("/api/stocks")
+async def get_multiple_stocks(
+    symbols: str,
+    request: Request,
+    points: int = CHART_POINTS,
+    since: Optional[str] = None,
+):
+    """
+    Quotes for several symbols.
+
+    The ETag of a response is its version. Sending it back in If-None-Match
+    returns 304 when nothing changed. Passing it as `since` returns only what
+    changed relative to that version (see conditional.quote_delta); unknown or
+    expired versions get a full response.
+    """
+    symbols_list = parse_symbols(symbols)
+    results, failed = await fetch_quotes(symbols_list, points)
+    keep_warm(results)
+    body, version = encode({"results": results, "failed": failed})
+    quote_snapshots.record(version, results)
+
+    since = since.strip('"') if since else None
+    previous = quote_snapshots.get(since) if since else None
+    if previous is None or since == version:
+        return versioned_response(body, version, request, not_modified=since == version)
+    changes, removed = await asyncio.get_running_loop().run_in_executor(
+        upstream_pool, quote_delta, previous, results, chart_tail
+    )
+    delta, _ = encode({"delta": True, "since": since, "changes": changes, "removed": removed, "failed": failed})
+    return versioned_response(delta, version, request)
+
+# News is served from an in-memory index over the store that stock_news.py fills
+news_index = NewsIndex(
+    store_path=Path(__file__).parent / "data" / "news.sqlite",
+    legacy_path=Path(__file__).parent / "stock_news.json",
+)
+
+@app.get("/api/news")
+def get_news(request: Request, tickers: str, limit: int = Query(3, ge=1, le=50)):
+    """The latest articles of several tickers, for the dashboard's front page."""
+    payload = {ticker: news_index.query(ticker, limit=limit)["items"] for ticker in parse_symbols(tickers)}
+    body, etag = encode(payload)
+    return versioned_response(body, etag, request)
+
+@app.get("/api/news/{ticker}")
+def get_ticker_news(
+    ticker: str,
+    request: Request,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+):
+    """A page of a ticker's articles, newest first; pass next_cursor back to get the next page."""
+    try:
+        page = news_index.query(ticker, since=since, until=until, cursor=cursor, limit=limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    body, etag = encode(page)
+    return versioned_response(body, etag, request)
+
+def build_history(symbol: str, range_: str, points: int, method: str) -> Dict:
+    interval, span = HISTORY_RANGES[range_]
+    version = quote_cache.get(symbol.upper(), f"bars:{interval}", lambda: sync_bars(symbol, interval))
+    series = bar_store.series(symbol, interval)
+
+    def downsample() -> Dict:
+        last = series.last_ts
+        bars = series.since(last - int(span.total_seconds())) if last is not None else series.window(0)
+        picked = DOWNSAMPLE_METHODS[method](bars["ts"], bars["close"], points)
         return {
             "symbol": symbol,
-            "name": info.get("longName", "Unknown"),
-            "price": info.get("currentPrice", 0),
-            "change": info.get("regularMarketChangePercent", 0),
-            "chartData": hist["Close"].tolist()[-20:],  # Last 20 points for the chart
+            "range": range_,
+            "interval": interval,
+            "method": method,
+            "timestamps": bars["ts"][picked].tolist(),
+            "closes": bars["close"][picked].tolist(),
         }
+
+    return history_cache.get((symbol.upper(), range_, points, method, version), "series", downsample)
+
+@app.get("/api/stocks/{symbol}/history")
+async def get_stock_history(
+    symbol: str,
+    range_: str = Query("1w", alias="range"),
+    points: int = Query(300, ge=2, le=MAX_HISTORY_POINTS),
+    method: str = "lttb",
+):
+    """
+    Close prices over a range, downsampled to at most `points` points.
+
+    Clients should ask for roughly as many points as the chart is wide in
+    pixels; the response size is independent of how many bars exist.
+    """
+    if range_ not in HISTORY_RANGES:
+        raise HTTPException(status_code=400, detail=f"range must be one of {', '.join(HISTORY_RANGES)}")
+    if method not in DOWNSAMPLE_METHODS:
+        raise HTTPException(status_code=400, detail=f"method must be one of {', '.join(DOWNSAMPLE_METHODS)}")
+    loop = asyncio.get_running_loop()
+    try:
+        return await asyncio.wait_for(
+            loop.run_in_executor(upstream_pool, build_history, symbol, range_, points, method), SYMBOL_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        return {"error": f"timed out after {SYMBOL_TIMEOUT}s"}
     except Exception as e:
         return {"error": str(e)}
 
-@app.get("/api/stocks")
-async def get_multiple_stocks(symbols: str):
-    symbols_list = symbols.split(",")
-    results = []
-    
-    for symbol in symbols_list:
+def sync_symbol_bars(symbol: str, interval: str = "5m") -> int:
+    """Refresh bars through the quote cache and return the series version."""
+    return quote_cache.get(symbol.upper(), f"bars:{interval}", lambda: sync_bars(symbol, interval))
+
+@app.get("/api/indicators")
+async def get_indicators(
+    symbols: str,
+    names: str = Query("sma,ema,vwap,volatility,rsi,return", alias="indicators"),
+    window: int = Query(20, ge=2, le=500),
+):
+    """
+    Latest indicator values for many symbols computed in one vectorized pass.
+
+    Results are memoized on the versions of the underlying bar series, so
+    repeated requests between bar updates are served from memory.
+    """
+    try:
+        requested = indicators.parse_indicators(names)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    symbols_list = parse_symbols(symbols)
+    loop = asyncio.get_running_loop()
+    outcomes = await asyncio.gather(
+        *(asyncio.wait_for(loop.run_in_executor(upstream_pool, sync_symbol_bars, s), SYMBOL_TIMEOUT) for s in symbols_list),
+        return_exceptions=True,
+    )
+    versions, failed = {}, []
+    for symbol, outcome in zip(symbols_list, outcomes):
+        if isinstance(outcome, asyncio.TimeoutError):
+            failed.append({"symbol": symbol, "error": f"timed out after {SYMBOL_TIMEOUT}s"})
+        elif isinstance(outcome, Exception):
+            failed.append({"symbol": symbol, "error": str(outcome)})
+        elif not len(bar_store.series(symbol)):
+            # Unknown tickers come back with an empty history
+            failed.append({"symbol": symbol, "error": "no bars"})
+        else:
+            versions[symbol] = outcome
+
+    # Enough bars for EMA/RSI warm-up and a full session for VWAP
+    lookback = max(5 * window, 2 * 78)
+    key = (tuple(sorted(versions.items())), tuple(requested), window)
+    values = indicator_cache.get(key, "latest", lambda: indicators.compute(
+        {s: bar_store.window(s, lookback) for s in versions}, requested, window
+    ))
+    return {"window": window, "indicators": requested, "results": values, "failed": failed}
+
+# One poller refreshes every symbol that any streaming client watches.
+quote_hub = QuoteHub(fetch_quotes, interval=15.0)
+STREAM_HEARTBEAT = 20.0  # seconds between keep-alive comments on idle streams
+
+# Background refresh keeps watched and recently requested symbols fresh under
+# one upstream budget; cold symbols are only fetched on demand. When enabled it
+# drives the quote hub instead of the hub's fixed-interval poller.
+REFRESH_SCHEDULER = os.getenv("REFRESH_SCHEDULER", "1") != "0"
+UPSTREAM_BUDGET_PER_MINUTE = int(os.getenv("UPSTREAM_BUDGET_PER_MINUTE", "120"))
+
+# Realized volatility of each refreshed symbol, computed on the upstream pool
+# right after its bars sync, so planning never reads bars on the event loop
+quote_volatility: Dict[str, Optional[float]] = {}
+
+def refresh_quote_data(symbol: str) -> None:
+    quote_cache.refresh(symbol, "info", lambda: load_info(symbol))
+    quote_cache.refresh(symbol, "bars:5m", lambda: sync_bars(symbol, "5m"))
+    quote_volatility[symbol] = realized_volatility(bar_store.window(symbol, 48))
+
+async def refresh_quote(symbol: str) -> None:
+    loop = asyncio.get_running_loop()
+    await asyncio.wait_for(loop.run_in_executor(upstream_pool, refresh_quote_data, symbol), SYMBOL_TIMEOUT)
+    if quote_hub.subscriber_count(symbol):
+        await quote_hub.publish([symbol])
+
+def news_velocity(symbol: str) -> int:
+    """Articles about symbol published in the last 24 hours, as of the last news index build."""
+    since = (datetime.now(timezone.utc) - timedelta(days=1)).strftime("%Y-%m-%d %H:%M:%S")
+    return news_index.count_since(symbol, since)
+
+def make_news_api():
+    """A StockNewsAPI for scheduled news refreshes, or None without API keys (or NEWS_PROVIDER=fake)."""
+    fake = os.getenv("NEWS_PROVIDER") == "fake"
+    if not fake and not (os.getenv("NEWSDATA_API_KEY") and os.getenv("GEMINI_API_KEY")):
+        return None
+    from .stock_news import StockNewsAPI
+    return StockNewsAPI(gemini_key=os.getenv("GEMINI_API_KEY"))
+
+refresh_scheduler = RefreshScheduler(
+    jobs={"quote": refresh_quote},
+    policy=RefreshPolicy(
+        subscribers=quote_hub.subscriber_count,
+        volatility=quote_volatility.get,
+        news_velocity=news_velocity,
+    ),
+    budget=TokenBucket.per_period(UPSTREAM_BUDGET_PER_MINUTE, 60),
+    costs={"quote": 2, "news": 1},
+    watched=quote_hub.symbols,
+    pinned_only={"news"},
+)
+
+@app.on_event("startup")
+async def start_quote_hub():
+    if not REFRESH_SCHEDULER:
+        quote_hub.start()
+        return
+    news_api = make_news_api()
+    if news_api is not None:
+        async def refresh_news(symbol: str) -> None:
+            await news_api.ingest([symbol])
+            # Rebuild off the event loop, so news_velocity sees the new articles
+            await asyncio.to_thread(news_index.refresh)
+
+        refresh_scheduler.jobs["news"] = refresh_news
+        refresh_scheduler.pin("news", news_api.stocks)
+    refresh_scheduler.start()
+
+@app.on_event("shutdown")
+async def stop_quote_hub():
+    await refresh_scheduler.stop()
+    await quote_hub.stop()
+
+@app.get("/api/stream/stocks")
+async def stream_stocks(symbols: str, request: Request):
+    """Server-sent events stream of quote updates for the given symbols."""
+    sub = quote_hub.subscribe(parse_symbols(symbols))
+    refresh_scheduler.wake()
+
+    async def events():
         try:
-            stock = yf.Ticker(symbol)
-            info = stock.info
-            hist = stock.history(period="1d", interval="5m")
-            
-            results.append({
-                "symbol": symbol,
-                "name": info.get("longName", "Unknown"),
-                "price": info.get("currentPrice", 0),
-                "change": info.get("regularMarketChangePercent", 0),
-                "chartData": hist["Close"].tolist()[-20:],
-            })
-        except:
-            continue
-            
-    return results
+            await quote_hub.prime(sub)
+            while not await request.is_disconnected():
+                quotes = await sub.next(timeout=STREAM_HEARTBEAT)
+                if quotes:
+                    yield f"event: quotes\ndata: {json.dumps(quotes)}\n\n"
+                else:
+                    yield ": keep-alive\n\n"
+        finally:
+            quote_hub.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+cache_events = REGISTRY.counter("api_cache_events_total", "Cache lookups and evictions by cache and event")
+cache_entries = REGISTRY.gauge("api_cache_entries", "Keys held per cache")
+upstream_queue = REGISTRY.gauge("api_upstream_queue", "Upstream calls waiting for a pool thread")
+
+@REGISTRY.collector
+def collect_cache_stats() -> None:
+    caches = {"quote": quote_cache, "history": history_cache, "indicator": indicator_cache}
+    for name, cache in caches.items():
+        snapshot = cache.snapshot()
+        for event in cache.stats:
+            cache_events.set(snapshot[event], cache=name, event=event)
+        cache_entries.set(snapshot["size"], cache=name)
+    upstream_queue.set(upstream_pool.waiting())
+
+@app.get("/metrics")
+def get_metrics():
+    """Latency histograms and counters in the Prometheus text format."""
+    return Response(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    return quote_cache.snapshot()
+
+@app.get("/api/scheduler")
+async def get_scheduler():
+    """Scheduled refresh jobs, when each runs next and the remaining upstream budget."""
+    return refresh_scheduler.snapshot()
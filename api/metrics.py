@@ -0,0 +1,270 @@
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter as Tally
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class Counter:
+    """A monotonically increasing count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set(self, value: float, **labels) -> None:
+        """Overwrite the count, for mirroring a counter that is kept elsewhere."""
+        with self._lock:
+            self._values[_labels(labels)] = value
+
+    def value(self, **labels) -> float:
+        return self._values.get(_labels(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(key)} {value:g}" for key, value in sorted(self._values.items())]
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            return {_format_labels(key) or "total": value for key, value in sorted(self._values.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(Counter):
+    """A value per label set that can go down as well as up."""
+
+    kind = "gauge"
+
+
+class Histogram:
+    """Observations per label set in cumulative buckets, plus their count and sum."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Labels, List[float]] = {}  # bucket counts..., +Inf count, sum
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the wall time of the with-block, including when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_format_labels(key, [('le', f'{bound:g}')])} {cumulative}")
+                cumulative += series[len(self.buckets)]
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', '+Inf')])} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {series[-1]:.6f}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+    def _quantile(self, series: List[float], q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile, like histogram_quantile without interpolation."""
+        total = sum(series[:-1])
+        seen = 0
+        for bound, count in zip(self.buckets, series):
+            seen += count
+            if seen >= q * total:
+                return bound
+        return float("inf")
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            result = {}
+            for key, series in sorted(self._series.items()):
+                count = sum(series[:-1])
+                result[_format_labels(key) or "total"] = {
+                    "count": count,
+                    "sum": round(series[-1], 6),
+                    "mean": round(series[-1] / count, 6) if count else 0.0,
+                    "p50": self._quantile(series, 0.5),
+                    "p95": self._quantile(series, 0.95),
+                }
+            return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class Registry:
+    """Named metrics, rendered together in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def collector(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Register callback to update metrics kept elsewhere right before each render."""
+        self._collectors.append(callback)
+        return callback
+
+    def _get(self, cls, name: str, help: str, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, **kwargs)
+            elif type(metric) is not cls:
+                raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._get(Counter, name, help)
+
+    def gauge(self, name: str, help: str) -> Gauge:
+        return self._get(Gauge, name, help)
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, buckets=buckets)
+
+    def render(self) -> str:
+        for callback in self._collectors:
+            callback()
+        lines = []
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        for name, metric in metrics:
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def summary(self, prefix: str = "") -> Dict[str, Dict]:
+        """Per-metric totals (counters) and count/mean/p50/p95 (histograms) for metrics starting with prefix."""
+        with self._lock:
+            metrics = sorted((n, m) for n, m in self._metrics.items() if n.startswith(prefix))
+        summaries = {name: metric.summary() for name, metric in metrics}
+        return {name: series for name, series in summaries.items() if series}
+
+    def format_summary(self, prefix: str = "") -> str:
+        """summary() as one line per series, for printing at the end of a run."""
+        lines = []
+        for name, series in self.summary(prefix).items():
+            for labels, value in series.items():
+                label = "" if labels == "total" else labels
+                if isinstance(value, dict):
+                    lines.append(f"{name}{label}: n={value['count']} mean={value['mean'] * 1000:.1f}ms "
+                                 f"p50<={value['p50'] * 1000:g}ms p95<={value['p95'] * 1000:g}ms "
+                                 f"total={value['sum']:.2f}s")
+                else:
+                    lines.append(f"{name}{label}: {value:g}")
+        return "\n".join(lines)
+
+    def reset(self, prefix: str = "") -> None:
+        with self._lock:
+            metrics = [m for n, m in self._metrics.items() if n.startswith(prefix)]
+        for metric in metrics:
+            metric.reset()
+
+
+REGISTRY = Registry()
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of all other threads every interval seconds.
+
+    Stacks are aggregated in the folded format ("outer;inner count" per line)
+    that flamegraph.pl and speedscope read. Meant to be switched on only while
+    investigating, e.g. through PROFILE_SLOW_REQUESTS_MS in the API.
+    """
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks: Tally = Tally()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                names = []
+                while frame is not None and len(names) < self.max_depth:
+                    code = frame.f_code
+                    names.append(f"{Path(code.co_filename).stem}:{code.co_name}")
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(names))] += 1
+
+    def start(self) -> "SamplingProfiler":
+        self._thread = threading.Thread(target=self._sample, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def folded(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+    def dump(self, path: Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.folded(), encoding="utf-8")
+        return path
+
+
+def profile_threshold() -> Optional[float]:
+    """Seconds above which requests are profiled, from PROFILE_SLOW_REQUESTS_MS; None when off."""
+    value = os.getenv("PROFILE_SLOW_REQUESTS_MS")
+    return float(value) / 1000 if value else None
@@ -0,0 +1,144 @@
+import base64
+import json
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .news_store import NewsStore
+
+SUMMARY_CHARS = 300
+
+
+def project(article: Dict) -> Dict:
+    """The fields the dashboard shows, instead of the full NewsData record."""
+    summary = article.get("description") or ""
+    if len(summary) > SUMMARY_CHARS:
+        summary = summary[:SUMMARY_CHARS].rsplit(" ", 1)[0] + "…"
+    return {
+        "id": article.get("article_id"),
+        "title": article.get("title"),
+        "link": article.get("link"),
+        "source": article.get("source_name"),
+        "summary": summary,
+        "pubDate": article.get("pubDate"),
+        "questions": article.get("questions") or [],
+    }
+
+
+def encode_cursor(key: Tuple[str, str]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """The (pubDate, article_id) key of a cursor; ValueError if it is not one encode_cursor made."""
+    key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    if not (isinstance(key, list) and len(key) == 2 and all(isinstance(part, str) for part in key)):
+        raise ValueError("Malformed cursor")
+    return key[0], key[1]
+
+
+class NewsIndex:
+    """
+    In-memory ticker -> articles index, sorted by (pubDate, article_id).
+
+    It is built from the news store, or from the legacy stock_news.json when
+    no store exists yet, and rebuilt when the underlying files change. Pages
+    are addressed with keyset cursors, so paging stays correct while new
+    articles arrive.
+    """
+
+    def __init__(self, store_path: Path, legacy_path: Path, check_interval: float = 5.0):
+        self.store_path = Path(store_path)
+        self.legacy_path = Path(legacy_path)
+        self.check_interval = check_interval
+        self._keys: Dict[str, List[Tuple[str, str]]] = {}
+        self._items: Dict[str, List[Dict]] = {}
+        self._store: Optional[NewsStore] = None
+        self._signature = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _source_files(self) -> List[Path]:
+        if self.store_path.exists():
+            return [self.store_path, self.store_path.with_name(self.store_path.name + "-wal")]
+        return [self.legacy_path]
+
+    def _current_signature(self) -> tuple:
+        return tuple((str(p), p.stat().st_mtime_ns, p.stat().st_size) for p in self._source_files() if p.exists())
+
+    def _links(self) -> Iterable[Tuple[str, Dict]]:
+        if self.store_path.exists():
+            if self._store is None:
+                self._store = NewsStore(self.store_path)
+            yield from self._store.iter_links()
+        elif self.legacy_path.exists():
+            with open(self.legacy_path, "r", encoding="utf-8") as f:
+                for ticker, articles in json.load(f).items():
+                    for article in articles if isinstance(articles, list) else []:
+                        yield ticker, article
+
+    def refresh(self) -> None:
+        """Rebuild the index if the source changed, checking at most every check_interval seconds."""
+        with self._lock:
+            if time.monotonic() - self._checked < self.check_interval:
+                return
+            self._checked = time.monotonic()
+            signature = self._current_signature()
+            if signature == self._signature:
+                return
+            entries: Dict[str, List[Tuple[Tuple[str, str], Dict]]] = {}
+            for ticker, article in self._links():
+                if not article.get("title"):
+                    continue
+                key = (article.get("pubDate") or "", article.get("article_id") or "")
+                entries.setdefault(ticker.upper(), []).append((key, project(article)))
+            keys, items = {}, {}
+            for ticker, rows in entries.items():
+                rows.sort(key=lambda row: row[0])
+                keys[ticker] = [key for key, _ in rows]
+                items[ticker] = [item for _, item in rows]
+            self._keys, self._items, self._signature = keys, items, signature
+
+    def tickers(self) -> List[str]:
+        self.refresh()
+        return sorted(self._keys)
+
+    def count_since(self, ticker: str, since: str) -> int:
+        """
+        Articles about ticker published since since, from the index as last
+        built. Never refreshes, so it is cheap enough to call from the event loop.
+        """
+        keys = self._keys.get(ticker.upper(), [])
+        return len(keys) - bisect_left(keys, (since, ""))
+
+    def query(
+        self,
+        ticker: str,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+    ) -> Dict:
+        """
+        Newest-first page of a ticker's articles published between since and until.
+
+        Dates compare as NewsData pubDate strings ("YYYY-MM-DD HH:MM:SS"); a bare
+        date for until covers that whole day. next_cursor is None on the last page.
+        """
+        self.refresh()
+        keys, items = self._keys.get(ticker.upper(), []), self._items.get(ticker.upper(), [])
+        lo = bisect_left(keys, (since, "")) if since else 0
+        if until and len(until) == 10:
+            until += " 23:59:59"
+        hi = bisect_right(keys, (until, "\uffff")) if until else len(keys)
+        if cursor:
+            hi = min(hi, bisect_left(keys, decode_cursor(cursor)))
+        start = max(lo, hi - limit)
+        page = items[start:hi][::-1]
+        return {
+            "ticker": ticker.upper(),
+            "items": page,
+            "next_cursor": encode_cursor(keys[start]) if page and start > lo else None,
+        }
@@ -0,0 +1,203 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+def content_hash(article: Dict) -> str:
+    fields = [article.get(name) or "" for name in ("title", "description", "link", "pubDate")]
+    fields.append(json.dumps(article.get("questions") or []))
+    return hashlib.sha1("\0".join(fields).encode("utf-8")).hexdigest()
+
+
+class NewsStore:
+    """
+    Article store shared by all tickers.
+
+    Every article is stored once, keyed by article_id, and tickers reference
+    articles through an index table. Each ticker also has a watermark, the
+    newest pubDate seen for it, so ingestion can stop paging as soon as it
+    reaches articles it already has.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(
+                """
+                PRAGMA journal_mode = WAL;
+                CREATE TABLE IF NOT EXISTS articles (
+                    article_id TEXT PRIMARY KEY,
+                    content_hash TEXT NOT NULL,
+                    pub_date TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS ticker_articles (
+                    ticker TEXT NOT NULL,
+                    article_id TEXT NOT NULL REFERENCES articles(article_id),
+                    pub_date TEXT NOT NULL,
+                    PRIMARY KEY (ticker, article_id)
+                );
+                CREATE INDEX IF NOT EXISTS ticker_articles_by_date ON ticker_articles (ticker, pub_date DESC);
+                CREATE TABLE IF NOT EXISTS watermarks (
+                    ticker TEXT PRIMARY KEY,
+                    pub_date TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+                """
+            )
+
+    def add(self, ticker: str, articles: Iterable[Dict]) -> int:
+        """
+        Store articles under a ticker and return how many rows changed.
+
+        An article that is already stored with the same content is only linked
+        to the ticker; it is rewritten only when its content changed.
+        """
+        now = time.time()
+        articles = [a for a in articles if a.get("article_id")]
+        if not articles:
+            return 0
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                """
+                INSERT INTO articles (article_id, content_hash, pub_date, data, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (article_id) DO UPDATE SET
+                    content_hash = excluded.content_hash,
+                    pub_date = excluded.pub_date,
+                    data = excluded.data,
+                    updated_at = excluded.updated_at
+                WHERE articles.content_hash != excluded.content_hash
+                """,
+                [
+                    (a["article_id"], content_hash(a), a.get("pubDate") or "", json.dumps(a, ensure_ascii=False), now)
+                    for a in articles
+                ],
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO ticker_articles (ticker, article_id, pub_date) VALUES (?, ?, ?)",
+                [(ticker, a["article_id"], a.get("pubDate") or "") for a in articles],
+            )
+            newest = max(a.get("pubDate") or "" for a in articles)
+            self._conn.execute(
+                """
+                INSERT INTO watermarks (ticker, pub_date, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT (ticker) DO UPDATE SET pub_date = excluded.pub_date, updated_at = excluded.updated_at
+                WHERE excluded.pub_date > watermarks.pub_date
+                """,
+                (ticker, newest, now),
+            )
+            return self._conn.total_changes - before
+
+    def watermark(self, ticker: str) -> Optional[str]:
+        """The newest pubDate stored for ticker, or None if it has no articles yet."""
+        with self._lock:
+            row = self._conn.execute("SELECT pub_date FROM watermarks WHERE ticker = ?", (ticker,)).fetchone()
+        return row[0] if row else None
+
+    def known_ids(self, ticker: str, article_ids: Iterable[str]) -> Set[str]:
+        """The subset of article_ids already linked to ticker."""
+        article_ids = list(article_ids)
+        found = set()
+        with self._lock:
+            for i in range(0, len(article_ids), 500):
+                chunk = article_ids[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT article_id FROM ticker_articles WHERE ticker = ? AND article_id IN ({','.join('?' * len(chunk))})",
+                    [ticker, *chunk],
+                )
+                found.update(row[0] for row in rows)
+        return found
+
+    def tickers(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT ticker FROM ticker_articles ORDER BY ticker")]
+
+    def articles_for(self, ticker: str, limit: Optional[int] = None) -> List[Dict]:
+        """Articles of a ticker, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT a.data FROM ticker_articles t JOIN articles a USING (article_id)
+                WHERE t.ticker = ? ORDER BY t.pub_date DESC, t.article_id LIMIT ?
+                """,
+                (ticker, -1 if limit is None else limit),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def iter_links(self) -> Iterable[Tuple[str, Dict]]:
+        """Every (ticker, article) pair, grouped by ticker and newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT t.ticker, a.data FROM ticker_articles t JOIN articles a USING (article_id)
+                ORDER BY t.ticker, t.pub_date DESC, t.article_id
+                """
+            ).fetchall()
+        for ticker, data in rows:
+            yield ticker, json.loads(data)
+
+    def export(self) -> Dict[str, List[Dict]]:
+        """The store in the legacy {ticker: [articles]} shape."""
+        exported: Dict[str, List[Dict]] = {}
+        for ticker, article in self.iter_links():
+            exported.setdefault(ticker, []).append(article)
+        return exported
+
+    def import_json(self, path: Path) -> int:
+        """Load a legacy {ticker: [articles]} file such as stock_news.json."""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return sum(self.add(ticker, articles) for ticker, articles in data.items() if isinstance(articles, list))
+
+    def compact(self, keep_per_ticker: int = 500, max_age_days: Optional[float] = None) -> Dict[str, int]:
+        """
+        Drop old ticker links and the articles no ticker references any more.
+
+        Each ticker keeps its newest keep_per_ticker articles, optionally only
+        those published within max_age_days. Freed pages are reclaimed with
+        VACUUM so the file shrinks as well.
+        """
+        with self._lock:
+            with self._conn:
+                links = self._conn.execute(
+                    """
+                    DELETE FROM ticker_articles WHERE rowid IN (
+                        SELECT rowid FROM (
+                            SELECT rowid, ROW_NUMBER() OVER (PARTITION BY ticker ORDER BY pub_date DESC) AS n
+                            FROM ticker_articles
+                        ) WHERE n > ?
+                    )
+                    """,
+                    (keep_per_ticker,),
+                ).rowcount
+                if max_age_days is not None:
+                    cutoff = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(time.time() - max_age_days * 86400))
+                    links += self._conn.execute("DELETE FROM ticker_articles WHERE pub_date < ?", (cutoff,)).rowcount
+                articles = self._conn.execute(
+                    "DELETE FROM articles WHERE article_id NOT IN (SELECT article_id FROM ticker_articles)"
+                ).rowcount
+                self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('compacted_at', ?)", (str(time.time()),))
+            self._conn.execute("VACUUM")
+        return {"links_removed": links, "articles_removed": articles}
+
+    def compact_if_due(self, every_hours: float = 24, **kwargs) -> Optional[Dict[str, int]]:
+        """Run compact() if it has not run in the last every_hours hours."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'compacted_at'").fetchone()
+        if row and time.time() - float(row[0]) < every_hours * 3600:
+            return None
+        return self.compact(**kwargs)
@@ -0,0 +1,294 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import requests
+
+INTERVALS = {"5m": timedelta(minutes=5), "1h": timedelta(hours=1), "1d": timedelta(days=1)}
+PERIOD = re.compile(r"(\d+)(d|mo|y)")
+PERIOD_DAYS = {"d": 1, "mo": 31, "y": 366}
+
+
+class TransientError(Exception):
+    """An upstream failure worth retrying: a timeout, 429 or 5xx."""
+
+
+def _unit(*parts) -> float:
+    """A uniform number in [0, 1) derived from parts alone."""
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2 ** 64
+
+
+class Faults:
+    """
+    Latency and failure injection for the fake providers.
+
+    Every call is keyed, e.g. ("info", "AAPL"), and the n-th call for a key
+    always gets the same delay and outcome for a given seed, however calls
+    from different threads interleave. Delays are uniform in
+    latency +/- jitter seconds.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.seed = seed
+        self.sleep = sleep
+        self._calls: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, prefix: str = "FAKE") -> "Faults":
+        """Faults from {prefix}_LATENCY_MS, {prefix}_JITTER_MS, {prefix}_ERROR_RATE and {prefix}_SEED."""
+        return cls(
+            latency=float(os.getenv(f"{prefix}_LATENCY_MS", "0")) / 1000,
+            jitter=float(os.getenv(f"{prefix}_JITTER_MS", "0")) / 1000,
+            error_rate=float(os.getenv(f"{prefix}_ERROR_RATE", "0")),
+            seed=int(os.getenv(f"{prefix}_SEED", "0")),
+        )
+
+    def __call__(self, *key) -> None:
+        """Wait out the delay for this call of key, then raise TransientError if it is to fail."""
+        with self._lock:
+            n = self._calls[key] = self._calls.get(key, 0) + 1
+        delay = self.latency + self.jitter * (2 * _unit(self.seed, "delay", n, *key) - 1)
+        if delay > 0:
+            self.sleep(delay)
+        if _unit(self.seed, "error", n, *key) < self.error_rate:
+            raise TransientError(f"Injected failure for {':'.join(map(str, key))} (call {n})")
+
+
+class MarketData(ABC):
+    """Quote info and OHLCV history per symbol, the upstream behind the quote endpoints."""
+
+    @abstractmethod
+    def info(self, symbol: str) -> Dict:
+        ...
+
+    @abstractmethod
+    def history(self, symbol: str, interval: str, period: Optional[str] = None,
+                start: Optional[datetime] = None) -> pd.DataFrame:
+        """Bars since start, or over period (e.g. "1mo") when start is None, as a yfinance frame."""
+
+
+class YFinanceMarketData(MarketData):
+    def __init__(self):
+        # Imported here so the fakes, which the knowledge agent also uses, work without yfinance
+        import yfinance
+        self.yf = yfinance
+
+    def info(self, symbol: str) -> Dict:
+        return self.yf.Ticker(symbol).info
+
+    def history(self, symbol: str, interval: str, period: Optional[str] = None,
+                start: Optional[datetime] = None) -> pd.DataFrame:
+        ticker = self.yf.Ticker(symbol)
+        if start is None:
+            return ticker.history(period=period, interval=interval)
+        return ticker.history(start=start, interval=interval)
+
+
+class FakeMarketData(MarketData):
+    """
+    Synthetic quotes that need no network.
+
+    Prices are a function of the symbol, the bar timestamp and the seed, so a
+    bar has the same value however it is fetched: a backfill and a later
+    incremental fetch agree.
+    """
+
+    def __init__(self, faults: Optional[Faults] = None, seed: int = 0):
+        self.faults = faults or Faults(seed=seed)
+        self.seed = seed
+
+    def _base(self, symbol: str) -> float:
+        return 20 + 480 * _unit(self.seed, "base", symbol)
+
+    def _closes(self, symbol: str, ts: np.ndarray) -> np.ndarray:
+        phase = 2 * np.pi * _unit(self.seed, "phase", symbol)
+        wave = 0.05 * np.sin(ts / 86400 / 5 + phase) + 0.01 * np.sin(ts / 3600 + 2 * phase)
+        noise = (np.sin(ts * 12.9898 + phase * 78.233) * 43758.5453) % 1 - 0.5
+        return self._base(symbol) * (1 + wave + 0.002 * noise)
+
+    def info(self, symbol: str) -> Dict:
+        self.faults("info", symbol)
+        now = int(time.time() // 60 * 60)
+        price, previous = self._closes(symbol, np.array([now, now - 86400], dtype="float64"))
+        return {
+            "symbol": symbol,
+            "longName": f"{symbol} Holdings",
+            "currentPrice": round(float(price), 2),
+            "previousClose": round(float(previous), 2),
+            "regularMarketChangePercent": round(float((price / previous - 1) * 100), 4),
+        }
+
+    def history(self, symbol: str, interval: str, period: Optional[str] = None,
+                start: Optional[datetime] = None) -> pd.DataFrame:
+        self.faults("history", symbol, interval)
+        step = int(INTERVALS[interval].total_seconds())
+        now = int(time.time()) // step * step
+        if start is None:
+            match = PERIOD.fullmatch(period or "1mo")
+            if match is None:
+                raise ValueError(f"Unsupported period {period}")
+            start_ts = now - int(match.group(1)) * PERIOD_DAYS[match.group(2)] * 86400
+        else:
+            start_ts = int(start.timestamp())
+        first = -(-start_ts // step) * step
+        ts = np.arange(first, now + 1, step, dtype="int64")
+        closes = self._closes(symbol, ts.astype("float64"))
+        opens = self._closes(symbol, (ts - step).astype("float64"))
+        spread = np.abs(closes - opens) + closes * 0.001
+        index = pd.to_datetime(ts, unit="s", utc=True)
+        return pd.DataFrame({
+            "Open": opens,
+            "High": np.maximum(opens, closes) + spread / 2,
+            "Low": np.minimum(opens, closes) - spread / 2,
+            "Close": closes,
+            "Volume": 1000 + (ts // step % 97) * 100,
+        }, index=index)
+
+
+def market_data_from_env() -> MarketData:
+    """FakeMarketData when MARKET_DATA=fake (faults from FAKE_*), yfinance otherwise."""
+    if os.getenv("MARKET_DATA", "yfinance") == "fake":
+        faults = Faults.from_env()
+        return FakeMarketData(faults, seed=faults.seed)
+    return YFinanceMarketData()
+
+
+class NewsSource(ABC):
+    """Pages of articles about a stock in the NewsData response shape, newest first."""
+
+    @abstractmethod
+    def fetch_page(self, stock: str, page: Optional[str] = None) -> Dict:
+        """One page: {"status": "success", "results": [...], "nextPage": token or None}."""
+
+
+class NewsDataSource(NewsSource):
+    base_url = "https://newsdata.io/api/1/news"
+
+    def __init__(self, api_key: str, session: Optional[requests.Session] = None):
+        self.api_key = api_key
+        self.session = session or requests.Session()
+
+    def fetch_page(self, stock: str, page: Optional[str] = None) -> Dict:
+        params = {
+            'apikey': self.api_key,
+            'qInTitle': stock,  # Search in title
+            'category': 'business',  # Focus on business news
+            'language': 'en',
+            'country': 'us'  # Focus on US news
+        }
+        if page:
+            params['page'] = page
+        try:
+            response = self.session.get(self.base_url, params=params, timeout=30)
+        except requests.RequestException as e:
+            raise TransientError(str(e)) from e
+        if response.status_code == 429 or response.status_code >= 500:
+            raise TransientError(f"NewsData returned {response.status_code}")
+        response.raise_for_status()
+        return response.json()
+
+
+class FakeNewsSource(NewsSource):
+    """
+    A fixed archive of articles_per_stock synthetic articles per stock.
+
+    Article ids, titles and publication times depend only on the stock and
+    the article's position, so repeated runs see the same archive and a
+    store that already holds it stops paging after the first page.
+    """
+
+    def __init__(self, articles_per_stock: int = 30, page_size: int = 10,
+                 faults: Optional[Faults] = None, latest: datetime = datetime(2025, 1, 1, tzinfo=timezone.utc)):
+        self.articles_per_stock = articles_per_stock
+        self.page_size = page_size
+        self.faults = faults or Faults()
+        self.latest = latest
+
+    def article(self, stock: str, i: int) -> Dict:
+        published = self.latest - timedelta(hours=3 * i)
+        return {
+            "article_id": f"fake-{stock.lower()}-{i:05d}",
+            "title": f"{stock} shares move after quarterly update #{i}",
+            "description": f"Analysts review ({stock}) guidance, margins and demand in note {i}.",
+            "link": f"https://news.example.com/{stock.lower()}/{i}",
+            "pubDate": published.strftime("%Y-%m-%d %H:%M:%S"),
+            "source_id": "fake",
+        }
+
+    def fetch_page(self, stock: str, page: Optional[str] = None) -> Dict:
+        offset = int(page or 0)
+        self.faults("news", stock, offset)
+        end = min(offset + self.page_size, self.articles_per_stock)
+        return {
+            "status": "success",
+            "totalResults": self.articles_per_stock,
+            "results": [self.article(stock, i) for i in range(offset, end)],
+            "nextPage": str(end) if end < self.articles_per_stock else None,
+        }
+
+
+class _Usage:
+    def __init__(self, prompt_token_count: int, candidates_token_count: int):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+
+
+class _Response:
+    def __init__(self, text: str, usage_metadata: _Usage):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+class FakeQuestionModel:
+    """
+    Stands in for the Gemini model behind StockNewsAPI: generate_content()
+    answers a question prompt with three questions per article id, computed
+    from the article titles, and reports token usage at ~4 characters per token.
+    """
+
+    def __init__(self, faults: Optional[Faults] = None):
+        self.faults = faults or Faults()
+
+    def generate_content(self, prompt: str) -> _Response:
+        start = prompt.index("Articles (JSON):") + len("Articles (JSON):")
+        items, _ = json.JSONDecoder().raw_decode(prompt[start:].lstrip())
+        self.faults("questions", hashlib.blake2b(prompt.encode(), digest_size=8).hexdigest())
+        answer = {
+            item["id"]: [
+                f"How will {item['title'] or 'this news'} affect revenue?",
+                f"What does {item['title'] or 'this news'} mean for margins?",
+                f"How might competitors respond to {item['title'] or 'this news'}?",
+            ]
+            for item in items
+        }
+        text = json.dumps(answer)
+        return _Response(text, _Usage(len(prompt) // 4, len(text) // 4))
+
+
+def news_providers_from_env() -> Optional[Tuple[NewsSource, FakeQuestionModel]]:
+    """(FakeNewsSource, FakeQuestionModel) when NEWS_PROVIDER=fake, else None."""
+    if os.getenv("NEWS_PROVIDER", "newsdata") != "fake":
+        return None
+    faults = Faults.from_env()
+    source = FakeNewsSource(int(os.getenv("FAKE_ARTICLES_PER_STOCK", "30")), faults=faults)
+    return source, FakeQuestionModel(faults)
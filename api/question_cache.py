@@ -0,0 +1,65 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+Key = Tuple[str, str]
+
+
+def article_key(article: Dict) -> Key:
+    """(article_id, content hash) so an edited article gets new questions."""
+    content = f"{article.get('title') or ''}\0{article.get('description') or ''}"
+    content_hash = hashlib.sha1(content.encode("utf-8")).hexdigest()
+    return article.get("article_id") or content_hash, content_hash
+
+
+class QuestionCache:
+    """Persistent cache of generated questions keyed by article_key."""
+
+    def __init__(self, path: Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS questions (
+                    article_id TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    questions TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (article_id, content_hash)
+                )
+                """
+            )
+
+    def get_many(self, keys: Iterable[Key]) -> Dict[Key, List[str]]:
+        keys = list(set(keys))
+        found = {}
+        with self._lock:
+            # Stay well below SQLite's bound parameter limit
+            for i in range(0, len(keys), 400):
+                chunk = keys[i:i + 400]
+                clause = " OR ".join(["(article_id = ? AND content_hash = ?)"] * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT article_id, content_hash, questions FROM questions WHERE {clause}",
+                    [value for key in chunk for value in key],
+                )
+                for article_id, content_hash, questions in rows:
+                    found[(article_id, content_hash)] = json.loads(questions)
+        return found
+
+    def get(self, key: Key) -> Optional[List[str]]:
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: Dict[Key, List[str]]) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO questions VALUES (?, ?, ?, ?)",
+                [(key[0], key[1], json.dumps(questions), now) for key, questions in items.items()],
+            )
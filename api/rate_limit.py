@@ -0,0 +1,57 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Iterator
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter usable from threads and from asyncio.
+
+    The bucket holds up to `capacity` tokens and refills at `rate` tokens per
+    second. Callers reserve tokens up front, so concurrent callers queue up in
+    order instead of all waking up at the same time and retrying.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_period(cls, requests: int, seconds: float, burst: int = None) -> "TokenBucket":
+        """A bucket allowing `requests` per `seconds`, e.g. per_period(30, 15 * 60)."""
+        return cls(rate=requests / seconds, capacity=burst or requests)
+
+    def reserve(self, tokens: float = 1) -> float:
+        """Take tokens and return how many seconds the caller must wait before using them."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def available(self) -> float:
+        """Tokens in the bucket right now; negative while reservations are queued."""
+        with self._lock:
+            return min(self.capacity, self._tokens + (time.monotonic() - self._updated) * self.rate)
+
+    def acquire(self, tokens: float = 1) -> None:
+        wait = self.reserve(tokens)
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1) -> None:
+        wait = self.reserve(tokens)
+        if wait:
+            await asyncio.sleep(wait)
+
+
+def backoff_delays(retries: int, base: float = 1.0, cap: float = 60.0) -> Iterator[float]:
+    """Exponential backoff with full jitter: uniform(0, min(cap, base * 2**attempt))."""
+    for attempt in range(retries):
+        yield random.uniform(0, min(cap, base * 2 ** attempt))
@@ -0,0 +1,296 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from datetime import datetime, time as clock, timezone
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from .rate_limit import TokenBucket
+
+Job = Callable[[str], Awaitable[object]]
+Key = Tuple[str, str]  # (symbol, kind)
+
+NEW_YORK = ZoneInfo("America/New_York")
+
+
+def market_open(now: Optional[datetime] = None) -> bool:
+    """Whether US equities trade regular hours at now (holidays are not considered)."""
+    local = (now or datetime.now(timezone.utc)).astimezone(NEW_YORK)
+    return local.weekday() < 5 and clock(9, 30) <= local.time() < clock(16, 0)
+
+
+def realized_volatility(bars: np.ndarray) -> Optional[float]:
+    """Standard deviation of log close-to-close returns, or None with too few bars."""
+    closes = bars["close"]
+    closes = closes[closes > 0]
+    if len(closes) < 3:
+        return None
+    return float(np.diff(np.log(closes)).std())
+
+
+class RefreshPolicy:
+    """
+    How often a (symbol, kind) job should run, from how much attention it deserves.
+
+    Symbols nobody watches and nobody asked for recently are not refreshed at
+    all. Subscribers shorten the base interval logarithmically; a symbol that
+    was only requested recently runs at a quarter of the pace. Quotes slow down
+    20x outside market hours, speed up when the recent bars are volatile and
+    slow down when they are quiet. Both kinds speed up with the number of
+    articles published about the symbol in the last day.
+    """
+
+    def __init__(
+        self,
+        subscribers: Callable[[str], int] = lambda symbol: 0,
+        volatility: Callable[[str], Optional[float]] = lambda symbol: None,
+        news_velocity: Callable[[str], int] = lambda symbol: 0,
+        is_market_open: Callable[[], bool] = market_open,
+        base: Optional[Dict[str, float]] = None,
+        bounds: Optional[Dict[str, Tuple[float, float]]] = None,
+        reference_volatility: float = 0.002,
+    ):
+        self.subscribers = subscribers
+        self.volatility = volatility
+        self.news_velocity = news_velocity
+        self.is_market_open = is_market_open
+        self.base = base or {"quote": 15.0, "news": 900.0}
+        self.bounds = bounds or {"quote": (5.0, 3600.0), "news": (300.0, 6 * 3600.0)}
+        self.reference_volatility = reference_volatility
+
+    def interval(self, symbol: str, kind: str, warm: bool) -> Optional[float]:
+        """Seconds between runs, or None if the job should not be scheduled."""
+        watchers = self.subscribers(symbol)
+        if not watchers and not warm:
+            return None
+        interval = self.base.get(kind, 60.0)
+        interval = interval / (1 + math.log2(watchers)) if watchers else interval * 4
+        velocity = min(self.news_velocity(symbol), 20)
+        if kind == "quote":
+            if not self.is_market_open():
+                interval *= 20
+            volatility = self.volatility(symbol)
+            if volatility:
+                interval *= min(2.0, max(0.5, self.reference_volatility / volatility))
+            interval /= 1 + velocity / 20
+        else:
+            interval /= 1 + velocity / 5
+        low, high = self.bounds.get(kind, (1.0, 24 * 3600.0))
+        return min(high, max(low, interval))
+
+
+class RefreshScheduler:
+    """
+    Background refresher for (symbol, kind) jobs, ordered by due time in a heap.
+
+    The symbols to refresh are those with stream subscribers, those requested
+    within warm_for seconds (see touch) and those pinned per kind; kinds in
+    pinned_only run for their pinned symbols and nothing else. Every run
+    takes its cost from a token bucket shared by all jobs, so the upstream
+    budget holds however many symbols are hot; when it runs short, jobs are
+    delayed in due-time order. Failed jobs back off exponentially.
+    """
+
+    def __init__(
+        self,
+        jobs: Dict[str, Job],
+        policy: RefreshPolicy,
+        budget: TokenBucket,
+        costs: Optional[Dict[str, float]] = None,
+        watched: Callable[[], Iterable[str]] = set,
+        warm_for: float = 600.0,
+        max_concurrency: int = 4,
+        job_timeout: float = 120.0,
+        plan_every: float = 5.0,
+        pinned_only: Iterable[str] = (),
+    ):
+        self.jobs = jobs
+        self.policy = policy
+        self.budget = budget
+        self.costs = costs or {}
+        self.watched = watched
+        self.warm_for = warm_for
+        self.job_timeout = job_timeout
+        self.plan_every = plan_every
+        self.pinned_only = set(pinned_only)
+        self._heap: List[Tuple[float, int, str, str]] = []
+        self._due: Dict[Key, float] = {}
+        self._running: Set[Key] = set()
+        self._requested: Dict[str, float] = {}
+        self._arrived: Set[str] = set()
+        self._pinned: Dict[str, Set[str]] = {}
+        self._stats: Dict[Key, Dict] = {}
+        self._seq = itertools.count()
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._wakeup = asyncio.Event()
+        self._tasks: Set[asyncio.Task] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._planned = 0.0
+
+    def touch(self, symbols: Iterable[str]) -> None:
+        """
+        Record that clients asked for symbols, keeping them warm for warm_for seconds.
+
+        Symbols that were already warm only get their timestamp updated; newly
+        warm ones are added to the schedule on their own, without a full plan.
+        """
+        now = time.monotonic()
+        for symbol in symbols:
+            symbol = symbol.upper()
+            if now - self._requested.get(symbol, -math.inf) >= self.warm_for:
+                self._arrived.add(symbol)
+            self._requested[symbol] = now
+        if self._arrived:
+            self._wakeup.set()
+
+    def pin(self, kind: str, symbols: Iterable[str]) -> None:
+        """Always refresh symbols for kind, at least at the warm pace."""
+        self._pinned.setdefault(kind, set()).update(symbol.upper() for symbol in symbols)
+        self.wake()
+
+    def wake(self) -> None:
+        self._planned = 0.0
+        self._wakeup.set()
+
+    def _schedule(self, key: Key, due: float) -> None:
+        self._due[key] = due
+        heapq.heappush(self._heap, (due, next(self._seq), *key))
+
+    def _interval(self, key: Key) -> Optional[float]:
+        symbol, kind = key
+        warm = time.monotonic() - self._requested.get(symbol, -math.inf) < self.warm_for
+        interval = self.policy.interval(symbol, kind, warm or symbol in self._pinned.get(kind, ()))
+        if interval is None:
+            return None
+        return interval * 2 ** min(self._stats.get(key, {}).get("consecutive_failures", 0), 6)
+
+    def _consider(self, key: Key, now: float) -> None:
+        """Schedule, reschedule or drop one job according to its current interval."""
+        if key in self._running:
+            return
+        interval = self._interval(key)
+        if interval is None:
+            self._due.pop(key, None)
+            return
+        last = self._stats.get(key, {}).get("last_run")
+        due = now if last is None else last + interval
+        # A job whose interval shrank, e.g. because it gained subscribers, is pulled forward
+        if key not in self._due or due < self._due[key] - 1.0:
+            self._schedule(key, max(now, due))
+
+    def _add_arrived(self) -> None:
+        """Schedule the symbols touch() saw become warm, leaving the rest of the plan alone."""
+        now = time.monotonic()
+        arrived, self._arrived = self._arrived, set()
+        for kind in self.jobs:
+            if kind not in self.pinned_only:
+                for symbol in arrived:
+                    self._consider((symbol, kind), now)
+
+    def _plan(self) -> None:
+        """Add jobs for newly relevant symbols, drop cold ones and pull hot ones forward."""
+        now = time.monotonic()
+        cutoff = now - self.warm_for
+        self._requested = {s: t for s, t in self._requested.items() if t >= cutoff}
+        self._arrived.clear()
+        symbols = set(self.watched()) | set(self._requested)
+        for kind in self.jobs:
+            pinned = self._pinned.get(kind, set())
+            for symbol in pinned if kind in self.pinned_only else symbols | pinned:
+                self._consider((symbol, kind), now)
+        for key in list(self._due):
+            pinned = self._pinned.get(key[1], ())
+            if key[0] not in pinned and (key[1] in self.pinned_only or key[0] not in symbols):
+                del self._due[key]  # its heap entry is skipped when popped
+        for key in list(self._stats):
+            if key not in self._due and key not in self._running:
+                del self._stats[key]
+        self._planned = now
+
+    async def _execute(self, key: Key) -> None:
+        symbol, kind = key
+        stats = self._stats.setdefault(key, {"runs": 0, "failures": 0, "consecutive_failures": 0})
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(self.jobs[kind](symbol), self.job_timeout)
+            stats["consecutive_failures"] = 0
+            stats.pop("last_error", None)
+        except Exception as e:
+            stats["failures"] += 1
+            stats["consecutive_failures"] += 1
+            stats["last_error"] = str(e) or type(e).__name__
+        finally:
+            self._slots.release()
+            self._running.discard(key)
+            stats["runs"] += 1
+            stats["last_run"] = started
+            stats["duration"] = time.monotonic() - started
+            interval = self._interval(key)
+            if interval is not None:
+                stats["interval"] = interval
+                self._schedule(key, started + interval)
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            now = time.monotonic()
+            if now - self._planned >= self.plan_every:
+                self._plan()
+            elif self._arrived:
+                self._add_arrived()
+            if not self._heap or self._heap[0][0] > now:
+                delay = min(self.plan_every, self._heap[0][0] - now) if self._heap else self.plan_every
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), max(delay, 0.01))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            due, _, symbol, kind = heapq.heappop(self._heap)
+            key = (symbol, kind)
+            if self._due.get(key) != due:
+                continue
+            del self._due[key]
+            self._running.add(key)
+            await self._slots.acquire()
+            await self.budget.acquire_async(self.costs.get(kind, 1))
+            task = asyncio.get_running_loop().create_task(self._execute(key))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def snapshot(self) -> Dict:
+        """Scheduled jobs with their next due time and run counters, for a JSON response."""
+        now = time.monotonic()
+        jobs = []
+        for (symbol, kind), stats in sorted(self._stats.items()):
+            due = self._due.get((symbol, kind))
+            jobs.append({
+                "symbol": symbol,
+                "kind": kind,
+                "due_in": round(due - now, 1) if due is not None else None,
+                "running": (symbol, kind) in self._running,
+                **{name: round(value, 3) if isinstance(value, float) else value
+                   for name, value in stats.items() if name != "last_run"},
+            })
+        pending = [{"symbol": s, "kind": k, "due_in": round(d - now, 1)}
+                   for (s, k), d in sorted(self._due.items()) if (s, k) not in self._stats]
+        return {"jobs": jobs + pending, "warm": sorted(self._requested), "budget_tokens": round(self.budget.available(), 1)}
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        tasks = [t for t in [self._task, *self._tasks] if t is not None]
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
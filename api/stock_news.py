@@ -1,24 +1,117 @@
+import ast
+import asyncio
 import os
-import requests
+import re
+import threading
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 import json
 from pathlib import Path
-import google.generativeai as genai
 import time
 
+from .entity_index import EntityMatcher, build_entities
+from .metrics import REGISTRY
+from .news_store import NewsStore
+from .providers import NewsDataSource, NewsSource, TransientError, news_providers_from_env
+from .question_cache import QuestionCache, article_key
+from .rate_limit import TokenBucket, backoff_delays
+
+# Sentinel passed down the pipeline queues once a stage has no more items
+_DONE = object()
+
+upstream_seconds = REGISTRY.histogram("news_upstream_seconds", "Latency of NewsData and Gemini calls by api")
+upstream_errors = REGISTRY.counter("news_upstream_errors_total", "Failed NewsData and Gemini calls by api")
+stage_seconds = REGISTRY.histogram("news_stage_seconds", "Time per ingest pipeline batch by stage")
+articles_total = REGISTRY.counter("news_articles_total", "Articles leaving each ingest pipeline stage")
+ingest_seconds = REGISTRY.histogram("news_ingest_seconds", "Duration of ingest runs", buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600))
+
+DEFAULT_QUESTIONS = [
+    "What are the potential market implications of this news?",
+    "How might this affect the company's competitive position?",
+    "What could be the long-term impact on the industry?"
+]
+
+def parse_questions_response(text: str) -> Dict[str, List[str]]:
+    """
+    Parse a model response mapping article ids to question lists.
+
+    Accepts a JSON object, optionally wrapped in a markdown code block, and
+    falls back to a Python literal. Nothing in the response is ever executed.
+    """
+    text = re.sub(r"```[a-zA-Z]*", "", text).strip()
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        raise ValueError("No JSON object in response")
+    body = text[start:end + 1]
+    try:
+        parsed = json.loads(body)
+    except json.JSONDecodeError:
+        parsed = ast.literal_eval(body)
+    if not isinstance(parsed, dict):
+        raise ValueError("Response is not an object")
+    return {str(key): value for key, value in parsed.items()}
+
+def _clean_questions(questions) -> Optional[List[str]]:
+    if not isinstance(questions, list):
+        return None
+    questions = [q.strip() for q in questions if isinstance(q, str) and q.strip()]
+    return questions[:3] if len(questions) >= 3 else None
+
 class StockNewsAPI:
-    def __init__(self, api_key: str = None, gemini_key: str = None):
-        self.api_key = api_key or os.getenv('NEWSDATA_API_KEY')
-        if not self.api_key:
-            raise ValueError("NewsData API key is required. Set it as NEWSDATA_API_KEY environment variable or pass it to the constructor.")
-        
+    def __init__(
+        self,
+        api_key: str = None,
+        gemini_key: str = None,
+        newsdata_limit: Tuple[int, float] = (30, 15 * 60),  # NewsData free plan: 30 credits per 15 minutes
+        gemini_limit: Tuple[int, float] = (60, 60),  # Gemini free tier: 60 requests per minute
+        enrich_workers: int = 4,
+        queue_size: int = 100,
+        question_batch_size: int = 10,
+        question_cache_path: Path = Path(__file__).parent / "data" / "questions.sqlite",
+        store_path: Path = Path(__file__).parent / "data" / "news.sqlite",
+        max_pages: int = 5,
+        stocks: Optional[List[str]] = None,
+        news_source: Optional[NewsSource] = None,
+        question_model=None,
+    ):
+        # NEWS_PROVIDER=fake swaps NewsData and Gemini for offline fakes
+        if news_source is None and question_model is None:
+            news_source, question_model = news_providers_from_env() or (None, None)
+
+        if news_source is None:
+            self.api_key = api_key or os.getenv('NEWSDATA_API_KEY')
+            if not self.api_key:
+                raise ValueError("NewsData API key is required. Set it as NEWSDATA_API_KEY environment variable or pass it to the constructor.")
+            news_source = NewsDataSource(self.api_key)
+        self.news_source = news_source
+
         # Initialize Gemini
-        genai.configure(api_key=gemini_key)
-        self.model = genai.GenerativeModel('gemini-pro')
-        
-        self.base_url = "https://newsdata.io/api/1/news"
-        self.stocks = [
+        if question_model is None:
+            import google.generativeai as genai
+            genai.configure(api_key=gemini_key)
+            question_model = genai.GenerativeModel('gemini-pro')
+        self.model = question_model
+
+        # Upstream quotas are enforced here instead of with fixed sleeps
+        self.newsdata_bucket = TokenBucket.per_period(*newsdata_limit)
+        self.gemini_bucket = TokenBucket.per_period(*gemini_limit)
+        self.max_retries = 3
+        self.enrich_workers = enrich_workers
+        self.queue_size = queue_size
+
+        # Questions are generated for several articles per prompt and cached
+        # by article id and content hash across runs
+        self.question_batch_size = question_batch_size
+        self.question_cache = QuestionCache(question_cache_path)
+        self._stats_lock = threading.Lock()
+        self.reset_question_stats()
+
+        # Articles are stored once and indexed by ticker; per-ticker watermarks
+        # let each run fetch only what is newer than the last one
+        self.store = NewsStore(store_path)
+        self.max_pages = max_pages
+
+        self.stocks = stocks or [
             "AAPL",  # Apple
             "MSFT",  # Microsoft
             "GOOGL", # Alphabet
@@ -31,124 +124,305 @@ class StockNewsAPI:
             "WMT",   # Walmart
         ]
 
+        # Relevance comes from the tickers in context or company names an
+        # article mentions, not substrings. Nothing is kept per article, so
+        # memory stays flat however long the process ingests.
+        self.entity_matcher = EntityMatcher(build_entities(self.stocks))
+
+    def reset_question_stats(self) -> None:
+        self.question_stats = {
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "llm_calls": 0,
+            "llm_failures": 0,
+            "prompt_tokens": 0,
+            "output_tokens": 0,
+            "tokens_estimated": False,
+        }
+
+    def _count(self, **increments) -> None:
+        with self._stats_lock:
+            for name, value in increments.items():
+                self.question_stats[name] += value
+
     def generate_questions(self, article: Dict) -> List[str]:
         """Generate insightful questions about a news article using Gemini."""
-        max_retries = 3
-        retry_delay = 2  # seconds
-        
-        for attempt in range(max_retries):
+        return self.generate_questions_batch([article])[0]
+
+    def generate_questions_batch(self, articles: List[Dict]) -> List[List[str]]:
+        """
+        Generate questions for many articles at once.
+
+        Articles already in the question cache are answered from it. The rest
+        are deduplicated and sent question_batch_size articles per prompt.
+        Articles the model could not answer get the default questions, which
+        are not cached so the next run tries again.
+        """
+        keys = [article_key(article) for article in articles]
+        found = self.question_cache.get_many(keys)
+        missing = {}
+        for key, article in zip(keys, articles):
+            if key not in found:
+                missing.setdefault(key, article)
+        self._count(cache_hits=len(articles) - len(missing), cache_misses=len(missing))
+
+        pending = list(missing.items())
+        for i in range(0, len(pending), self.question_batch_size):
+            chunk = pending[i:i + self.question_batch_size]
+            generated = self._request_questions([article for _, article in chunk])
+            fresh = {key: questions for (key, _), questions in zip(chunk, generated) if questions}
+            self.question_cache.put_many(fresh)
+            found.update(fresh)
+
+        return [found.get(key) or list(DEFAULT_QUESTIONS) for key in keys]
+
+    def _request_questions(self, articles: List[Dict]) -> List[Optional[List[str]]]:
+        """One Gemini call for a batch of articles; None for articles it did not answer."""
+        items = [
+            {"id": str(i), "title": article.get('title') or '', "description": (article.get('description') or '')[:1000]}
+            for i, article in enumerate(articles)
+        ]
+        prompt = f"""
+        For each news article below, write 3 insightful, analytical questions that an investor might ask about the implications of the news.
+        Each question must be a complete sentence ending with a question mark.
+        Focus on market impact, business strategy, and future implications.
+
+        Articles (JSON):
+        {json.dumps(items, ensure_ascii=False)}
+
+        Respond with only a JSON object mapping each article id to its list of 3 questions, for example:
+        {{"0": ["Question 1?", "Question 2?", "Question 3?"], "1": ["Question 1?", "Question 2?", "Question 3?"]}}
+        """
+        delays = backoff_delays(self.max_retries, base=2.0)
+
+        for attempt in range(self.max_retries):
             try:
-                prompt = f"""
-                Based on this news article:
-                Title: {article['title']}
-                Description: {article.get('description', '')}
-                
-                Generate 3 insightful, analytical questions that an investor might ask about the implications of this news.
-                Return only a Python list of strings, with each question being a complete sentence ending with a question mark.
-                Focus on market impact, business strategy, and future implications.
-                Example format: ["Question 1?", "Question 2?", "Question 3?"]
-                """
-                
-                response = self.model.generate_content(prompt)
-                response_text = response.text.strip()
-                # Remove any markdown code block indicators
-                response_text = response_text.replace('```python', '').replace('```', '')
-                # Safely evaluate the string as a Python list
-                try:
-                    questions = eval(response_text)
-                    if isinstance(questions, list) and len(questions) >= 3:
-                        return questions[:3]
-                except:
-                    # If eval fails, try to extract questions using string manipulation
-                    questions = [q.strip() for q in response_text.split('?') if q.strip()]
-                    questions = [f"{q}?" for q in questions]
-                    if questions:
-                        return questions[:3]
-                
-                # If we get here, use default questions
-                raise ValueError("Could not parse questions from response")
-                
+                self.gemini_bucket.acquire()
+                with upstream_seconds.time(api="gemini"):
+                    response = self.model.generate_content(prompt)
+                self._record_usage(prompt, response)
+                parsed = parse_questions_response(response.text)
+                return [_clean_questions(parsed.get(str(i))) for i in range(len(articles))]
             except Exception as e:
-                print(f"Error generating questions (attempt {attempt + 1}/{max_retries}): {str(e)}")
-                if "429" in str(e):  # Rate limit error
-                    time.sleep(retry_delay * (attempt + 1))  # Exponential backoff
-                    continue
-                
-                if attempt == max_retries - 1:  # Last attempt
-                    return [
-                        "What are the potential market implications of this news?",
-                        "How might this affect the company's competitive position?",
-                        "What could be the long-term impact on the industry?"
-                    ]
-            
-            time.sleep(1)  # Small delay between successful calls
+                upstream_errors.inc(api="gemini")
+                print(f"Error generating questions (attempt {attempt + 1}/{self.max_retries}): {str(e)}")
+                if attempt < self.max_retries - 1:
+                    time.sleep(next(delays))
 
-    def get_past_week_news(self) -> Dict[str, List[Dict]]:
+        self._count(llm_failures=1)
+        return [None] * len(articles)
+
+    def _record_usage(self, prompt: str, response) -> None:
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            self._count(llm_calls=1, prompt_tokens=usage.prompt_token_count,
+                        output_tokens=usage.candidates_token_count)
+        else:
+            # Older client versions do not report usage; ~4 characters per token
+            self._count(llm_calls=1, prompt_tokens=len(prompt) // 4, output_tokens=len(response.text) // 4)
+            self.question_stats["tokens_estimated"] = True
+
+    def question_report(self) -> str:
+        stats = self.question_stats
+        lookups = stats["cache_hits"] + stats["cache_misses"]
+        hit_rate = stats["cache_hits"] / lookups if lookups else 0.0
+        approx = "~" if stats["tokens_estimated"] else ""
+        return (f"Questions: {stats['cache_hits']}/{lookups} from cache ({hit_rate:.0%}), "
+                f"{stats['llm_calls']} LLM calls ({stats['llm_failures']} failed batches), "
+                f"{approx}{stats['prompt_tokens']} prompt + {approx}{stats['output_tokens']} output tokens")
+
+    async def _fetch_page(self, stock: str, page: Optional[str] = None) -> Dict:
         """
-        Fetch news for the past week for all stocks in the list.
-        Returns a dictionary with stock symbols as keys and lists of news articles as values.
+        Fetch one page of business news mentioning a stock, retrying transient failures.
+
+        The rate limit and backoff waits happen on the event loop, so
+        cancelling the ingest run also stops pages that were still waiting.
         """
-        all_news = {}
-        
-        for stock in self.stocks:
+        delays = backoff_delays(self.max_retries)
+        for attempt in range(self.max_retries):
+            await self.newsdata_bucket.acquire_async()
             try:
-                params = {
-                    'apikey': self.api_key,
-                    'qInTitle': stock,  # Search in title
-                    'category': 'business',  # Focus on business news
-                    'language': 'en',
-                    'country': 'us'  # Focus on US news
-                }
-                
-                response = requests.get(self.base_url, params=params)
-                response.raise_for_status()
-                
-                data = response.json()
-                if data.get('status') == 'success':
-                    # Filter results to only include those mentioning the stock
-                    filtered_results = [
-                        article for article in data.get('results', [])
-                        if stock.lower() in article.get('title', '').lower() or
-                           stock.lower() in article.get('description', '').lower()
-                    ]
-                    
-                    # Generate questions for each article
-                    for article in filtered_results:
-                        article['questions'] = self.generate_questions(article)
-                        time.sleep(1)  # Add delay between article processing
-                    
-                    all_news[stock] = filtered_results
-                    print(f"Successfully fetched and analyzed {len(all_news[stock])} news items for {stock}")
-                else:
-                    print(f"Failed to fetch news for {stock}: {data.get('message', 'Unknown error')}")
-                    all_news[stock] = []
-                    
+                with upstream_seconds.time(api="newsdata"):
+                    data = await asyncio.to_thread(self.news_source.fetch_page, stock, page)
+            except TransientError as e:
+                upstream_errors.inc(api="newsdata")
+                if attempt == self.max_retries - 1:
+                    raise
+                print(f"Retrying news fetch for {stock} after error: {e}")
+                await asyncio.sleep(next(delays))
+                continue
+            if data.get('status') != 'success':
+                raise ValueError(data.get('message', 'Unknown error'))
+            return data
+        return {}
+
+    async def fetch_news(self, stock: str) -> List[Dict]:
+        """
+        Fetch articles about a stock that are not in the store yet.
+
+        Results come newest first, so paging stops at the first page that
+        reaches the stock's watermark or an article already stored for it.
+        """
+        watermark = await asyncio.to_thread(self.store.watermark, stock)
+        new_articles, page = [], None
+        for _ in range(self.max_pages):
+            data = await self._fetch_page(stock, page)
+            results = data.get('results', [])
+            ids = [a.get('article_id') for a in results if a.get('article_id')]
+            known = await asyncio.to_thread(self.store.known_ids, stock, ids)
+            fresh = [
+                a for a in results
+                if a.get('article_id') not in known and (watermark is None or (a.get('pubDate') or '') >= watermark)
+            ]
+            new_articles.extend(fresh)
+            page = data.get('nextPage')
+            if not page or len(fresh) < len(results):
+                break
+        return new_articles
+
+    def is_relevant(self, stock: str, article: Dict) -> bool:
+        """Whether the article mentions stock by ticker or company name."""
+        text = f"{article.get('title') or ''}\n{article.get('description') or ''}"
+        return stock.upper() in self.entity_matcher.find(text)
+
+    async def ingest(self, stocks: Optional[List[str]] = None) -> Dict[str, List[Dict]]:
+        """
+        Run the fetch -> filter -> enrich -> persist pipeline over stocks (default: all).
+
+        Stages are connected by bounded queues, so articles are enriched while
+        other stocks are still being fetched. Throughput is limited by the
+        NewsData and Gemini token buckets rather than by fixed delays.
+        """
+        started = time.perf_counter()
+        fetched = asyncio.Queue(maxsize=self.queue_size)
+        relevant = asyncio.Queue(maxsize=self.queue_size)
+        enriched = asyncio.Queue(maxsize=self.queue_size)
+        stocks = stocks or self.stocks
+        all_news = {stock: [] for stock in stocks}
+        run_counts = {"fetched": 0, "relevant": 0, "enriched": 0, "stored": 0}
+
+        def count(stage: str, n: int) -> None:
+            run_counts[stage] += n
+            articles_total.inc(n, stage=stage)
+
+        async def fetch(stock: str) -> None:
+            try:
+                with stage_seconds.time(stage="fetch"):
+                    articles = await self.fetch_news(stock)
             except Exception as e:
                 print(f"Error fetching news for {stock}: {str(e)}")
-                all_news[stock] = []
-            
-            # Add a small delay to avoid rate limiting
-            if stock != self.stocks[-1]:  # Don't delay after the last request
-                time.sleep(2)
-        
+                return
+            count("fetched", len(articles))
+            for article in articles:
+                await fetched.put((stock, article))
+
+        async def fetch_stage() -> None:
+            await asyncio.gather(*(fetch(stock) for stock in stocks))
+            await fetched.put(_DONE)
+
+        async def keep_relevant(items):
+            with stage_seconds.time(stage="filter"):
+                kept = [(stock, article) for stock, article in items if self.is_relevant(stock, article)]
+            count("relevant", len(kept))
+            return kept
+
+        async def enrich(items):
+            with stage_seconds.time(stage="enrich"):
+                questions = await asyncio.to_thread(self.generate_questions_batch, [article for _, article in items])
+            for (_, article), article_questions in zip(items, questions):
+                article['questions'] = article_questions
+            count("enriched", len(items))
+            return items
+
+        async def persist(items):
+            by_stock = {}
+            for stock, article in items:
+                all_news[stock].append(article)
+                by_stock.setdefault(stock, []).append(article)
+            with stage_seconds.time(stage="persist"):
+                for stock, articles in by_stock.items():
+                    await asyncio.to_thread(self.store.add, stock, articles)
+            count("stored", len(items))
+            return []
+
+        self.reset_question_stats()
+        tasks = [asyncio.ensure_future(stage) for stage in (
+            fetch_stage(),
+            self._stage(fetched, relevant, keep_relevant),
+            self._stage(relevant, enriched, enrich, workers=self.enrich_workers, batch_size=self.question_batch_size),
+            self._stage(enriched, None, persist, batch_size=self.queue_size),
+        )]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # A failed or cancelled stage would leave the others blocked on the
+            # queues forever; take them down with it
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        elapsed = time.perf_counter() - started
+        ingest_seconds.observe(elapsed)
+        for stock, articles in all_news.items():
+            print(f"Successfully fetched and analyzed {len(articles)} new news items for {stock}")
+        print(self.question_report())
+        print(f"Ingest run: {len(stocks)} stocks in {elapsed:.1f}s, "
+              + ", ".join(f"{n} {stage}" for stage, n in run_counts.items())
+              + f" ({run_counts['stored'] / elapsed if elapsed else 0:.1f} articles/s)")
         return all_news
 
-    def save_to_file(self, data: Dict[str, List[Dict]], filename: str = "stock_news.json"):
-        """Save the fetched news data to a JSON file"""
-        output_path = Path(__file__).parent / filename
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        print(f"News data saved to {output_path}")
+    @staticmethod
+    async def _stage(inbox: asyncio.Queue, outbox, worker, workers: int = 1, batch_size: int = 1) -> None:
+        """
+        Apply worker to the items of inbox and pass its results on to outbox.
+
+        The worker takes and returns a list. It gets up to batch_size items:
+        whatever is already queued once the first item arrives.
+        """
+        async def run():
+            done = False
+            while not done:
+                batch = [await inbox.get()]
+                while len(batch) < batch_size and not inbox.empty():
+                    batch.append(inbox.get_nowait())
+                if _DONE in batch:
+                    batch.remove(_DONE)
+                    done = True
+                if batch:
+                    for result in await worker(batch):
+                        if outbox is not None:
+                            await outbox.put(result)
+            await inbox.put(_DONE)  # Let sibling workers see the end too
+
+        await asyncio.gather(*(run() for _ in range(workers)))
+        if outbox is not None:
+            await outbox.put(_DONE)
+
+    def get_past_week_news(self) -> Dict[str, List[Dict]]:
+        """
+        Fetch new news for all stocks in the list and add it to the store.
+        Returns a dictionary with stock symbols as keys and lists of the newly added articles as values.
+        """
+        return asyncio.run(self.ingest())
 
 def main():
+    # python -m api.stock_news, from the repository root
     # Initialize the API (make sure to set NEWSDATA_API_KEY environment variable)
     api = StockNewsAPI()
+
+    # Seed an empty store from the previously exported file
+    legacy_file = Path(__file__).parent / "stock_news.json"
+    if not api.store.tickers() and legacy_file.exists():
+        print(f"Imported {api.store.import_json(legacy_file)} rows from {legacy_file}")
     
-    # Fetch news for all stocks
+    # Fetch new news for all stocks into the store
     news_data = api.get_past_week_news()
-    
-    # Save to file
-    api.save_to_file(news_data)
+
+    # Keep the store bounded
+    compacted = api.store.compact_if_due()
+    if compacted:
+        print(f"Compacted news store: {compacted}")
+    print(f"Added {sum(len(articles) for articles in news_data.values())} new articles to {api.store.path}")
+    print(REGISTRY.format_summary("news_"))
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,114 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+FetchQuotes = Callable[[List[str]], Awaitable[Tuple[List[Dict], List[Dict]]]]
+
+
+class Subscription:
+    """
+    One connected client and the symbols it watches.
+
+    Pending quotes are kept per symbol, so a slow client only ever has the
+    latest quote for each symbol waiting instead of an unbounded backlog.
+    """
+
+    def __init__(self, symbols: Iterable[str]):
+        self.symbols: Set[str] = set(symbols)
+        self._pending: Dict[str, Dict] = {}
+        self._ready = asyncio.Event()
+
+    def push(self, quotes: List[Dict]) -> None:
+        for quote in quotes:
+            self._pending[quote["symbol"]] = quote
+        if self._pending:
+            self._ready.set()
+
+    async def next(self, timeout: float) -> List[Dict]:
+        """Wait up to timeout seconds for updates, returning [] if none came."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self._ready.clear()
+        quotes, self._pending = list(self._pending.values()), {}
+        return quotes
+
+
+class QuoteHub:
+    """
+    Fans out quote updates from a single upstream poller to many clients.
+
+    Every interval the poller fetches the union of all subscribed symbols once
+    and pushes only the quotes that changed since the previous tick, so the
+    upstream load depends on the number of distinct symbols rather than on the
+    number of connected browsers.
+    """
+
+    def __init__(self, fetch_quotes: FetchQuotes, interval: float = 15.0):
+        self.fetch_quotes = fetch_quotes
+        self.interval = interval
+        self._subscribers: List[Subscription] = []
+        self._latest: Dict[str, Dict] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, symbols: Iterable[str]) -> Subscription:
+        sub = Subscription(symbols)
+        sub.push([self._latest[s] for s in sub.symbols if s in self._latest])
+        self._subscribers.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        if sub in self._subscribers:
+            self._subscribers.remove(sub)
+        watched = self.symbols()
+        for symbol in sub.symbols - watched:
+            self._latest.pop(symbol, None)
+
+    def symbols(self) -> Set[str]:
+        """The union of symbols watched by at least one subscriber."""
+        return set().union(*(sub.symbols for sub in self._subscribers))
+
+    def subscriber_count(self, symbol: str) -> int:
+        return sum(1 for sub in self._subscribers if symbol in sub.symbols)
+
+    async def prime(self, sub: Subscription) -> None:
+        """Fetch symbols nobody was watching yet so a new client gets a snapshot right away."""
+        missing = sorted(s for s in sub.symbols if s not in self._latest)
+        if missing:
+            await self.publish(missing)
+
+    async def publish(self, symbols: List[str]) -> None:
+        results, _ = await self.fetch_quotes(symbols)
+        changed = [q for q in results if self._latest.get(q["symbol"]) != q]
+        for quote in changed:
+            self._latest[quote["symbol"]] = quote
+        if not changed:
+            return
+        for sub in self._subscribers:
+            sub.push([q for q in changed if q["symbol"] in sub.symbols])
+
+    async def _run(self) -> None:
+        while True:
+            symbols = self.symbols()
+            # Forget quotes nobody watches so they are re-sent to the next subscriber fresh.
+            for symbol in set(self._latest) - symbols:
+                del self._latest[symbol]
+            if symbols:
+                try:
+                    await self.publish(sorted(symbols))
+                except Exception as e:
+                    print(f"Quote poller tick failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
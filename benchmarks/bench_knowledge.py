@@ -0,0 +1,125 @@
+import contextlib
+import io
+import json
+import random
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from harness import Stopwatch, latency_stats
+
+QUERIES = [
+    "{ticker} guidance and margins",
+    "What did analysts say about {ticker} demand?",
+    "quarterly update shares move",
+    "which companies reported weaker demand",
+]
+
+
+def corpus_tickers() -> List[str]:
+    """The tickers dl.py downloads, which the entity index knows."""
+    from api.entity_index import load_company_tickers
+
+    return sorted(set(load_company_tickers().values()))
+
+
+def write_corpus(directory: Path, documents: int, files: int) -> List[str]:
+    """documents synthetic articles, round-robin over corpus_tickers(), as {ticker: [articles]} JSON in files files."""
+    from api.providers import FakeNewsSource
+
+    source = FakeNewsSource()
+    names = corpus_tickers()
+    directory.mkdir(parents=True, exist_ok=True)
+    shards = [{} for _ in range(files)]
+    for i in range(documents):
+        ticker = names[i % len(names)]
+        shard = shards[i % len(names) % files]
+        shard.setdefault(ticker, []).append(source.article(ticker, i // len(names)))
+    paths = []
+    for n, shard in enumerate(shards):
+        path = directory / f"bench_{n}.json"
+        path.write_text(json.dumps(shard), encoding="utf-8")
+        paths.append(str(path))
+    return paths
+
+
+def run(corpus_sizes: List[int], files: int, queries: int, vector_store: str, db_url: str,
+        workdir: Path, seed: int) -> Dict:
+    """
+    Measure load_all throughput and search latency as the corpus grows.
+
+    Every size is loaded from scratch (load_all(recreate=True)) into
+    LocalVectorDb or, with vector_store="pgvector", into PgVector at db_url,
+    through the production embedding path: a CachedEmbedder with the agent's
+    batch size and concurrency around a FakeEmbedder with the FAKE_* faults.
+    The first load starts with an empty embedding cache; the warm load drops
+    the tables and loads again from the filled cache. Searches mix queries
+    naming a ticker, which take the entity prefilter, with generic ones.
+    """
+    from embedding_cache import CachedEmbedder, EmbeddingCache
+    from fake_embedder import FakeEmbedder
+    from local_vectordb import LocalVectorDb
+    from api.providers import Faults
+    from stock_news_agent import EMBEDDING_BATCH_SIZE, EMBEDDING_CONCURRENCY, StockNewsKnowledge, get_table_name
+
+    engine = None
+    if vector_store == "pgvector":
+        from agno.vectordb.pgvector import PgVector
+        from sqlalchemy import create_engine
+        engine = create_engine(db_url, pool_size=8, max_overflow=8)
+
+    rng = random.Random(seed)
+    results = []
+    for size in corpus_sizes:
+        news_files = write_corpus(workdir / f"corpus-{size}", size, files)
+        embedder = CachedEmbedder(
+            embedder=FakeEmbedder(faults=Faults.from_env()),
+            cache=EmbeddingCache(workdir / f"embeddings-{size}.sqlite"),
+            batch_size=EMBEDDING_BATCH_SIZE,
+            concurrency=EMBEDDING_CONCURRENCY,
+        )
+        if engine is not None:
+            vector_dbs = [PgVector(table_name=f"bench_{get_table_name(f)}", db_engine=engine, embedder=embedder)
+                          for f in news_files]
+        else:
+            vector_dbs = [LocalVectorDb(table_name=get_table_name(f), path=workdir / f"vectors-{size}", embedder=embedder)
+                          for f in news_files]
+        knowledge = StockNewsKnowledge(vector_dbs, news_files, manifest_path=str(workdir / f"manifest-{size}.json"))
+
+        log = io.StringIO()
+        with Stopwatch() as load, contextlib.redirect_stdout(log):
+            knowledge.load_all(recreate=True)
+        cold_api_calls = embedder.stats["api_calls"]
+        with Stopwatch() as warm, contextlib.redirect_stdout(log):
+            knowledge.load_all(recreate=True)
+        # Searches below embed their queries through the same cache
+        warm_hits = embedder.stats["hits"]
+
+        names = corpus_tickers()
+        latencies = []
+        with contextlib.redirect_stdout(log):
+            # The first search also builds the entity/BM25 index
+            with Stopwatch() as first:
+                knowledge.search(QUERIES[0].format(ticker=names[0]), num_documents=5)
+            for _ in range(queries):
+                query = rng.choice(QUERIES).format(ticker=rng.choice(names))
+                start = time.perf_counter()
+                knowledge.search(query, num_documents=5)
+                latencies.append(time.perf_counter() - start)
+
+        results.append({
+            "documents": size,
+            "files": files,
+            "load_seconds": round(load.seconds, 3),
+            "documents_per_second": round(size / load.seconds, 1) if load.seconds else None,
+            "embedding_api_calls": cold_api_calls,
+            "warm_load_seconds": round(warm.seconds, 3),
+            "warm_documents_per_second": round(size / warm.seconds, 1) if warm.seconds else None,
+            "warm_embedding_hits": warm_hits,
+            "first_search_ms": round(first.seconds * 1000, 3),
+            "search": latency_stats(latencies),
+        })
+        if engine is not None:
+            for vector_db in vector_dbs:
+                vector_db.drop()
+    return {"vector_store": vector_store, "runs": results}
@@ -0,0 +1,48 @@
+import asyncio
+import contextlib
+import io
+from pathlib import Path
+from typing import Dict, List
+
+from harness import Stopwatch, tickers
+
+
+def run(ticker_counts: List[int], articles_per_stock: int, workdir: Path) -> Dict:
+    """
+    Time news ingestion for each number of tickers, from an empty store and
+    again once everything is stored (the incremental path).
+
+    NewsData and Gemini are replaced by FakeNewsSource and FakeQuestionModel
+    with the FAKE_* faults; the rate limits are lifted so only the pipeline
+    and the fakes' latency count.
+    """
+    from api.providers import Faults, FakeNewsSource, FakeQuestionModel
+    from api.stock_news import StockNewsAPI
+
+    runs = []
+    for n in ticker_counts:
+        faults = Faults.from_env()
+        api = StockNewsAPI(
+            stocks=tickers(n),
+            news_source=FakeNewsSource(articles_per_stock, faults=faults),
+            question_model=FakeQuestionModel(faults),
+            newsdata_limit=(10 ** 9, 1),
+            gemini_limit=(10 ** 9, 1),
+            store_path=workdir / f"news-{n}" / "news.sqlite",
+            question_cache_path=workdir / f"news-{n}" / "questions.sqlite",
+        )
+        result = {"tickers": n, "articles_per_stock": articles_per_stock}
+        for phase in ("cold", "incremental"):
+            log = io.StringIO()
+            with Stopwatch() as watch, contextlib.redirect_stdout(log):
+                stored = asyncio.run(api.ingest())
+            articles = sum(len(items) for items in stored.values())
+            result[phase] = {
+                "seconds": round(watch.seconds, 3),
+                "articles": articles,
+                "articles_per_second": round(articles / watch.seconds, 1) if watch.seconds else None,
+                "llm_calls": api.question_stats["llm_calls"],
+                "llm_failures": api.question_stats["llm_failures"],
+            }
+        runs.append(result)
+    return {"runs": runs}
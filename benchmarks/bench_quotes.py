@@ -0,0 +1,77 @@
+import asyncio
+import random
+import time
+from typing import Dict, List
+
+import httpx
+
+from harness import latency_stats, tickers
+
+
+def _counts(summary: Dict, name: str) -> Dict[str, float]:
+    """Sample count (histograms) or value (counters) per series of a metric, keyed by its first label value."""
+    return {labels.split('"')[1] if '"' in labels else labels: value["count"] if isinstance(value, dict) else value
+            for labels, value in summary.get(name, {}).items()}
+
+
+async def _client(http: httpx.AsyncClient, rng: random.Random, symbols: List[str], requests: int,
+                  multi_share: float, latencies: List[float], statuses: Dict[int, int]) -> None:
+    for _ in range(requests):
+        if rng.random() < multi_share:
+            url = "/api/stocks?symbols=" + ",".join(rng.sample(symbols, min(5, len(symbols))))
+        else:
+            url = f"/api/stocks/{rng.choice(symbols)}"
+        start = time.perf_counter()
+        response = await http.get(url)
+        latencies.append(time.perf_counter() - start)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+
+async def _level(app, clients: int, symbols: List[str], requests: int, multi_share: float, seed: int) -> Dict:
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            _client(http, random.Random(seed * 1000 + i), symbols, requests, multi_share, latencies, statuses)
+            for i in range(clients)
+        ))
+        elapsed = time.perf_counter() - start
+    return {
+        "clients": clients,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "statuses": {str(code): n for code, n in sorted(statuses.items())},
+        "latency": latency_stats(latencies),
+    }
+
+
+def run(clients: List[int], symbols: int, requests: int, multi_share: float, seed: int) -> Dict:
+    """
+    Load-test the quote endpoints in-process at each client count.
+
+    Each level starts from a cold cache with its own symbol universe, and
+    every client sends `requests` requests: single-symbol quotes, and with
+    probability multi_share a five-symbol batch.
+    """
+    from api import main
+    from api.metrics import REGISTRY
+
+    levels = []
+    for level, n in enumerate(clients):
+        universe = tickers(symbols, prefix="B" + "ABCDEFGHIJKLMNOPQRSTUVWXYZ"[level % 26])
+        before = REGISTRY.summary("api_")
+        result = asyncio.run(_level(main.app, n, universe, requests, multi_share, seed + level))
+        after = REGISTRY.summary("api_")
+        upstream_before = _counts(before, "api_upstream_seconds")
+        result["upstream_calls"] = {
+            labels: count - upstream_before.get(labels, 0)
+            for labels, count in _counts(after, "api_upstream_seconds").items()
+        }
+        errors_before = _counts(before, "api_upstream_errors_total")
+        result["upstream_errors"] = sum(
+            count - errors_before.get(labels, 0) for labels, count in _counts(after, "api_upstream_errors_total").items()
+        )
+        levels.append(result)
+    return {"symbols": symbols, "requests_per_client": requests, "multi_share": multi_share, "levels": levels}
@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Sequence
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+KNOWLEDGE_DIR = ROOT / "cookbook" / "agent_concepts" / "knowledge"
+
+if str(KNOWLEDGE_DIR) not in sys.path:
+    sys.path.insert(0, str(KNOWLEDGE_DIR))
+
+
+def offline_env(workdir: Path, latency_ms: float, jitter_ms: float, error_rate: float, seed: int) -> None:
+    """Point every provider at its fake and all on-disk state at workdir, before the app modules are imported."""
+    os.environ.update({
+        "MARKET_DATA": "fake",
+        "NEWS_PROVIDER": "fake",
+        "EMBEDDER": "fake",
+        "REFRESH_SCHEDULER": "0",
+        "BAR_STORE_DIR": str(workdir / "bars"),
+        "FAKE_LATENCY_MS": str(latency_ms),
+        "FAKE_JITTER_MS": str(jitter_ms),
+        "FAKE_ERROR_RATE": str(error_rate),
+        "FAKE_SEED": str(seed),
+    })
+
+
+def latency_stats(seconds: Sequence[float]) -> Dict[str, float]:
+    """Count, mean and percentiles of latency samples, in milliseconds."""
+    if not seconds:
+        return {"count": 0}
+    ms = np.asarray(seconds) * 1000
+    p50, p90, p95, p99 = np.percentile(ms, [50, 90, 95, 99])
+    return {
+        "count": len(ms),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p90_ms": round(float(p90), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(ms.max()), 3),
+    }
+
+
+def tickers(n: int, prefix: str = "Q") -> list:
+    """n synthetic tickers such as QAAA, QAAB, ... that match no real company."""
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    return [
+        prefix + letters[i // 676 % 26] + letters[i // 26 % 26] + letters[i % 26]
+        for i in range(n)
+    ]
+
+
+class Stopwatch:
+    def __enter__(self) -> "Stopwatch":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.seconds = time.perf_counter() - self.start
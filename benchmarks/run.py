@@ -0,0 +1,150 @@
+"""
+Offline benchmarks for the quote API, news ingestion and the news knowledge base.
+
+Every upstream (yfinance, NewsData, Gemini, the embedding API) is replaced by
+a deterministic fake with the given latency, jitter and error rate, so runs
+are reproducible and need no keys or network. Results are written as JSON;
+with --baseline, key metrics are compared against a previous result file and
+the exit status is 1 if any regressed by more than --tolerance.
+
+    python benchmarks/run.py --suite quotes news --output results.json
+    python benchmarks/run.py --baseline results.json --tolerance 0.25
+"""
+import argparse
+import contextlib
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from harness import ROOT, offline_env
+
+SUITES = ("quotes", "news", "knowledge")
+
+# (suite, path to the list of runs, key identifying a run, metric, whether higher is better)
+TRACKED = [
+    ("quotes", "levels", "clients", "requests_per_second", True),
+    ("quotes", "levels", "clients", "latency.p95_ms", False),
+    ("news", "runs", "tickers", "cold.articles_per_second", True),
+    ("news", "runs", "tickers", "incremental.seconds", False),
+    ("knowledge", "runs", "documents", "documents_per_second", True),
+    ("knowledge", "runs", "documents", "warm_documents_per_second", True),
+    ("knowledge", "runs", "documents", "search.p95_ms", False),
+]
+
+
+def _ints(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part]
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def _lookup(result: Dict, dotted: str):
+    for part in dotted.split("."):
+        if not isinstance(result, dict) or part not in result:
+            return None
+        result = result[part]
+    return result
+
+
+def tracked_metrics(results: Dict) -> Iterator[Tuple[str, float, bool]]:
+    """(name, value, higher_is_better) for every tracked metric present in results."""
+    for suite, runs, key, metric, higher in TRACKED:
+        for run in results.get("suites", {}).get(suite, {}).get(runs, []):
+            value = _lookup(run, metric)
+            if isinstance(value, (int, float)):
+                yield f"{suite}[{key}={run[key]}].{metric}", value, higher
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Descriptions of the tracked metrics that are worse than baseline by more than tolerance."""
+    previous = {name: value for name, value, _ in tracked_metrics(baseline)}
+    regressions = []
+    for name, value, higher in tracked_metrics(results):
+        old = previous.get(name)
+        if not old:
+            continue
+        change = (value - old) / old
+        if (-change if higher else change) > tolerance:
+            regressions.append(f"{name}: {old:g} -> {value:g} ({change:+.0%})")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suite", nargs="+", choices=SUITES, default=list(SUITES))
+    parser.add_argument("--output", type=Path, help="write results here instead of stdout")
+    parser.add_argument("--baseline", type=Path, help="previous results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression (default 0.2)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=20, help="mean fake upstream latency")
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--clients", type=_ints, default=[1, 8, 32], help="quote suite client counts")
+    parser.add_argument("--symbols", type=int, default=50, help="quote suite symbol universe per level")
+    parser.add_argument("--requests", type=int, default=50, help="requests per quote client")
+    parser.add_argument("--multi-share", type=float, default=0.2, help="share of multi-symbol quote requests")
+    parser.add_argument("--tickers", type=_ints, default=[5, 20], help="news suite ticker counts")
+    parser.add_argument("--articles-per-stock", type=int, default=30)
+    parser.add_argument("--corpus", type=_ints, default=[1000, 5000, 20000], help="knowledge suite corpus sizes")
+    parser.add_argument("--files", type=int, default=4, help="news files the corpus is split into")
+    parser.add_argument("--queries", type=int, default=50, help="searches per corpus size")
+    parser.add_argument("--vector-store", choices=("local", "pgvector"), default="local")
+    parser.add_argument("--db-url", default="postgresql+psycopg://ai:ai@localhost:5532/ai")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-") as tmp:
+        workdir = Path(tmp)
+        offline_env(workdir, args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+        random.seed(args.seed)  # retry backoff jitter
+        results = {
+            "started": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {name: value for name, value in vars(args).items()
+                       if name not in ("output", "baseline", "tolerance")},
+            "suites": {},
+        }
+        # The app modules print progress; keep stdout for the results
+        with contextlib.redirect_stdout(sys.stderr):
+            if "quotes" in args.suite:
+                import bench_quotes
+                results["suites"]["quotes"] = bench_quotes.run(
+                    args.clients, args.symbols, args.requests, args.multi_share, args.seed
+                )
+            if "news" in args.suite:
+                import bench_news
+                results["suites"]["news"] = bench_news.run(args.tickers, args.articles_per_stock, workdir)
+            if "knowledge" in args.suite:
+                import bench_knowledge
+                results["suites"]["knowledge"] = bench_knowledge.run(
+                    args.corpus, args.files, args.queries, args.vector_store, args.db_url, workdir, args.seed
+                )
+
+    text = json.dumps(results, indent=2, default=str)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+        for line in regressions:
+            print(f"Regression: {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
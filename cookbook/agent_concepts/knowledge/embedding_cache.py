@@ -0,0 +1,172 @@
+import sqlite3
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from hashlib import md5
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from agno.embedder.base import Embedder
+from agno.embedder.openai import OpenAIEmbedder
+
+
+def content_hash(content: str) -> str:
+    return md5(content.encode()).hexdigest()
+
+
+class EmbeddingCache:
+    """Embeddings on disk, keyed by (embedder model, content hash)."""
+
+    def __init__(self, path: Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    PRIMARY KEY (model, content_hash)
+                )
+                """
+            )
+
+    def get_many(self, model: str, hashes: Sequence[str]) -> Dict[str, List[float]]:
+        hashes = list(set(hashes))
+        found = {}
+        with self._lock:
+            for i in range(0, len(hashes), 500):
+                chunk = hashes[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT content_hash, vector FROM embeddings WHERE model = ? AND content_hash IN ({','.join('?' * len(chunk))})",
+                    [model, *chunk],
+                )
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+        return found
+
+    def put_many(self, model: str, vectors: Dict[str, List[float]]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)",
+                [(model, key, array("f", vector).tobytes()) for key, vector in vectors.items()],
+            )
+
+
+@dataclass
+class CachedEmbedder(Embedder):
+    """
+    Wraps an embedder with an EmbeddingCache and batched embedding calls.
+
+    PgVector.insert re-embeds every document through its embedder, so the
+    cache has to sit inside the embedder for pre-computed embeddings to be
+    reused. embed_batch() fills the cache with one API request per batch_size
+    texts, running up to `concurrency` requests at once.
+
+    The vectors of the last `recent_size` texts passed to embed_batch() are
+    also kept in memory, so when the vector store embeds those documents again
+    get_embedding() answers without a second lookup and without counting it.
+    """
+
+    embedder: Optional[Embedder] = None
+    cache: Optional[EmbeddingCache] = None
+    batch_size: int = 64
+    concurrency: int = 4
+    recent_size: int = 2048
+    stats: Dict[str, int] = field(default_factory=lambda: {"hits": 0, "misses": 0, "api_calls": 0})
+
+    def __post_init__(self):
+        if self.embedder is None or self.cache is None:
+            raise ValueError("CachedEmbedder needs an embedder and a cache")
+        self.dimensions = self.embedder.dimensions
+        self._stats_lock = threading.Lock()
+        self._recent: Dict[str, List[float]] = {}
+
+    @property
+    def model(self) -> str:
+        return getattr(self.embedder, "id", type(self.embedder).__name__)
+
+    def _count(self, **increments) -> None:
+        with self._stats_lock:
+            for name, value in increments.items():
+                self.stats[name] += value
+
+    def reset_stats(self) -> None:
+        with self._stats_lock:
+            self.stats = {"hits": 0, "misses": 0, "api_calls": 0}
+
+    def _embed_uncached(self, texts: List[str]) -> List[List[float]]:
+        """
+        One upstream request for a batch when the embedder speaks the OpenAI API
+        or has a batched get_embeddings (FakeEmbedder), otherwise one per text.
+        """
+        if isinstance(self.embedder, OpenAIEmbedder):
+            params = {"input": texts, "model": self.embedder.id, "encoding_format": "float"}
+            if self.embedder.id.startswith("text-embedding-3"):
+                params["dimensions"] = self.embedder.dimensions
+            if self.embedder.request_params:
+                params.update(self.embedder.request_params)
+            response = self.embedder.client.embeddings.create(**params)
+            self._count(api_calls=1)
+            return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+        get_embeddings = getattr(self.embedder, "get_embeddings", None)
+        if callable(get_embeddings):
+            self._count(api_calls=1)
+            return get_embeddings(texts)
+        self._count(api_calls=len(texts))
+        return [self.embedder.get_embedding(text) for text in texts]
+
+    def embed_batch(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embeddings for texts, in order, calling the upstream only for uncached ones."""
+        hashes = [content_hash(text) for text in texts]
+        vectors = self._embed(texts, hashes)
+        with self._stats_lock:
+            self._recent.update(zip(hashes, vectors))
+            for key in list(self._recent)[:max(0, len(self._recent) - self.recent_size)]:
+                del self._recent[key]
+        return vectors
+
+    def _embed(self, texts: Sequence[str], hashes: List[str]) -> List[List[float]]:
+        found = self.cache.get_many(self.model, hashes)
+        missing = {}
+        for key, text in zip(hashes, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+        self._count(hits=len(texts) - len(missing), misses=len(missing))
+
+        pending = list(missing.items())
+        batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+
+        def run(batch: List[Tuple[str, str]]) -> None:
+            vectors = self._embed_uncached([text for _, text in batch])
+            fresh = {key: vector for (key, _), vector in zip(batch, vectors) if vector}
+            self.cache.put_many(self.model, fresh)
+            found.update(fresh)
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            list(pool.map(run, batches))
+        missed = [key for key in hashes if not found.get(key)]
+        if missed:
+            raise ValueError(f"No embedding returned for {len(missed)} of {len(texts)} texts")
+        return [found[key] for key in hashes]
+
+    def get_embedding(self, text: str) -> List[float]:
+        key = content_hash(text)
+        with self._stats_lock:
+            vector = self._recent.pop(key, None)
+        if vector is not None:
+            return vector
+        return self._embed([text], [key])[0]
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        return self.get_embedding(text), None
+
+    def report(self) -> str:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        hit_rate = self.stats["hits"] / lookups if lookups else 0.0
+        return (f"Embedding cache: {self.stats['hits']}/{lookups} hits ({hit_rate:.0%}), "
+                f"{self.stats['api_calls']} embedding API calls")
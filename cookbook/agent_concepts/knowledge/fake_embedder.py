@@ -0,0 +1,48 @@
+import re
+from dataclasses import dataclass, field
+from hashlib import md5
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from agno.embedder.base import Embedder
+
+from api.providers import Faults
+
+WORD = re.compile(r"\w+")
+
+
+@dataclass
+class FakeEmbedder(Embedder):
+    """
+    Deterministic offline embeddings for benchmarks.
+
+    Words and word pairs are hashed into `dimensions` signed buckets and the
+    result is normalised, so texts that share words are close in cosine
+    distance and search results stay meaningful. faults adds upstream-like
+    latency and errors per call.
+    """
+
+    dimensions: Optional[int] = 256
+    id: str = "fake-hashing"
+    faults: Faults = field(default_factory=Faults)
+
+    def _vector(self, text: str) -> List[float]:
+        words = [word.lower() for word in WORD.findall(text or "")]
+        vector = np.zeros(self.dimensions, dtype="float32")
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            digest = int(md5(feature.encode()).hexdigest()[:8], 16)
+            vector[digest % self.dimensions] += 1.0 if digest & 1 << 31 else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def get_embedding(self, text: str) -> List[float]:
+        self.faults("embed", md5((text or "").encode()).hexdigest())
+        return self._vector(text)
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        return self.get_embedding(text), {"total_tokens": len(WORD.findall(text or ""))}
+
+    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Embeddings for many texts in one call, like a batched embeddings request."""
+        self.faults("embed_batch", md5("\n".join(texts).encode()).hexdigest())
+        return [self._vector(text) for text in texts]
@@ -0,0 +1,357 @@
+import json
+import shutil
+import sqlite3
+import threading
+from hashlib import md5
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from agno.document import Document
+from agno.embedder.base import Embedder
+from agno.vectordb.base import VectorDb
+
+
+class LocalVectorDb(VectorDb):
+    """
+    In-process vector store persisted under path/table_name.
+
+    Embeddings are L2-normalised into a memory-mapped float32 matrix
+    (vectors.f32), one row per slot, so cosine similarity is a single matrix
+    product. Ids, names, content and metadata live in rows.sqlite. Only the id
+    and source_file of every slot are kept in RAM, so opening a large store is
+    fast.
+
+    Past ivf_min_rows documents an IVF index (k-means centroids plus a list
+    assignment per slot) is built, and searches only score the rows in the
+    nprobe lists nearest to the query.
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        path: Path,
+        embedder: Optional[Embedder] = None,
+        ivf_min_rows: int = 20000,
+        nprobe: int = 8,
+    ):
+        if embedder is None:
+            from agno.embedder.openai import OpenAIEmbedder
+
+            embedder = OpenAIEmbedder()
+        self.table_name = table_name
+        self.embedder = embedder
+        self.dimensions = embedder.dimensions
+        self.dir = Path(path) / table_name
+        self.ivf_min_rows = ivf_min_rows
+        self.nprobe = nprobe
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._matrix: Optional[np.memmap] = None
+        self._ids: List[Optional[str]] = []
+        self._slot_of: Dict[str, int] = {}
+        self._sources: Dict[str, int] = {}
+        self._source_codes = np.empty(0, dtype=np.int32)
+        self._centroids: Optional[np.ndarray] = None
+        self._lists = np.empty(0, dtype=np.int32)
+        self._indexed_rows = 0
+        if self.exists():
+            self._open()
+
+    # Storage
+
+    def _open(self) -> None:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.dir / "rows.sqlite"), check_same_thread=False)
+        with self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS rows (
+                    slot INTEGER PRIMARY KEY,
+                    id TEXT NOT NULL UNIQUE,
+                    name TEXT,
+                    content TEXT,
+                    meta_data TEXT NOT NULL,
+                    source_file TEXT
+                );
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+                """
+            )
+            stored = self._conn.execute("SELECT value FROM meta WHERE key = 'dimensions'").fetchone()
+            if stored and int(stored[0]) != self.dimensions:
+                raise ValueError(f"{self.dir} holds {stored[0]}-dimensional vectors, embedder has {self.dimensions}")
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('dimensions', ?)", (str(self.dimensions),))
+
+        rows = self._conn.execute("SELECT slot, id, source_file FROM rows ORDER BY slot").fetchall()
+        size = rows[-1][0] + 1 if rows else 0
+        self._ids = [None] * size
+        self._slot_of = {}
+        self._sources = {}
+        self._source_codes = np.full(size, -1, dtype=np.int32)
+        for slot, doc_id, source_file in rows:
+            self._ids[slot] = doc_id
+            self._slot_of[doc_id] = slot
+            self._source_codes[slot] = self._sources.setdefault(source_file or "", len(self._sources))
+        self._map(max(size, 1024))
+        self._load_index()
+
+    def _map(self, capacity: int) -> None:
+        path = self.dir / "vectors.f32"
+        needed = capacity * self.dimensions * 4
+        if self._matrix is not None:
+            self._matrix.flush()
+            self._matrix = None
+        if not path.exists() or path.stat().st_size < needed:
+            with open(path, "ab") as f:
+                f.truncate(needed)
+        rows = path.stat().st_size // (self.dimensions * 4)
+        self._matrix = np.memmap(path, dtype=np.float32, mode="r+", shape=(rows, self.dimensions))
+
+    def _ensure_capacity(self, size: int) -> None:
+        if size > self._matrix.shape[0]:
+            self._map(max(size, 2 * self._matrix.shape[0]))
+
+    def _source_code(self, source_file: str) -> int:
+        return self._sources.setdefault(source_file or "", len(self._sources))
+
+    # VectorDb surface
+
+    def create(self) -> None:
+        with self._lock:
+            if self._conn is None:
+                self._open()
+
+    def exists(self) -> bool:
+        return (self.dir / "rows.sqlite").exists()
+
+    def drop(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn, self._matrix = None, None
+            self._ids, self._slot_of, self._sources = [], {}, {}
+            self._source_codes = np.empty(0, dtype=np.int32)
+            self._centroids, self._lists, self._indexed_rows = None, np.empty(0, dtype=np.int32), 0
+            shutil.rmtree(self.dir, ignore_errors=True)
+
+    def delete(self) -> bool:
+        with self._lock:
+            if self._conn is None:
+                return True
+            self.delete_ids([doc_id for doc_id in self._ids if doc_id is not None])
+            return True
+
+    def get_count(self) -> int:
+        return len(self._slot_of)
+
+    def doc_exists(self, document: Document) -> bool:
+        with self._lock:
+            if self._conn is None:
+                return False
+            row = self._conn.execute("SELECT 1 FROM rows WHERE content = ? LIMIT 1", (document.content,)).fetchone()
+            return row is not None
+
+    def name_exists(self, name: str) -> bool:
+        with self._lock:
+            if self._conn is None:
+                return False
+            return self._conn.execute("SELECT 1 FROM rows WHERE name = ? LIMIT 1", (name,)).fetchone() is not None
+
+    def id_exists(self, id: str) -> bool:
+        return id in self._slot_of
+
+    def upsert_available(self) -> bool:
+        return True
+
+    def insert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        self.upsert(documents, filters)
+
+    def upsert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None, batch_size: int = 0) -> None:
+        """Insert or replace documents by id, embedding only those without an embedding."""
+        if not documents:
+            return
+        for doc in documents:
+            if not doc.embedding:
+                doc.embed(embedder=self.embedder)
+        with self._lock:
+            self.create()
+            doc_ids = [doc.id or md5(doc.content.encode()).hexdigest() for doc in documents]
+            free = [slot for slot, doc_id in enumerate(self._ids) if doc_id is None]
+            fresh = len({doc_id for doc_id in doc_ids if doc_id not in self._slot_of})
+            grow = max(0, fresh - len(free))
+            if grow:
+                free.extend(range(len(self._ids), len(self._ids) + grow))
+                self._ids.extend([None] * grow)
+                self._source_codes = np.concatenate([self._source_codes, np.full(grow, -1, dtype=np.int32)])
+            free.reverse()
+            records, slots = [], []
+            for doc, doc_id in zip(documents, doc_ids):
+                slot = self._slot_of.get(doc_id)
+                if slot is None:
+                    slot = free.pop()
+                    self._ids[slot] = doc_id
+                    self._slot_of[doc_id] = slot
+                meta_data = dict(doc.meta_data or {})
+                source_file = meta_data.get("source_file") or ""
+                self._source_codes[slot] = self._source_code(source_file)
+                records.append((slot, doc_id, doc.name, doc.content, json.dumps(meta_data), source_file))
+                slots.append(slot)
+
+            vectors = np.asarray([doc.embedding for doc in documents], dtype=np.float32)
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors /= np.where(norms > 0, norms, 1.0)
+            self._ensure_capacity(len(self._ids))
+            self._matrix[slots] = vectors
+            self._matrix.flush()
+            with self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO rows VALUES (?, ?, ?, ?, ?, ?)", records)
+
+            if self._centroids is not None:
+                self._assign(np.asarray(slots), vectors)
+            alive = len(self._slot_of)
+            if alive >= self.ivf_min_rows and alive > 2 * self._indexed_rows:
+                self.optimize()
+
+    def delete_ids(self, doc_ids: Sequence[str]) -> None:
+        with self._lock:
+            slots = [self._slot_of.pop(doc_id) for doc_id in doc_ids if doc_id in self._slot_of]
+            if not slots:
+                return
+            for slot in slots:
+                self._ids[slot] = None
+                self._source_codes[slot] = -1
+            with self._conn:
+                self._conn.executemany("DELETE FROM rows WHERE slot = ?", [(slot,) for slot in slots])
+
+    def stored_hashes(self, source_file: str) -> Dict[str, Optional[str]]:
+        """id -> meta_data sync_hash of every document from source_file."""
+        with self._lock:
+            if self._conn is None:
+                return {}
+            rows = self._conn.execute(
+                "SELECT id, json_extract(meta_data, '$.sync_hash') FROM rows WHERE source_file = ?", (source_file,)
+            )
+            return {doc_id: sync_hash for doc_id, sync_hash in rows}
+
+    def search(self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        embedding = self.embedder.get_embedding(query)
+        if not embedding:
+            return []
+        return [document for _, document in self.search_by_embedding(embedding, limit, filters)]
+
+    def search_by_embedding(
+        self,
+        embedding: Sequence[float],
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        ids: Optional[Set[str]] = None,
+    ) -> List[Tuple[float, Document]]:
+        """(cosine distance, document) of the nearest limit documents matching filters, optionally among ids, nearest first."""
+        with self._lock:
+            size = len(self._ids)
+            if self._conn is None or not self._slot_of:
+                return []
+            query = np.asarray(embedding, dtype=np.float32)
+            query /= np.linalg.norm(query) or 1.0
+
+            filters = dict(filters or {})
+            mask = self._source_codes[:size] >= 0
+            if "source_file" in filters:
+                code = self._sources.get(filters.pop("source_file"))
+                if code is None:
+                    return []
+                mask &= self._source_codes[:size] == code
+            if ids is not None:
+                allowed = np.zeros(size, dtype=bool)
+                allowed[[self._slot_of[doc_id] for doc_id in ids if doc_id in self._slot_of]] = True
+                mask &= allowed
+            if self._centroids is not None and ids is None:
+                probes = np.argsort(self._centroids @ query)[::-1][:self.nprobe]
+                lists = self._lists[:size]
+                probed = mask & (np.isin(lists, probes) | (lists < 0))
+                # Small or heavily filtered candidate sets fall back to brute force
+                if probed.sum() >= limit:
+                    mask = probed
+
+            slots = np.flatnonzero(mask)
+            if not len(slots):
+                return []
+            scores = self._matrix[slots] @ query
+            order = np.argsort(-scores, kind="stable")
+            hits = []
+            # Filters beyond source_file are checked against stored metadata, in score order
+            for start in range(0, len(order), max(limit * 4, 64)):
+                chunk = order[start:start + max(limit * 4, 64)]
+                for slot, score, row in zip(slots[chunk], scores[chunk], self._rows(slots[chunk])):
+                    if row is None or any(row[2].get(key) != value for key, value in filters.items()):
+                        continue
+                    doc_id, name, meta_data, content = row
+                    hits.append((1.0 - float(score), Document(
+                        id=doc_id, name=name, meta_data=meta_data, content=content, embedder=self.embedder
+                    )))
+                    if len(hits) == limit:
+                        return hits
+            return hits
+
+    def _rows(self, slots: np.ndarray) -> List[Optional[Tuple[str, str, Dict, str]]]:
+        placeholders = ",".join("?" * len(slots))
+        found = {
+            slot: (doc_id, name, json.loads(meta_data), content)
+            for slot, doc_id, name, meta_data, content in self._conn.execute(
+                f"SELECT slot, id, name, meta_data, content FROM rows WHERE slot IN ({placeholders})",
+                [int(slot) for slot in slots],
+            )
+        }
+        return [found.get(int(slot)) for slot in slots]
+
+    # IVF index
+
+    def optimize(self, force_recreate: bool = False) -> None:
+        """Build (or rebuild) the IVF index over the current documents."""
+        with self._lock:
+            slots = np.flatnonzero(self._source_codes >= 0)
+            if not len(slots) or (len(slots) < self.ivf_min_rows and not force_recreate):
+                return
+            vectors = np.asarray(self._matrix[slots])
+            n_lists = max(1, int(np.sqrt(len(slots))))
+            rng = np.random.default_rng(0)
+            centroids = vectors[rng.choice(len(slots), size=n_lists, replace=False)].copy()
+            for _ in range(10):
+                assignment = self._nearest(vectors, centroids)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assignment, vectors)
+                counts = np.bincount(assignment, minlength=n_lists)[:, None]
+                centroids = np.where(counts > 0, sums / np.maximum(counts, 1), centroids)
+                centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+            self._centroids = centroids.astype(np.float32)
+            self._lists = np.full(len(self._ids), -1, dtype=np.int32)
+            self._lists[slots] = self._nearest(vectors, self._centroids)
+            self._indexed_rows = len(slots)
+            np.savez(self.dir / "ivf.npz", centroids=self._centroids, lists=self._lists)
+
+    @staticmethod
+    def _nearest(vectors: np.ndarray, centroids: np.ndarray, chunk: int = 8192) -> np.ndarray:
+        return np.concatenate([
+            np.argmax(vectors[i:i + chunk] @ centroids.T, axis=1) for i in range(0, len(vectors), chunk)
+        ]).astype(np.int32)
+
+    def _assign(self, slots: np.ndarray, vectors: np.ndarray) -> None:
+        if len(self._lists) < len(self._ids):
+            self._lists = np.concatenate([self._lists, np.full(len(self._ids) - len(self._lists), -1, dtype=np.int32)])
+        self._lists[slots] = self._nearest(vectors, self._centroids)
+        np.savez(self.dir / "ivf.npz", centroids=self._centroids, lists=self._lists)
+
+    def _load_index(self) -> None:
+        path = self.dir / "ivf.npz"
+        if not path.exists():
+            return
+        with np.load(path) as index:
+            self._centroids = index["centroids"]
+            lists = index["lists"]
+        self._lists = np.full(len(self._ids), -1, dtype=np.int32)
+        self._lists[:min(len(lists), len(self._ids))] = lists[:len(self._ids)]
+        self._indexed_rows = int((self._lists >= 0).sum())
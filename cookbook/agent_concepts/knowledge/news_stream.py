@@ -0,0 +1,150 @@
+import gzip
+import json
+from pathlib import Path
+from typing import Any, IO, Iterator, Tuple
+
+# Top-level keys of a NewsData response that carry no articles
+NEWSDATA_META_KEYS = {"status", "totalResults", "nextPage"}
+# Characters a JSON number can continue with
+NUMBER_CHARS = "0123456789.eE+-"
+
+
+def source_name(path: str) -> str:
+    """File name without its .json / .jsonl / .gz suffixes, e.g. "Apple" for Apple.jsonl.gz"""
+    name = Path(path).name
+    for suffix in (".gz", ".jsonl", ".json"):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return name
+
+
+class _JsonStream:
+    """
+    Pulls JSON values one at a time out of a text file, reading it in chunks.
+
+    Only the current value and one chunk are held in memory, so an array with
+    thousands of articles can be walked element by element.
+    """
+
+    def __init__(self, f: IO[str], chunk_size: int = 1 << 16):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.dropped = 0  # characters already discarded from the front of buf
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.dropped += self.pos
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def tell(self) -> int:
+        """Characters consumed since the start of the file; unlike pos, not reset by refills."""
+        return self.dropped + self.pos
+
+    def peek(self) -> str:
+        """Next non-whitespace character without consuming it, "" at end of file."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON stream, found {found or 'end of file'!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number cut off by the end of the buffer, e.g. "1." of "1.5", may
+            # continue in the next chunk
+            cut_off = not self.buf[end:].strip(NUMBER_CHARS)
+            if cut_off and isinstance(value, (int, float)) and not isinstance(value, bool) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def items(self) -> Iterator[Tuple[str, "_JsonStream"]]:
+        """Walk a top-level object, yielding (key, stream positioned at its value)."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            self.peek()
+            start = self.tell()
+            yield key, self
+            if self.tell() == start:  # the caller did not consume the value
+                self.value()
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("}")
+            return
+
+    def elements(self) -> Iterator[Any]:
+        """Walk an array one element at a time."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("]")
+            return
+
+
+def iter_articles(path: str) -> Iterator[Tuple[str, Any]]:
+    """
+    Stream (stock, article) pairs from a news file without loading it whole.
+
+    Handles the {ticker: [articles]} shape of stock_news.json, NewsData
+    responses ({"status": ..., "results": [articles]}, whose articles are
+    attributed to the file's source name) and the .jsonl.gz files written by
+    download_data/dl.py. A non-list value under a ticker key is yielded as
+    (ticker, None) so callers can report it.
+    """
+    if path.endswith(".jsonl.gz") or path.endswith(".jsonl"):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield source_name(path), json.loads(line)
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        stream = _JsonStream(f)
+        for key, value in stream.items():
+            if key in NEWSDATA_META_KEYS:
+                continue
+            stock = source_name(path) if key == "results" else key
+            if stream.peek() != "[":
+                yield stock, None
+                continue
+            for article in value.elements():
+                yield stock, article
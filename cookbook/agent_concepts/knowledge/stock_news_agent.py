@@ -1,32 +1,75 @@
+import heapq
 import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Union, Optional
+from typing import Any, Dict, Iterator, List, Union, Optional, Set, Tuple
 from hashlib import md5
 
 from agno.agent import Agent
 from agno.knowledge.agent import AgentKnowledge as KnowledgeBase
 from agno.models.google import Gemini
 from agno.embedder.together import TogetherEmbedder
-from agno.vectordb.pgvector import PgVector
+from agno.vectordb.base import VectorDb
+from agno.vectordb.pgvector import PgVector, HNSW, Ivfflat
 from agno.document import Document
 from rich.prompt import Prompt
 from rich.console import Console
 from rich import print
+from pydantic import PrivateAttr
+
+from sqlalchemy import create_engine, delete, select, text
+
+from api.entity_index import EntityIndex
+from api.metrics import REGISTRY
+from api.providers import Faults
+
+from embedding_cache import CachedEmbedder, EmbeddingCache
+from fake_embedder import FakeEmbedder
+from local_vectordb import LocalVectorDb
+from news_stream import iter_articles, source_name
+from sync_manifest import SyncManifest
 
 console = Console()
 
+DEFAULT_MANIFEST_PATH = Path(__file__).parent / ".cache" / "sync_manifest.json"
+
+# Tables are searched concurrently; the shared engine's pool is sized to match
+SEARCH_WORKERS = int(os.getenv("SEARCH_WORKERS", "8"))
+search_pool = ThreadPoolExecutor(max_workers=SEARCH_WORKERS)
+
+# Texts per embedding request, and requests in flight at once, for uncached documents
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))
+
+# Past this many prefilter candidates an id list costs more than it narrows, so search by vector alone
+PREFILTER_MAX_IDS = int(os.getenv("PREFILTER_MAX_IDS", "5000"))
+
+embed_seconds = REGISTRY.histogram("knowledge_embed_seconds", "Time spent embedding by kind (documents or query)")
+write_seconds = REGISTRY.histogram("knowledge_write_seconds", "Time per vector store write batch by op")
+documents_total = REGISTRY.counter("knowledge_documents_total", "Documents handled by sync by outcome")
+search_seconds = REGISTRY.histogram("knowledge_search_seconds", "Time per search stage")
+
 class StockNewsKnowledge(KnowledgeBase):
-    vector_dbs: List[PgVector]  # Define as class field
+    vector_dbs: List[VectorDb]  # Define as class field
     news_files: List[str]  # Define as class field
+    manifest_path: Optional[str] = None
+    # Lexical index over all documents and the source file of each id, built on first search
+    _lexical: Optional[Tuple[EntityIndex, Dict[str, str]]] = PrivateAttr(default=None)
+    # Held while the lexical index is built or reset, so concurrent searches build it once
+    _lexical_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
 
-    def __init__(self, vector_dbs: List[PgVector], news_files: List[str]):
+    def __init__(self, vector_dbs: List[VectorDb], news_files: List[str], manifest_path: Optional[str] = None):
         """
         Initialize with multiple vector databases and news files.
         
         Args:
-            vector_dbs: List of PgVector instances, one for each news file
+            vector_dbs: List of PgVector or LocalVectorDb instances, one for each news file
             news_files: List of paths to news JSON files
+            manifest_path: Where sync() records the fingerprints of synced files
         """
         if len(vector_dbs) != len(news_files):
             raise ValueError("Number of vector databases must match number of news files")
@@ -35,169 +78,358 @@ class StockNewsKnowledge(KnowledgeBase):
         super().__init__(
             vector_db=vector_dbs[0],
             vector_dbs=vector_dbs,
-            news_files=news_files
+            news_files=news_files,
+            manifest_path=manifest_path
         )
 
-    def load_documents(self, file_index: int = 0) -> List[Dict]:
+    def iter_documents(self, file_index: int = 0) -> Iterator[Dict]:
         """
-        Load stock news articles from a specific JSON file
-        
+        Stream compact document records from a specific news file
+
+        The file is parsed incrementally, so memory use does not grow with its size.
+
         Args:
             file_index: Index of the news file to load
         """
-        with open(self.news_files[file_index], 'r', encoding='utf-8') as f:
-            news_data = json.load(f)
-
-        documents = []
-        # Process each stock's news articles
-        for stock, articles in news_data.items():
-            if not isinstance(articles, list):
+        news_file = self.news_files[file_index]
+        source_file = source_name(news_file)
+        for stock, article in iter_articles(news_file):
+            if article is None:
                 console.print(f"[yellow]Warning: Invalid format for stock {stock}, skipping...[/yellow]")
                 continue
-                
-            for article in articles:
-                if not isinstance(article, dict):
-                    console.print(f"[yellow]Warning: Invalid article format for stock {stock}, skipping...[/yellow]")
-                    continue
-                    
-                # Create a document for each article with metadata
-                try:
-                    doc = {
-                        "content": f"Title: {article.get('title', 'No Title')}\n\nDescription: {article.get('description', '')}\n\nStock: {stock}",
-                        "metadata": {
-                            "stock": stock,
-                            "title": article.get("title", "No Title"),
-                            "link": article.get("link", ""),
-                            "questions": article.get("questions", []),
-                            "published_date": article.get("pubDate", ""),
-                            "source_file": Path(self.news_files[file_index]).stem  # Add source file info
-                        }
-                    }
-                    documents.append(doc)
-                except Exception as e:
-                    console.print(f"[red]Error processing article for stock {stock}: {e}[/red]")
-                    continue
-        
-        return documents
-
-    def load_all(self, recreate: bool = False) -> None:
-        """Load all news files into their respective vector databases"""
-        for i, vector_db in enumerate(self.vector_dbs):
-            console.print(f"[bold blue]Loading news data from {self.news_files[i]} into {vector_db.table_name}...[/bold blue]")
-            # Set current vector db for parent class methods
-            self._vector_db = vector_db
-            documents = self.load_documents(i)
-            if recreate:
+            if not isinstance(article, dict):
+                console.print(f"[yellow]Warning: Invalid article format for stock {stock}, skipping...[/yellow]")
+                continue
+
+            # Create a document for each article with metadata
+            try:
+                content = f"Title: {article.get('title', 'No Title')}\n\nDescription: {article.get('description', '')}\n\nStock: {stock}"
+                # Stable per-article id, so a re-sync updates the row in place
+                identity = article.get("article_id") or article.get("link") or content
+                metadata = {
+                    "stock": stock,
+                    "title": article.get("title", "No Title"),
+                    "link": article.get("link", ""),
+                    "questions": article.get("questions", []),
+                    "published_date": article.get("pubDate", ""),
+                    "source_file": source_file  # Add source file info
+                }
+                metadata["sync_hash"] = md5((content + json.dumps(metadata, sort_keys=True)).encode()).hexdigest()
+                yield {
+                    "id": f"{source_file}_{md5(f'{stock}|{identity}'.encode()).hexdigest()}",
+                    "content": content,
+                    "metadata": metadata
+                }
+            except Exception as e:
+                console.print(f"[red]Error processing article for stock {stock}: {e}[/red]")
+                continue
+
+    def load_documents(self, file_index: int = 0) -> List[Dict]:
+        """Load all stock news articles from a specific news file"""
+        return list(self.iter_documents(file_index))
+
+    def load_all(self, recreate: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Load all news files into their respective vector databases, rebuilding the tables if recreate"""
+        if recreate:
+            manifest = SyncManifest(self.manifest_path or DEFAULT_MANIFEST_PATH)
+            for vector_db in {id(db): db for db in self.vector_dbs}.values():
+                vector_db.drop()
+                manifest.forget(vector_db.table_name)
+        return self.sync()
+
+    def sync(self, batch_size: int = 1000) -> Dict[str, Dict[str, Any]]:
+        """
+        Bring each table in line with its news files.
+
+        Returns per source file (news file name without its .json / .jsonl.gz
+        suffixes) its table and how many documents were upserted, deleted and
+        left unchanged. Several sources share a table with
+        NEWS_TABLE_MODE=partitioned, so their counts are also printed summed
+        per table.
+
+        A company's legacy .json and its downloaded .jsonl.gz share a source,
+        so their documents are diffed together: only new or changed ones are
+        embedded and upserted, and ones that left every file of the source are
+        deleted, batch_size rows per transaction. A source whose files all
+        match their manifest fingerprints is skipped without being parsed.
+
+        Files are streamed, so besides one batch of documents only the ids and
+        hashes are held in memory.
+        """
+        manifest = SyncManifest(self.manifest_path or DEFAULT_MANIFEST_PATH)
+        embedders = {id(db.embedder): db.embedder for db in self.vector_dbs}.values()
+        for embedder in embedders:
+            if isinstance(embedder, CachedEmbedder):
+                embedder.reset_stats()  # report this load only
+        groups: Dict[Tuple[str, str], List[int]] = {}
+        for i, (news_file, vector_db) in enumerate(zip(self.news_files, self.vector_dbs)):
+            groups.setdefault((vector_db.table_name, source_name(news_file)), []).append(i)
+        report = {}
+        for (_, source_file), indices in groups.items():
+            vector_db = self.vector_dbs[indices[0]]
+            files = ", ".join(self.news_files[i] for i in indices)
+            if not vector_db.exists():
                 vector_db.create()
-            
-            # Convert documents to Document objects with all required fields
-            doc_objects = []
-            for idx, doc in enumerate(documents):
-                try:
-                    # Create a unique ID using file index, document index, and content hash
-                    content_hash = md5(doc["content"].encode()).hexdigest()
-                    doc_id = f"{i}_{idx}_{content_hash[:8]}"
-                    # Create a name from the title in metadata or use a fallback
-                    doc_name = doc["metadata"].get("title", f"Document_{doc_id}")
-                    
-                    # Get embedding for the document
-                    embedding = vector_db.embedder.get_embedding(doc["content"])
-                    
-                    # Create document with all required fields
-                    doc_obj = Document(
-                        id=doc_id,
-                        name=doc_name,
-                        content=doc["content"],
-                        meta_data=doc["metadata"],
-                        embedder=vector_db.embedder,
-                        embedding=embedding  # Use pre-computed embedding
-                    )
-                    doc_objects.append(doc_obj)
-                except Exception as e:
-                    console.print(f"[red]Error creating document {idx}: {str(e)}[/red]")
-                    continue
-            
-            if doc_objects:  # Only attempt insert if we have valid documents
-                try:
-                    vector_db.insert(doc_objects)
-                    console.print(f"[bold green]Loaded {len(doc_objects)} documents into {vector_db.table_name}[/bold green]")
-                except Exception as e:
-                    console.print(f"[red]Error inserting documents into {vector_db.table_name}: {str(e)}[/red]")
-            else:
-                console.print(f"[yellow]No valid documents to insert into {vector_db.table_name}[/yellow]")
-
-    def search(self, query: str, **kwargs) -> List[Dict]:
-        """Search across all vector databases and combine results"""
-        all_results = []
-        for vector_db in self.vector_dbs:
-            # Set current vector db for search
-            self._vector_db = vector_db
-            results = super().search(query, **kwargs)
-            all_results.extend(results)
-        
-        # Sort combined results by relevance score
-        all_results.sort(key=lambda x: x.get('score', 0), reverse=True)
-        return all_results[:kwargs.get('limit', 5)]  # Return top N results
+                manifest.forget(vector_db.table_name)
+            self._ensure_source_index(vector_db)
+            checks = {i: manifest.check(vector_db.table_name, self.news_files[i]) for i in indices}
+            if all(unchanged for unchanged, _ in checks.values()):
+                console.print(f"[dim]{files} unchanged since last sync, skipping[/dim]")
+                report[source_file] = {"table": vector_db.table_name, "upserted": 0, "deleted": 0, "unchanged": 0}
+                continue
 
-def get_table_name(file_path: str) -> str:
-    """Generate a valid table name from a file path"""
-    return f"stock_news_{Path(file_path).stem.lower().replace('-', '_')}"
+            console.print(f"[bold blue]Syncing news data from {files} into {vector_db.table_name}...[/bold blue]")
+            started = time.perf_counter()
+            stored = self._stored_hashes(vector_db, source_file)
+            seen = set()
+            batch, upserted = [], 0
+            try:
+                for i in indices:
+                    for doc in self.iter_documents(i):
+                        if doc["id"] in seen:
+                            continue
+                        seen.add(doc["id"])
+                        if stored.get(doc["id"]) != doc["metadata"]["sync_hash"]:
+                            batch.append(doc)
+                        if len(batch) >= batch_size:
+                            self._upsert(vector_db, batch)
+                            upserted += len(batch)
+                            batch = []
+                self._upsert(vector_db, batch)
+                upserted += len(batch)
+                vanished = [doc_id for doc_id in stored if doc_id not in seen]
+                self._delete(vector_db, vanished, batch_size)
+            except Exception as e:
+                # Leave the manifest alone so the next sync retries these files
+                console.print(f"[red]Error syncing {vector_db.table_name}: {str(e)}[/red]")
+                continue
+            for i, (_, fingerprint) in checks.items():
+                manifest.record(vector_db.table_name, self.news_files[i], fingerprint)
+            if upserted or vanished:
+                with self._lexical_lock:
+                    self._lexical = None
+            elapsed = time.perf_counter() - started
+            report[source_file] = {
+                "table": vector_db.table_name,
+                "upserted": upserted,
+                "deleted": len(vanished),
+                "unchanged": len(seen) - upserted,
+                "seconds": round(elapsed, 3),
+            }
+            for outcome in ("upserted", "deleted", "unchanged"):
+                documents_total.inc(report[source_file][outcome], outcome=outcome)
+            console.print(f"[bold green]{vector_db.table_name} ({source_file}): {upserted} upserted, {len(vanished)} deleted, "
+                          f"{len(seen) - upserted} unchanged in {elapsed:.1f}s "
+                          f"({len(seen) / elapsed if elapsed else 0:.0f} docs/s)[/bold green]")
 
-def get_summary_and_follow_up_questions(prompt: str) -> Tuple[str, List[str]]:
+        totals: Dict[str, Dict[str, int]] = {}
+        for counts in report.values():
+            table = totals.setdefault(counts["table"], {"files": 0, "upserted": 0, "deleted": 0, "unchanged": 0})
+            table["files"] += 1
+            for outcome in ("upserted", "deleted", "unchanged"):
+                table[outcome] += counts[outcome]
+        for table_name, table in totals.items():
+            if table["files"] > 1:
+                console.print(f"[bold green]{table_name} total over {table['files']} files: {table['upserted']} upserted, "
+                              f"{table['deleted']} deleted, {table['unchanged']} unchanged[/bold green]")
 
-def generate_answer(self, article: Dict, prompt: str) -> List[str]:
-        """Generate insightful questions about a news article using Gemini."""
-        max_retries = 3
-        retry_delay = 2  # seconds
-        
-        for attempt in range(max_retries):
+        for embedder in embedders:
+            if isinstance(embedder, CachedEmbedder):
+                console.print(f"[bold blue]{embedder.report()}[/bold blue]")
+        summary = REGISTRY.format_summary("knowledge_")
+        if summary:
+            console.print(f"[dim]{summary}[/dim]")
+        return report
+
+    @staticmethod
+    def _ensure_source_index(vector_db: VectorDb) -> None:
+        """Index meta_data->>'source_file', which scopes syncs and searches in a shared table."""
+        if isinstance(vector_db, LocalVectorDb):
+            return  # keeps source_file as a column already
+        table = vector_db.table
+        with vector_db.Session() as sess, sess.begin():
+            sess.execute(text(
+                f"CREATE INDEX IF NOT EXISTS idx_{table.name}_source_file "
+                f"ON {table.fullname} ((meta_data->>'source_file'))"
+            ))
+
+    @staticmethod
+    def _stored_hashes(vector_db: VectorDb, source_file: str) -> Dict[str, Optional[str]]:
+        """id -> sync hash of every row a source file put into a table."""
+        if isinstance(vector_db, LocalVectorDb):
+            return vector_db.stored_hashes(source_file)
+        table = vector_db.table
+        with vector_db.Session() as sess:
+            rows = sess.execute(
+                select(table.c.id, table.c.meta_data["sync_hash"].astext)
+                .where(table.c.meta_data["source_file"].astext == source_file)
+            )
+            return {doc_id: sync_hash for doc_id, sync_hash in rows}
+
+    @staticmethod
+    def _upsert(vector_db: VectorDb, batch: List[Dict]) -> None:
+        """Embed and upsert one batch of documents in a single transaction."""
+        if batch:
+            # Embed in batches; with a CachedEmbedder unchanged content is never re-embedded
+            contents = [doc["content"] for doc in batch]
+            with embed_seconds.time(kind="documents"):
+                if isinstance(vector_db.embedder, CachedEmbedder):
+                    embeddings = vector_db.embedder.embed_batch(contents)
+                else:
+                    embeddings = [vector_db.embedder.get_embedding(content) for content in contents]
+            doc_objects = [
+                Document(
+                    id=doc["id"],
+                    name=doc["metadata"].get("title", f"Document_{doc['id']}"),
+                    content=doc["content"],
+                    meta_data=doc["metadata"],
+                    embedder=vector_db.embedder,
+                    embedding=embedding
+                )
+                for doc, embedding in zip(batch, embeddings)
+            ]
+            with write_seconds.time(op="upsert"):
+                vector_db.upsert(doc_objects, batch_size=len(doc_objects))
+
+    @staticmethod
+    def _delete(vector_db: VectorDb, doc_ids: List[str], batch_size: int) -> None:
+        if isinstance(vector_db, LocalVectorDb):
+            with write_seconds.time(op="delete"):
+                vector_db.delete_ids(doc_ids)
+            return
+        table = vector_db.table
+        for start in range(0, len(doc_ids), batch_size):
+            with write_seconds.time(op="delete"), vector_db.Session() as sess, sess.begin():
+                sess.execute(delete(table).where(table.c.id.in_(doc_ids[start:start + batch_size])))
+
+    def search(
+        self, query: str, num_documents: Optional[int] = None, filters: Optional[Dict[str, Any]] = None, **kwargs
+    ) -> List[Document]:
+        """
+        Search all tables concurrently and merge their results.
+
+        The query is embedded once. Each table returns its own top
+        num_documents by cosine distance, and the sorted per-table lists are
+        k-way merged into the overall top num_documents. filters match against
+        document metadata. A source_file filter also skips tables that cannot
+        contain that file.
+
+        When the query names a company or ticker, the entity/BM25 index first
+        narrows each table to the documents that can match (prefilter=False
+        turns this off), and tables with no candidates are not queried. More
+        than PREFILTER_MAX_IDS candidates are not passed on as an id list;
+        those searches use the vectors alone.
+        """
+        limit = num_documents or kwargs.get("limit") or self.num_documents
+        source_file = (filters or {}).get("source_file")
+        tables, table_sources = {}, {}
+        for news_file, vector_db in zip(self.news_files, self.vector_dbs):
+            if source_file is None or source_name(news_file) == source_file:
+                tables[id(vector_db)] = vector_db
+                table_sources.setdefault(id(vector_db), set()).add(source_name(news_file))
+        if not tables:
+            return []
+
+        candidates = {}
+        if kwargs.get("prefilter", True):
+            with search_seconds.time(stage="prefilter"):
+                index, sources = self._lexical_index()
+                matches = index.prefilter(query)
+                if matches and len(matches) <= PREFILTER_MAX_IDS:
+                    for key, stems in table_sources.items():
+                        candidates[key] = {doc_id for doc_id in matches if sources.get(doc_id) in stems}
+                    tables = {key: vector_db for key, vector_db in tables.items() if candidates[key]}
+
+        embeddings = {}
+        with embed_seconds.time(kind="query"):
+            for vector_db in tables.values():
+                if id(vector_db.embedder) not in embeddings:
+                    embeddings[id(vector_db.embedder)] = vector_db.embedder.get_embedding(query)
+
+        def run(vector_db: VectorDb) -> List[Tuple[float, Document]]:
             try:
-                prompt = f"""
-                Based on this news article:
-                Title: {article['title']}
-                Description: {article.get('description', '')}
-
-                and this
-                
-                Generate 3 insightful, analytical questions that an investor might ask about the implications of this news.
-                Return only a Python list of strings, with each question being a complete sentence ending with a question mark.
-                Focus on market impact, business strategy, and future implications.
-                Example format: ["Question 1?", "Question 2?", "Question 3?"]
-                """
-                
-                response = self.model.generate_content(prompt)
-                response_text = response.text.strip()
-                # Remove any markdown code block indicators
-                response_text = response_text.replace('```python', '').replace('```', '')
-                # Safely evaluate the string as a Python list
-                try:
-                    questions = eval(response_text)
-                    if isinstance(questions, list) and len(questions) >= 3:
-                        return questions[:3]
-                except:
-                    # If eval fails, try to extract questions using string manipulation
-                    questions = [q.strip() for q in response_text.split('?') if q.strip()]
-                    questions = [f"{q}?" for q in questions]
-                    if questions:
-                        return questions[:3]
-                
-                # If we get here, use default questions
-                raise ValueError("Could not parse questions from response")
-                
+                with search_seconds.time(stage="table"):
+                    return self._search_table(
+                        vector_db, embeddings[id(vector_db.embedder)], limit, filters, candidates.get(id(vector_db))
+                    )
             except Exception as e:
-                print(f"Error generating questions (attempt {attempt + 1}/{max_retries}): {str(e)}")
-                if "429" in str(e):  # Rate limit error
-                    time.sleep(retry_delay * (attempt + 1))  # Exponential backoff
-                    continue
-                
-                if attempt == max_retries - 1:  # Last attempt
-                    return [
-                        "What are the potential market implications of this news?",
-                        "How might this affect the company's competitive position?",
-                        "What could be the long-term impact on the industry?"
-                    ]
-            
-            time.sleep(1)  # Small delay between successful calls
+                console.print(f"[red]Error searching {vector_db.table_name}: {str(e)}[/red]")
+                return []
+
+        if not tables:
+            return []
+        with search_seconds.time(stage="tables"):
+            if len(tables) == 1:
+                per_table = [run(next(iter(tables.values())))]
+            else:
+                per_table = list(search_pool.map(run, tables.values()))
+        merged = heapq.merge(*per_table, key=lambda hit: hit[0])
+        return [document for _, document in islice(merged, limit)]
+
+    def _lexical_index(self) -> Tuple[EntityIndex, Dict[str, str]]:
+        """
+        The entity/BM25 index over every news file, streamed in on first use.
+
+        Concurrent first searches wait for one build instead of each streaming
+        every file, and a sync that changes a table waits for a running build
+        before resetting it, so a stale index is never left cached.
+        """
+        lexical = self._lexical
+        if lexical is not None:
+            return lexical
+        with self._lexical_lock:
+            if self._lexical is not None:
+                return self._lexical
+            index, sources = EntityIndex(), {}
+            for i, news_file in enumerate(self.news_files):
+                for doc in self.iter_documents(i):
+                    index.add(doc["id"], doc["content"])
+                    sources[doc["id"]] = source_name(news_file)
+            self._lexical = (index, sources)
+            return self._lexical
+
+    @staticmethod
+    def _search_table(
+        vector_db: VectorDb,
+        embedding: List[float],
+        limit: int,
+        filters: Optional[Dict[str, Any]],
+        ids: Optional[Set[str]] = None,
+    ) -> List[Tuple[float, Document]]:
+        """(cosine distance, document) of a table's nearest limit rows, optionally among ids, nearest first."""
+        if isinstance(vector_db, LocalVectorDb):
+            return vector_db.search_by_embedding(embedding, limit, filters, ids)
+        table = vector_db.table
+        distance = table.c.embedding.cosine_distance(embedding).label("distance")
+        stmt = select(
+            table.c.id, table.c.name, table.c.meta_data, table.c.content, table.c.usage, distance
+        )
+        if filters:
+            stmt = stmt.where(table.c.meta_data.contains(filters))
+        if ids is not None:
+            stmt = stmt.where(table.c.id.in_(ids))
+        stmt = stmt.order_by(distance).limit(limit)
+        with vector_db.Session() as sess, sess.begin():
+            if isinstance(vector_db.vector_index, HNSW):
+                sess.execute(text(f"SET LOCAL hnsw.ef_search = {vector_db.vector_index.ef_search}"))
+            elif isinstance(vector_db.vector_index, Ivfflat):
+                sess.execute(text(f"SET LOCAL ivfflat.probes = {vector_db.vector_index.probes}"))
+            rows = sess.execute(stmt).fetchall()
+        return [
+            (row.distance, Document(
+                id=row.id,
+                name=row.name,
+                meta_data=row.meta_data,
+                content=row.content,
+                embedder=vector_db.embedder,
+                usage=row.usage,
+            ))
+            for row in rows
+        ]
+
+def get_table_name(file_path: str) -> str:
+    """Generate a valid table name from a file path"""
+    return f"stock_news_{source_name(file_path).lower().replace('-', '_').replace('.', '_')}"
 
 
 def main():
@@ -206,13 +438,15 @@ def main():
     news_files = [
         str(base_path / "download_data" / "data" / file)
         for file in os.listdir(base_path / "download_data" / "data")
-        if file.endswith('.json')
+        if file.endswith('.json') or file.endswith('.jsonl.gz')
     ]
-    news_files = news_files[:3]  #FIXME
+
+    # EMBEDDER=fake embeds offline and deterministically, e.g. for benchmarks
+    fake_embedder = os.getenv("EMBEDDER") == "fake"
 
     # Get Together API key
     together_api_key = os.getenv("TOGETHER_API_KEY")
-    if not together_api_key:
+    if not together_api_key and not fake_embedder:
         together_api_key = Prompt.ask(
             "[bold yellow]Please enter your Together API key[/bold yellow]",
             password=True
@@ -228,16 +462,51 @@ def main():
         )
         os.environ["GEMINI_API_KEY"] = gemini_api_key
 
-    # Initialize vector databases with TogetherEmbedder
-    embedder = TogetherEmbedder(api_key=together_api_key)
-    vector_dbs = [
-        PgVector(
-            table_name=get_table_name(file),
-            db_url="postgresql+psycopg://ai:ai@localhost:5532/ai",
-            embedder=embedder
+    # Initialize vector databases with TogetherEmbedder, cached on disk so
+    # reloading unchanged news makes no embedding calls
+    embedder = CachedEmbedder(
+        embedder=FakeEmbedder(faults=Faults.from_env()) if fake_embedder else TogetherEmbedder(api_key=together_api_key),
+        cache=EmbeddingCache(Path(__file__).parent / ".cache" / "embeddings.sqlite"),
+        batch_size=EMBEDDING_BATCH_SIZE,
+        concurrency=EMBEDDING_CONCURRENCY,
+    )
+    if os.getenv("VECTOR_STORE", "pgvector") == "local":
+        # In-process store under .cache/vectors; needs no database
+        local_path = Path(__file__).parent / ".cache" / "vectors"
+        if os.getenv("NEWS_TABLE_MODE", "per_file") == "partitioned":
+            shared_db = LocalVectorDb(table_name="stock_news_all", path=local_path, embedder=embedder)
+            vector_dbs = [shared_db] * len(news_files)
+        else:
+            # A company's .json and .jsonl.gz files share one table
+            tables = {
+                get_table_name(file): LocalVectorDb(table_name=get_table_name(file), path=local_path, embedder=embedder)
+                for file in news_files
+            }
+            vector_dbs = [tables[get_table_name(file)] for file in news_files]
+    else:
+        # One connection pool shared by every table, sized for concurrent searches
+        db_engine = create_engine(
+            "postgresql+psycopg://ai:ai@localhost:5532/ai",
+            pool_size=SEARCH_WORKERS,
+            max_overflow=SEARCH_WORKERS,
+            pool_pre_ping=True,
         )
-        for file in news_files
-    ]
+        if os.getenv("NEWS_TABLE_MODE", "per_file") == "partitioned":
+            # A single table for all files, partitioned by meta_data source_file,
+            # so search cost stays flat as files are added
+            shared_db = PgVector(table_name="stock_news_all", db_engine=db_engine, embedder=embedder)
+            vector_dbs = [shared_db] * len(news_files)
+        else:
+            # A company's .json and .jsonl.gz files share one table
+            tables = {
+                get_table_name(file): PgVector(
+                    table_name=get_table_name(file),
+                    db_engine=db_engine,
+                    embedder=embedder
+                )
+                for file in news_files
+            }
+            vector_dbs = [tables[get_table_name(file)] for file in news_files]
     
     print('News files:', news_files)
 
@@ -247,14 +516,11 @@ def main():
         news_files=news_files
     )
 
-    # Check if data needs to be loaded
-    should_reload = False
-    for vector_db in vector_dbs:
-        if not vector_db.exists():
-            should_reload = True
-            break
-    
-    if should_reload or Prompt.ask(
+    # Tables for newly added files are created by sync(), so only a full
+    # rebuild drops existing ones
+    all_exist = all(vector_db.exists() for vector_db in {id(db): db for db in vector_dbs}.values())
+
+    if all_exist and Prompt.ask(
         "[bold yellow]Do you want to reload the news data?[/bold yellow]", 
         choices=["y", "n"], 
         default="n"
@@ -263,7 +529,8 @@ def main():
         knowledge_base.load_all(recreate=True)
         console.print("[bold green]All data loaded successfully![/bold green]")
     else:
-        knowledge_base.load_all(recreate=False)
+        # Only files that changed since the last run are read and diffed
+        knowledge_base.sync()
 
 
 
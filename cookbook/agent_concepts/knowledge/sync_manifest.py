@@ -0,0 +1,64 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Tuple
+
+Fingerprint = Dict[str, object]
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SyncManifest:
+    """
+    Fingerprints of the source files last synced into each table.
+
+    A file whose size and mtime match its fingerprint is treated as unchanged
+    without being read. If only the mtime moved, the file's sha256 decides.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._tables: Dict[str, Dict[str, Fingerprint]] = {}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._tables = json.load(f)
+
+    def check(self, table: str, source: str) -> Tuple[bool, Fingerprint]:
+        """(unchanged, current fingerprint) of source as last synced into table."""
+        stat = os.stat(source)
+        with self._lock:
+            entry = self._tables.get(table, {}).get(str(source))
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return True, entry
+        fingerprint = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": file_sha256(Path(source))}
+        if entry and entry["sha256"] == fingerprint["sha256"]:
+            self.record(table, source, fingerprint)
+            return True, fingerprint
+        return False, fingerprint
+
+    def record(self, table: str, source: str, fingerprint: Fingerprint) -> None:
+        with self._lock:
+            self._tables.setdefault(table, {})[str(source)] = fingerprint
+            self._save()
+
+    def forget(self, table: str) -> None:
+        """Drop every fingerprint of table, e.g. after it was recreated."""
+        with self._lock:
+            if self._tables.pop(table, None) is not None:
+                self._save()
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._tables, f, indent=2)
+        os.replace(tmp, self.path)
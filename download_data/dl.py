@@ -1,19 +1,210 @@
+import argparse
+import gzip
+import json
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
 import requests
-#companies = ['NVDA', 'TSLA', 'META', 'AAPL', 'MSFT', 'PLTR', 'SMCI', 'AMZN',
-#'#APP', 'INTC', 'COIN', 'MSTR', 'AVGO', 'AMD', 'ABNB', 'NFLX', 'PANW', 'LLY',
-#'DKNG', 'HOOD', 'GOOG', 'HIMS', 'MRK', 'PG', 'MU', 'AMAT', 'V', 'SOUN', 'DELL',
-#'TWLO', 'UNH', 'CRM', 'ROKU', 'XOM', 'RDDT']
-companies = ['Nvidia', 'Tesla', 'Meta', 'Apple', 'Microsoft', 'Palantir', 'Supermicro',
-'Amazon', 'AppLovin', 'Intel', 'Coinbase', 'Microstrategy', 'Broadcom', 'AMD',
-'Airbnb', 'Netflix', 'PaloAlto', 'Lilly', 'DraftKings', 'Robinhood', 'Google',
-'Hims', 'Merck', 'ProcterGamble', 'Micron', 'AppliedMaterials', 'Visa',
-'SoundHound', 'Dell', 'Twilio', 'UnitedHealth', 'Salesforce', 'Roku', 'Exxon',
-'Reddit']
-
-url = 'https://newsdata.io/api/1/latest?apikey=pub_69774246b6e09534dedf7763a7aeb10334db6&q={}'
-
-for company in companies:
-  response = requests.get(url.format(company))
-  with open('data/{}.json'.format(company), 'wb') as outf:
-    outf.write(response.content)
-    
\ No newline at end of file
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Company name used as the search query, and its ticker. The API's entity
+# index reads the same file.
+COMPANIES_FILE = Path(__file__).parent / 'companies.json'
+with open(COMPANIES_FILE, 'r', encoding='utf-8') as f:
+  COMPANY_TICKERS = json.load(f)
+companies = list(COMPANY_TICKERS)
+
+BASE_URL = 'https://newsdata.io/api/1/latest'
+API_KEY = os.getenv('NEWSDATA_API_KEY', 'pub_69774246b6e09534dedf7763a7aeb10334db6')
+DATA_DIR = Path(__file__).parent / 'data'
+
+
+class RateLimiter:
+  """Spaces requests at least 1 / per_second seconds apart across all threads."""
+
+  def __init__(self, per_second):
+    self.interval = 1.0 / per_second if per_second else 0.0
+    self._next = time.monotonic()
+    self._lock = threading.Lock()
+
+  def wait(self):
+    with self._lock:
+      now = time.monotonic()
+      slot = max(now, self._next)
+      self._next = slot + self.interval
+    if slot > now:
+      time.sleep(slot - now)
+
+
+def make_session(workers):
+  """One pooled session so every company reuses the same keep-alive connections."""
+  session = requests.Session()
+  retry = Retry(total=5, backoff_factor=2, status_forcelist=[429, 500, 502, 503, 504], respect_retry_after_header=True)
+  adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=retry)
+  session.mount('http://', adapter)
+  session.mount('https://', adapter)
+  return session
+
+
+def read_articles(path):
+  """
+  Stream articles from a .jsonl.gz file written by this script. A trailing
+  member cut short by a killed run ends the stream instead of failing it.
+  """
+  if not path.exists():
+    return
+  try:
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+      for line in f:
+        if line.strip():
+          try:
+            article = json.loads(line)
+          except json.JSONDecodeError:
+            return  # the partial last line of a truncated member
+          yield article
+  except (EOFError, zlib.error, gzip.BadGzipFile):
+    return
+
+
+def repair(path, size):
+  """
+  Drop what a killed run left after the last complete gzip member: cut the
+  file back to the checkpointed size or, without one, rewrite it with the
+  articles that can still be read. Returns the file size afterwards.
+  """
+  if not path.exists():
+    return None
+  if size is not None:
+    if path.stat().st_size > size:
+      with open(path, 'r+b') as f:
+        f.truncate(size)
+    return path.stat().st_size
+  try:
+    with gzip.open(path, 'rb') as f:
+      while f.read(1 << 20):
+        pass
+  except (EOFError, zlib.error, gzip.BadGzipFile):
+    articles = list(read_articles(path))
+    tmp = path.with_suffix('.tmp')
+    with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+      for article in articles:
+        f.write(json.dumps(article, ensure_ascii=False) + '\n')
+    os.replace(tmp, path)
+  return path.stat().st_size
+
+
+def known_ids(company, data_dir):
+  ids = {article.get('article_id') for article in read_articles(data_dir / f'{company}.jsonl.gz')}
+  legacy = data_dir / f'{company}.json'
+  if legacy.exists():
+    with open(legacy, 'r', encoding='utf-8') as f:
+      results = json.load(f).get('results')
+    # Some legacy files hold an error response, whose results is an object
+    if isinstance(results, list):
+      ids.update(article.get('article_id') for article in results if isinstance(article, dict))
+  ids.discard(None)
+  return ids
+
+
+def load_checkpoint(path):
+  if path.exists():
+    with open(path, 'r', encoding='utf-8') as f:
+      return json.load(f)
+  return {'next_page': None, 'pages': 0, 'articles': 0, 'done': False}
+
+
+def save_checkpoint(path, checkpoint):
+  checkpoint['updated_at'] = time.time()
+  tmp = path.with_suffix('.tmp')
+  with open(tmp, 'w', encoding='utf-8') as f:
+    json.dump(checkpoint, f)
+  os.replace(tmp, path)
+
+
+def download_company(company, session, limiter, args):
+  """
+  Follow nextPage cursors for one company, appending new articles to
+  data/<company>.jsonl.gz and checkpointing after every page.
+
+  An unfinished checkpoint resumes at its saved cursor. After a finished run
+  the next run starts again from the newest page and stops at the first page
+  with nothing new on it.
+  """
+  data_dir = Path(args.data_dir)
+  checkpoint_path = data_dir / '.checkpoints' / f'{company}.json'
+  checkpoint = load_checkpoint(checkpoint_path)
+  if checkpoint['done']:
+    checkpoint = {'next_page': None, 'pages': 0, 'articles': 0, 'done': False, 'bytes': checkpoint.get('bytes')}
+  output = data_dir / f'{company}.jsonl.gz'
+  checkpoint['bytes'] = repair(output, checkpoint.get('bytes'))
+  seen = known_ids(company, data_dir)
+  added = 0
+
+  for _ in range(args.max_pages):
+    params = {'apikey': args.api_key, 'q': company}
+    if checkpoint['next_page']:
+      params['page'] = checkpoint['next_page']
+    limiter.wait()
+    response = session.get(args.base_url, params=params, timeout=args.timeout)
+    response.raise_for_status()
+    data = response.json()
+    if data.get('status') != 'success':
+      raise RuntimeError(f"{company}: {data.get('results') or data.get('message') or data}")
+
+    fresh = [a for a in data.get('results') or [] if a.get('article_id') not in seen]
+    if fresh:
+      # Every flush appends one gzip member and the checkpoint records the
+      # file size after it. A run killed mid-write leaves a partial member
+      # that the next run trims off before resuming from the same page.
+      with gzip.open(output, 'at', encoding='utf-8') as f:
+        for article in fresh:
+          f.write(json.dumps(article, ensure_ascii=False) + '\n')
+      seen.update(a['article_id'] for a in fresh)
+      added += len(fresh)
+      checkpoint['bytes'] = output.stat().st_size
+
+    checkpoint['next_page'] = data.get('nextPage')
+    checkpoint['pages'] += 1
+    checkpoint['articles'] += len(fresh)
+    checkpoint['total_results'] = data.get('totalResults')
+    checkpoint['done'] = not checkpoint['next_page'] or not fresh
+    save_checkpoint(checkpoint_path, checkpoint)
+    if checkpoint['done']:
+      break
+
+  return added
+
+
+def main():
+  parser = argparse.ArgumentParser(description='Download NewsData articles for every company.')
+  parser.add_argument('companies', nargs='*', default=companies, help='Companies to download (default: all)')
+  parser.add_argument('--base-url', default=BASE_URL, help='API endpoint; point it at a local mock server for testing')
+  parser.add_argument('--api-key', default=API_KEY)
+  parser.add_argument('--data-dir', default=str(DATA_DIR))
+  parser.add_argument('--workers', type=int, default=4, help='Companies downloaded concurrently')
+  parser.add_argument('--max-pages', type=int, default=10, help='Pages per company per run (each page costs one credit)')
+  parser.add_argument('--rate', type=float, default=1.0, help='Requests per second across all workers')
+  parser.add_argument('--timeout', type=float, default=30.0)
+  args = parser.parse_args()
+
+  (Path(args.data_dir) / '.checkpoints').mkdir(parents=True, exist_ok=True)
+  session = make_session(args.workers)
+  limiter = RateLimiter(args.rate)
+
+  with ThreadPoolExecutor(max_workers=args.workers) as pool:
+    futures = {pool.submit(download_company, company, session, limiter, args): company for company in args.companies}
+    for future in as_completed(futures):
+      company = futures[future]
+      try:
+        print(f'{company}: {future.result()} new articles')
+      except Exception as e:
+        print(f'{company}: failed ({e}); rerun to resume from the last checkpoint')
+
+
+if __name__ == '__main__':
+  main()
@@ -11,15 +11,16 @@ import {
 } from "@/components/ui/sidebar";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
-import stockNewsData from "../../api/stock_news.json";
 
-// Define the type for our news article
+// Compact article projection served by /api/news
 interface NewsArticle {
-  source_name: string;
+  id: string;
   title: string;
-  description: string;
+  link: string;
+  source: string | null;
+  summary: string;
   pubDate: string;
-  questions: string[];  // Add questions field to interface
+  questions: string[];
 }
 
 const initialSymbols = ["AAPL", "MSFT", "GOOGL", "TSLA", "NVDA", "META"];
@@ -57,8 +58,11 @@ const Index = () => {
     try {
       const response = await fetch(`http://localhost:8000/api/stocks?symbols=${symbols.join(',')}`);
       const data = await response.json();
-      if (Array.isArray(data)) {
-        setStocks(data);
+      if (Array.isArray(data.results)) {
+        if (data.failed?.length) {
+          console.warn('Some symbols could not be fetched:', data.failed);
+        }
+        setStocks(data.results);
       } else {
         console.error('Invalid data format received:', data);
         setStocks([]);
@@ -71,42 +75,45 @@ const Index = () => {
     }
   };
 
-  const fetchNewsData = () => {
+  const fetchNewsData = async (symbols: string[]) => {
     try {
+      const response = await fetch(`http://localhost:8000/api/news?tickers=${symbols.join(',')}&limit=3`);
+      const data: Record<string, NewsArticle[]> = await response.json();
       // Process news data by stock symbol
       const processedNewsBySymbol: Record<string, any[]> = {};
       
-      // Process each stock's news articles
-      Object.entries(stockNewsData).forEach(([symbol, articles]) => {
-        if (Array.isArray(articles)) {
-          processedNewsBySymbol[symbol] = articles
-            .filter(article => article.title && article.source_name)
-            .map(article => ({
-              source: article.source_name,
-              title: article.title,
-              summary: article.description || "No summary available",
-              time: getRelativeTime(article.pubDate),
-              questions: article.questions || [] // Use questions from JSON data
-            }))
-            .slice(0, 3); // Limit to top 3 articles per symbol
-        }
+      Object.entries(data).forEach(([symbol, articles]) => {
+        processedNewsBySymbol[symbol] = articles
+          .filter(article => article.title && article.source)
+          .map(article => ({
+            source: article.source,
+            title: article.title,
+            summary: article.summary || "No summary available",
+            time: getRelativeTime(article.pubDate),
+            questions: article.questions
+          }));
       });
 
       setNewsData(processedNewsBySymbol);
     } catch (error) {
-      console.error('Error processing news data:', error);
+      console.error('Error fetching news data:', error);
     }
   };
 
   useEffect(() => {
     fetchStockData(initialSymbols);
-    fetchNewsData();
-    // Refresh stock data every minute
-    const interval = setInterval(() => {
-      fetchStockData(initialSymbols);
-    }, 60000);
-
-    return () => clearInterval(interval);
+    fetchNewsData(initialSymbols);
+    // The server pushes quotes as they change instead of us polling
+    const events = new EventSource(`http://localhost:8000/api/stream/stocks?symbols=${initialSymbols.join(',')}`);
+    events.addEventListener('quotes', (event) => {
+      const updates: Array<{ symbol: string }> = JSON.parse((event as MessageEvent).data);
+      setStocks(prevStocks => prevStocks.map(stock => {
+        const update = updates.find(quote => quote.symbol === stock.symbol);
+        return update ? { ...stock, ...update } : stock;
+      }));
+    });
+
+    return () => events.close();
   }, []);
 
   const handleAddSymbol = async (e: React.FormEvent) => {
@@ -0,0 +1,10 @@
+import os
+import tempfile
+
+# api.main reads these at import time: run it offline, without the background
+# scheduler, and keep its on-disk state out of the repository
+os.environ.setdefault("MARKET_DATA", "fake")
+os.environ.setdefault("NEWS_PROVIDER", "fake")
+os.environ.setdefault("EMBEDDER", "fake")
+os.environ.setdefault("REFRESH_SCHEDULER", "0")
+os.environ.setdefault("BAR_STORE_DIR", tempfile.mkdtemp(prefix="bars-"))
@@ -0,0 +1,63 @@
+import threading
+import time
+
+import pytest
+
+from api.cache import TTLCache
+
+
+def slow_loader(calls, value="v", delay=0.1):
+    def load():
+        calls.append(value)
+        time.sleep(delay)
+        return value
+    return load
+
+
+def test_concurrent_misses_load_once():
+    cache, calls = TTLCache({"info": 60}), []
+    threads = [threading.Thread(target=cache.get, args=("AAPL", "info", slow_loader(calls))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["v"]
+    assert cache.stats["coalesced"] == 4
+
+
+def test_refresh_joins_a_load_in_flight():
+    cache, calls = TTLCache({"info": 60}), []
+    getter = threading.Thread(target=cache.get, args=("AAPL", "info", slow_loader(calls, "from get")))
+    getter.start()
+    time.sleep(0.02)
+
+    assert cache.refresh("AAPL", "info", slow_loader(calls, "from refresh")) == "from get"
+    getter.join()
+    assert calls == ["from get"]
+
+
+def test_get_joins_a_refresh_in_flight():
+    cache, calls = TTLCache({"info": 60}), []
+    cache.put("AAPL", "info", "old")
+    refresher = threading.Thread(target=cache.refresh, args=("AAPL", "info", slow_loader(calls, "new")))
+    refresher.start()
+    time.sleep(0.02)
+    cache._entries["AAPL"]["info"] = ("old", time.monotonic() - 120)  # stale, so get() loads
+
+    assert cache.get("AAPL", "info", slow_loader(calls, "other")) == "new"
+    refresher.join()
+    assert calls == ["new"]
+
+
+def test_failed_refresh_keeps_the_cached_value():
+    cache = TTLCache({"info": 60})
+    cache.put("AAPL", "info", "old")
+
+    def fail():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        cache.refresh("AAPL", "info", fail)
+    assert cache.get("AAPL", "info", fail) == "old"
+    assert cache.stats["errors"] == 1
@@ -0,0 +1,108 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from api import main
+from api.conditional import SnapshotLog, encode, etag_matches, quote_delta
+
+
+def quote(symbol, price=10.0, last_bar=100, chart=(9.0, 10.0)):
+    return {"symbol": symbol, "name": symbol.title(), "price": price, "change": 0.0,
+            "lastBarTime": last_bar, "chartData": list(chart)}
+
+
+def test_encode_is_compact_and_etag_follows_the_bytes():
+    body, etag = encode({"b": 1, "a": [1, 2]})
+
+    assert body == b'{"b":1,"a":[1,2]}'
+    assert encode({"b": 1, "a": [1, 2]})[1] == etag
+    assert encode({"b": 1, "a": [1, 3]})[1] != etag
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ("", False),
+    ('"abc"', True),
+    ("abc", True),
+    ('W/"abc"', True),
+    ('"xyz", W/"abc"', True),
+    ('"xyz"', False),
+    ("*", True),
+])
+def test_etag_matches(header, expected):
+    assert etag_matches(header, "abc") is expected
+
+
+def test_snapshot_log_forgets_least_recently_used_versions():
+    log = SnapshotLog(maxsize=2)
+    log.record("v1", [quote("AAA")])
+    log.record("v2", [quote("BBB")])
+    log.get("v1")
+    log.record("v3", [quote("CCC")])
+
+    assert log.get("v2") is None
+    assert log.get("v1")["AAA"] == {"name": "Aaa", "price": 10.0, "change": 0.0, "lastBarTime": 100, "lastClose": 10.0}
+    assert log.get("v3") is not None
+
+
+def delta(previous_quotes, quotes):
+    log = SnapshotLog()
+    log.record("v", previous_quotes)
+    calls = []
+
+    def chart_tail(symbol, since_ts, until_ts):
+        calls.append((symbol, since_ts, until_ts))
+        return [1.0, 2.0]
+
+    changes, removed = quote_delta(log.get("v"), quotes, chart_tail)
+    return changes, removed, calls
+
+
+def test_unchanged_quotes_are_left_out():
+    assert delta([quote("AAA")], [quote("AAA")]) == ([], [], [])
+
+
+def test_new_and_removed_symbols():
+    changes, removed, _ = delta([quote("AAA"), quote("BBB")], [quote("AAA"), quote("CCC")])
+
+    assert changes == [quote("CCC")]
+    assert removed == ["BBB"]
+
+
+def test_scalar_changes_only_carry_the_changed_fields():
+    changes, _, calls = delta([quote("AAA")], [quote("AAA") | {"change": 1.5}])
+
+    assert changes == [{"symbol": "AAA", "change": 1.5}]
+    assert calls == []
+
+
+def test_new_bars_send_a_chart_tail_from_the_last_known_bar():
+    changes, _, calls = delta([quote("AAA")], [quote("AAA", price=11.0, last_bar=160, chart=(10.0, 11.0))])
+
+    assert changes == [{"symbol": "AAA", "price": 11.0, "chartTail": [1.0, 2.0]}]
+    assert calls == [("AAA", 100, 160)]
+
+
+def test_a_revised_last_bar_sends_a_chart_tail():
+    _, _, calls = delta([quote("AAA")], [quote("AAA", chart=(9.0, 10.5))])
+
+    assert calls == [("AAA", 100, 100)]
+
+
+def test_first_bars_send_the_whole_chart():
+    changes, _, _ = delta([quote("AAA", last_bar=None, chart=())], [quote("AAA")])
+
+    assert changes == [{"symbol": "AAA", "chartData": [9.0, 10.0]}]
+
+
+def test_stocks_endpoint_answers_304_and_deltas_by_version():
+    with TestClient(main.app) as client:
+        first = client.get("/api/stocks", params={"symbols": "ETAG1,ETAG2"})
+        version = first.headers["etag"]
+        again = client.get("/api/stocks", params={"symbols": "ETAG1,ETAG2"}, headers={"If-None-Match": version})
+        grown = client.get("/api/stocks", params={"symbols": "ETAG1,ETAG2,ETAG3", "since": version})
+
+    assert first.status_code == 200
+    assert again.status_code == 304
+    body = grown.json()
+    assert body["delta"] is True
+    assert [change["symbol"] for change in body["changes"]] == ["ETAG3"]
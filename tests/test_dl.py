@@ -0,0 +1,119 @@
+import gzip
+import json
+import threading
+from argparse import Namespace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import dl
+
+
+def article(n):
+    return {"article_id": f"a{n}", "title": f"Article {n}", "pubDate": f"2025-02-{n % 28 + 1:02d} 10:00:00"}
+
+
+class MockNewsData:
+    """A local stand-in for the NewsData latest endpoint: pages of page_size articles, newest first."""
+
+    def __init__(self, articles, page_size=2):
+        self.articles = articles
+        self.page_size = page_size
+        self.requests = []
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                mock.requests.append(params)
+                start = int(params.get("page", 0))
+                end = start + mock.page_size
+                body = json.dumps({
+                    "status": "success",
+                    "totalResults": len(mock.articles),
+                    "results": mock.articles[start:end],
+                    "nextPage": str(end) if end < len(mock.articles) else None,
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/api/1/latest"
+
+
+@pytest.fixture
+def newsdata():
+    mock = MockNewsData([article(n) for n in range(5)])
+    yield mock
+    mock.server.shutdown()
+
+
+def download(mock, data_dir, max_pages=10):
+    args = Namespace(api_key="test", base_url=mock.url, data_dir=str(data_dir), max_pages=max_pages, timeout=5)
+    (data_dir / ".checkpoints").mkdir(parents=True, exist_ok=True)
+    return dl.download_company("Apple", dl.make_session(1), dl.RateLimiter(0), args)
+
+
+def stored_ids(data_dir):
+    return [a["article_id"] for a in dl.read_articles(data_dir / "Apple.jsonl.gz")]
+
+
+def test_download_follows_pages_and_stops_when_nothing_is_new(newsdata, tmp_path):
+    assert download(newsdata, tmp_path) == 5
+    assert stored_ids(tmp_path) == ["a0", "a1", "a2", "a3", "a4"]
+    assert len(newsdata.requests) == 3
+
+    newsdata.requests.clear()
+    assert download(newsdata, tmp_path) == 0
+    assert len(newsdata.requests) == 1
+
+
+def test_download_resumes_from_checkpoint(newsdata, tmp_path):
+    assert download(newsdata, tmp_path, max_pages=1) == 2
+    newsdata.requests.clear()
+    assert download(newsdata, tmp_path) == 3
+    assert newsdata.requests[0]["page"] == "2"
+    assert stored_ids(tmp_path) == ["a0", "a1", "a2", "a3", "a4"]
+
+
+def test_download_trims_a_member_cut_short_by_a_killed_run(newsdata, tmp_path):
+    download(newsdata, tmp_path, max_pages=1)
+    output = tmp_path / "Apple.jsonl.gz"
+    member = gzip.compress(b"".join(json.dumps(article(n)).encode() + b"\n" for n in (2, 3)))
+    with open(output, "ab") as f:
+        f.write(member[:len(member) // 2])
+
+    assert stored_ids(tmp_path) == ["a0", "a1"]
+    assert download(newsdata, tmp_path) == 3
+    assert stored_ids(tmp_path) == ["a0", "a1", "a2", "a3", "a4"]
+
+
+def test_repair_without_checkpoint_keeps_the_readable_articles(tmp_path):
+    output = tmp_path / "Apple.jsonl.gz"
+    output.write_bytes(gzip.compress(b'{"article_id": "a0"}\n') + gzip.compress(b'{"article_id": "a1"}\n')[:12])
+
+    size = dl.repair(output, None)
+
+    assert size == output.stat().st_size
+    assert [a["article_id"] for a in dl.read_articles(output)] == ["a0"]
+    with gzip.open(output, "rb") as f:
+        f.read()  # no longer truncated
+
+
+def test_known_ids_skips_legacy_error_responses(tmp_path):
+    (tmp_path / "Twilio.json").write_text(json.dumps({
+        "status": "error",
+        "results": {"message": "API rate limit exceeded", "code": "RateLimitExceeded"},
+    }))
+    (tmp_path / "Apple.json").write_text(json.dumps({"status": "success", "results": [article(1), "junk", None]}))
+
+    assert dl.known_ids("Twilio", tmp_path) == set()
+    assert dl.known_ids("Apple", tmp_path) == {"a1"}
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from api.downsample import lttb, minmax
+
+
+def reference_lttb(x, y, n_out):
+    """The textbook loop, one bucket at a time."""
+    n = len(x)
+    every = (n - 2) / (n_out - 2)
+    selected, a = [0], 0
+    for i in range(n_out - 2):
+        lo, hi = int(i * every) + 1, int((i + 1) * every) + 1
+        next_lo, next_hi = hi, min(int((i + 2) * every) + 1, n)
+        avg_x, avg_y = np.mean(x[next_lo:next_hi]), np.mean(y[next_lo:next_hi])
+        areas = [abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a])) for j in range(lo, hi)]
+        a = lo + int(np.argmax(areas))
+        selected.append(a)
+    return selected + [n - 1]
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(0)
+    y = np.cumsum(rng.normal(size=1000))
+    return np.arange(1000, dtype=float), y
+
+
+@pytest.mark.parametrize("n_out", [3, 4, 50, 333, 999])
+def test_lttb_matches_the_reference_loop(series, n_out):
+    x, y = series
+
+    assert lttb(x, y, n_out).tolist() == reference_lttb(x, y, n_out)
+
+
+def test_lttb_keeps_the_endpoints_and_a_spike(series):
+    x, y = series
+    y = y.copy()
+    y[437] = 1000.0
+    picked = lttb(x, y, 40)
+
+    assert len(picked) == 40
+    assert picked[0] == 0 and picked[-1] == 999
+    assert 437 in picked
+    assert np.all(np.diff(picked) > 0)
+
+
+@pytest.mark.parametrize("n, n_out, expected", [(5, 10, [0, 1, 2, 3, 4]), (2, 1, [0, 1]), (10, 2, [0, 9]), (10, 1, [0]), (10, 0, [])])
+def test_lttb_small_inputs(n, n_out, expected):
+    x = np.arange(n, dtype=float)
+
+    assert lttb(x, x, n_out).tolist() == expected
+
+
+def test_minmax_keeps_every_bucket_extreme(series):
+    x, y = series
+    picked = minmax(x, y, 100)
+
+    assert len(picked) <= 100
+    assert np.all(np.diff(picked) > 0)
+    for lo, hi in zip(range(0, 1000, 20), range(20, 1020, 20)):
+        assert lo + np.argmin(y[lo:hi]) in picked
+        assert lo + np.argmax(y[lo:hi]) in picked
+
+
+def test_minmax_returns_everything_when_asked_for_more(series):
+    x, y = series
+
+    assert minmax(x[:10], y[:10], 20).tolist() == list(range(10))
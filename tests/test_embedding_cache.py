@@ -0,0 +1,51 @@
+import pytest
+from agno.document import Document
+
+from embedding_cache import CachedEmbedder, EmbeddingCache
+from fake_embedder import FakeEmbedder
+
+
+@pytest.fixture
+def embedder(tmp_path):
+    return CachedEmbedder(embedder=FakeEmbedder(), cache=EmbeddingCache(tmp_path / "embeddings.sqlite"), batch_size=2)
+
+
+def test_cold_batch_misses_and_batches_requests(embedder):
+    vectors = embedder.embed_batch(["a b", "c d", "e f"])
+
+    assert len(vectors) == 3
+    assert embedder.stats == {"hits": 0, "misses": 3, "api_calls": 2}
+
+
+def test_vector_store_re_embedding_a_batch_is_not_counted(embedder):
+    texts = ["a b", "c d", "e f"]
+    vectors = embedder.embed_batch(texts)
+    # PgVector.upsert calls Document.embed() for every document it writes
+    documents = [Document(content=text, embedder=embedder) for text in texts]
+    for document in documents:
+        document.embed()
+
+    assert [document.embedding for document in documents] == vectors
+    assert embedder.stats == {"hits": 0, "misses": 3, "api_calls": 2}
+
+
+def test_later_lookups_come_from_the_cache(embedder):
+    embedder.embed_batch(["a b"])
+    embedder.get_embedding("a b")
+    embedder.get_embedding("a b")
+
+    assert embedder.stats == {"hits": 1, "misses": 1, "api_calls": 1}
+
+
+def test_recent_vectors_are_bounded(embedder):
+    embedder.recent_size = 2
+    embedder.embed_batch(["a", "b", "c"])
+
+    assert len(embedder._recent) == 2
+
+
+def test_missing_vectors_raise(embedder, monkeypatch):
+    monkeypatch.setattr(embedder.embedder, "get_embeddings", lambda texts: [[] for _ in texts])
+
+    with pytest.raises(ValueError, match="No embedding returned"):
+        embedder.embed_batch(["a b"])
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from api import indicators, main
+from api.bar_store import BAR_DTYPE
+
+
+def bars(closes, start=1739800800, step=300):
+    out = np.zeros(len(closes), BAR_DTYPE)
+    out["ts"] = start + step * np.arange(len(closes))
+    out["open"] = out["high"] = out["low"] = out["close"] = closes
+    out["volume"] = 100
+    return out
+
+
+def test_compute_leaves_out_symbols_without_bars():
+    result = indicators.compute({"AAA": bars([10.0, 11.0, 12.0]), "ZZZZ": bars([])}, ["sma", "return"], window=2)
+
+    assert set(result) == {"AAA"}
+    assert result["AAA"]["sma"] == pytest.approx(11.5)
+    assert result["AAA"]["return"] == pytest.approx(0.2)
+
+
+def test_compute_without_any_bars_is_empty():
+    assert indicators.compute({"ZZZZ": bars([])}, ["vwap"], window=2) == {}
+
+
+def test_latest_session_of_empty_index():
+    assert len(indicators._latest_session(pd.DatetimeIndex([], tz="UTC"))) == 0
+
+
+def test_indicators_endpoint_reports_symbols_without_bars(monkeypatch):
+    real_history = main.market_data.history
+
+    def history(symbol, *args, **kwargs):
+        return pd.DataFrame() if symbol == "ZZZZ" else real_history(symbol, *args, **kwargs)
+
+    monkeypatch.setattr(main.market_data, "history", history)
+    with TestClient(main.app) as client:
+        response = client.get("/api/indicators", params={"symbols": "ZZZZ,IND1", "indicators": "sma"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["failed"] == [{"symbol": "ZZZZ", "error": "no bars"}]
+    assert set(body["results"]) == {"IND1"}
@@ -0,0 +1,107 @@
+import gzip
+import json
+import threading
+import time
+
+import pytest
+
+import stock_news_agent
+from embedding_cache import CachedEmbedder, EmbeddingCache
+from fake_embedder import FakeEmbedder
+from local_vectordb import LocalVectorDb
+from stock_news_agent import StockNewsKnowledge, get_table_name
+
+
+def write_news(path, stock, titles):
+    articles = [{"article_id": f"{stock}-{i}", "title": title, "description": ""} for i, title in enumerate(titles)]
+    path.write_text(json.dumps({stock: articles}))
+    return str(path)
+
+
+@pytest.fixture
+def knowledge(tmp_path):
+    embedder = CachedEmbedder(embedder=FakeEmbedder(), cache=EmbeddingCache(tmp_path / "embeddings.sqlite"))
+    news_files = [
+        write_news(tmp_path / "Apple.json", "AAPL", ["Apple ships a new iPhone", "Apple beats earnings"]),
+        write_news(tmp_path / "Exxon.json", "XOM", ["Exxon raises its dividend", "Oil prices lift Exxon"]),
+    ]
+    vector_dbs = [
+        LocalVectorDb(table_name=get_table_name(file), path=tmp_path / "vectors", embedder=embedder)
+        for file in news_files
+    ]
+    kb = StockNewsKnowledge(vector_dbs=vector_dbs, news_files=news_files, manifest_path=str(tmp_path / "manifest.json"))
+    kb.sync()
+    return kb
+
+
+def test_concurrent_searches_build_the_lexical_index_once(knowledge, monkeypatch):
+    builds = []
+    iter_documents = StockNewsKnowledge.iter_documents
+
+    def slow_counting(self, file_index=0):
+        builds.append(file_index)
+        time.sleep(0.05)  # long enough for every search to find the index missing
+        return iter_documents(self, file_index)
+
+    monkeypatch.setattr(StockNewsKnowledge, "iter_documents", slow_counting)
+    start = threading.Barrier(8)
+
+    def search():
+        start.wait()
+        knowledge.search("Apple earnings", num_documents=2)
+
+    threads = [threading.Thread(target=search) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(builds) == [0, 1]
+
+
+def test_prefilter_narrows_to_the_named_company(knowledge):
+    results = knowledge.search("Apple", num_documents=4)
+
+    assert {doc.meta_data["stock"] for doc in results} == {"AAPL"}
+
+
+def test_large_prefilter_falls_back_to_vector_search(knowledge, monkeypatch):
+    monkeypatch.setattr(stock_news_agent, "PREFILTER_MAX_IDS", 1)
+    seen_ids = []
+    search_table = StockNewsKnowledge._search_table
+
+    def recording(vector_db, embedding, limit, filters, ids=None):
+        seen_ids.append(ids)
+        return search_table(vector_db, embedding, limit, filters, ids)
+
+    monkeypatch.setattr(StockNewsKnowledge, "_search_table", staticmethod(recording))
+    results = knowledge.search("Apple", num_documents=4)
+
+    assert seen_ids == [None, None]
+    assert len(results) == 4
+
+
+def test_legacy_and_downloaded_files_share_a_source(tmp_path):
+    legacy = tmp_path / "Apple.json"
+    legacy.write_text(json.dumps({"status": "success", "results": [{"article_id": "old", "title": "Apple ships a new iPhone"}]}))
+    downloaded = tmp_path / "Apple.jsonl.gz"
+    with gzip.open(downloaded, "wt", encoding="utf-8") as f:
+        f.write(json.dumps({"article_id": "new", "title": "Apple beats earnings"}) + "\n")
+    news_files = [str(legacy), str(downloaded)]
+    assert get_table_name(news_files[0]) == get_table_name(news_files[1]) == "stock_news_apple"
+
+    embedder = CachedEmbedder(embedder=FakeEmbedder(), cache=EmbeddingCache(tmp_path / "embeddings.sqlite"))
+    vector_db = LocalVectorDb(table_name="stock_news_apple", path=tmp_path / "vectors", embedder=embedder)
+    kb = StockNewsKnowledge(vector_dbs=[vector_db, vector_db], news_files=news_files, manifest_path=str(tmp_path / "manifest.json"))
+    report = kb.sync()
+    assert list(report) == ["Apple"]
+    assert (report["Apple"]["upserted"], report["Apple"]["deleted"]) == (2, 0)
+
+    # Re-downloading rewrites only the .jsonl.gz; the legacy article must survive
+    with gzip.open(downloaded, "wt", encoding="utf-8") as f:
+        f.write(json.dumps({"article_id": "new", "title": "Apple beats earnings again"}) + "\n")
+    report = kb.sync()["Apple"]
+    assert (report["upserted"], report["deleted"], report["unchanged"]) == (1, 0, 1)
+
+    results = kb.search("iPhone earnings", num_documents=5, filters={"source_file": "Apple"}, prefilter=False)
+    assert sorted(doc.meta_data["title"] for doc in results) == ["Apple beats earnings again", "Apple ships a new iPhone"]
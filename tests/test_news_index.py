@@ -0,0 +1,70 @@
+import base64
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import main
+from api.news_index import NewsIndex, decode_cursor, encode_cursor
+
+
+def article(i):
+    return {"article_id": f"a{i:03d}", "title": f"Story {i}", "pubDate": f"2024-01-{1 + i // 10:02d} 0{i % 10}:00:00"}
+
+
+def write_legacy(path, articles):
+    path.write_text(json.dumps({"AAPL": articles}))
+
+
+def test_cursor_round_trips():
+    key = ("2024-01-02 03:04:05", "abc/+=?")
+
+    assert decode_cursor(encode_cursor(key)) == key
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    base64.urlsafe_b64encode(b"{not json").decode(),
+    encode_cursor(["only one"]),
+    encode_cursor([1, 2]),
+    base64.urlsafe_b64encode(b'{"a": "b"}').decode(),
+])
+def test_malformed_cursors_raise_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_pages_stay_consistent_while_articles_arrive(tmp_path):
+    legacy = tmp_path / "stock_news.json"
+    write_legacy(legacy, [article(i) for i in range(25)])
+    index = NewsIndex(tmp_path / "missing.db", legacy, check_interval=0)
+
+    first = index.query("aapl", limit=10)
+    write_legacy(legacy, [article(i) for i in range(30)])  # newer articles land between pages
+    seen = [item["id"] for item in first["items"]]
+    cursor = first["next_cursor"]
+    while cursor:
+        page = index.query("AAPL", cursor=cursor, limit=10)
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+
+    assert seen == [f"a{i:03d}" for i in range(24, -1, -1)]
+
+
+def test_since_and_until_bound_the_pages(tmp_path):
+    legacy = tmp_path / "stock_news.json"
+    write_legacy(legacy, [article(i) for i in range(25)])
+    index = NewsIndex(tmp_path / "missing.db", legacy, check_interval=0)
+
+    page = index.query("AAPL", since="2024-01-02", until="2024-01-02", limit=100)
+
+    assert [item["id"] for item in page["items"]] == [f"a{i:03d}" for i in range(19, 9, -1)]
+    assert page["next_cursor"] is None
+
+
+def test_a_bad_cursor_is_a_400():
+    with TestClient(main.app) as client:
+        response = client.get("/api/news/AAPL", params={"cursor": "garbage"})
+
+    assert response.status_code == 400
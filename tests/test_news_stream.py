@@ -0,0 +1,82 @@
+import functools
+import gzip
+import io
+import json
+
+import pytest
+
+import news_stream
+from news_stream import _JsonStream, iter_articles, source_name
+
+TRICKY = {
+    "AAPL": [
+        {"title": "Braces } and ] in \"quotes\"", "score": 12345678901234567890, "ratio": -1.5e-3},
+        {"title": "Unicode é中 \\u escapes", "questions": [], "nested": {"a": [1, {"b": None}]}},
+    ],
+    "MSFT": [],
+    "BAD": {"error": "not a list"},
+    "XOM": [{"title": "last", "n": 7}],
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 64, 1 << 16])
+def test_elements_survive_any_chunk_boundary(chunk_size):
+    stream = _JsonStream(io.StringIO(json.dumps(TRICKY, indent=1)), chunk_size=chunk_size)
+    parsed = {}
+    for key, value in stream.items():
+        parsed[key] = list(value.elements()) if value.peek() == "[" else value.value()
+
+    assert parsed == TRICKY
+
+
+def test_unconsumed_values_are_skipped():
+    stream = _JsonStream(io.StringIO(json.dumps(TRICKY)), chunk_size=5)
+
+    assert [key for key, _ in stream.items()] == ["AAPL", "MSFT", "BAD", "XOM"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1 << 16])
+def test_ticker_files(tmp_path, monkeypatch, chunk_size):
+    monkeypatch.setattr(news_stream, "_JsonStream", functools.partial(_JsonStream, chunk_size=chunk_size))
+    path = tmp_path / "stock_news.json"
+    path.write_text(json.dumps(TRICKY))
+
+    pairs = list(iter_articles(str(path)))
+
+    assert [stock for stock, _ in pairs] == ["AAPL", "AAPL", "BAD", "XOM"]
+    assert pairs[2] == ("BAD", None)
+    assert pairs[3] == ("XOM", {"title": "last", "n": 7})
+
+
+def test_newsdata_responses_are_attributed_to_the_file(tmp_path):
+    path = tmp_path / "Apple.json"
+    path.write_text(json.dumps({"status": "success", "totalResults": 2, "results": [{"title": "a"}, {"title": "b"}], "nextPage": None}))
+
+    assert list(iter_articles(str(path))) == [("Apple", {"title": "a"}), ("Apple", {"title": "b"})]
+
+
+def test_downloaded_jsonl_gz(tmp_path):
+    path = tmp_path / "Apple.jsonl.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(json.dumps({"title": "a"}) + "\n\n" + json.dumps({"title": "b"}) + "\n")
+
+    assert list(iter_articles(str(path))) == [("Apple", {"title": "a"}), ("Apple", {"title": "b"})]
+
+
+@pytest.mark.parametrize("text", ['{"AAPL": [{"title": "a"}', '{"AAPL": [1 2]}', '["not", "an", "object"]', ""])
+def test_malformed_files_raise_value_error(tmp_path, text):
+    path = tmp_path / "broken.json"
+    path.write_text(text)
+
+    with pytest.raises(ValueError):
+        list(iter_articles(str(path)))
+
+
+@pytest.mark.parametrize("path, expected", [
+    ("data/Apple.json", "Apple"),
+    ("data/Apple.jsonl", "Apple"),
+    ("data/Apple.jsonl.gz", "Apple"),
+    ("/x/Procter-Gamble.json", "Procter-Gamble"),
+])
+def test_source_name(path, expected):
+    assert source_name(path) == expected
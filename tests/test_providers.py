@@ -0,0 +1,22 @@
+import pytest
+
+from api.providers import FakeMarketData, FakeNewsSource, MarketData, NewsSource
+
+
+def test_incomplete_providers_fail_when_created():
+    class QuotesOnly(MarketData):
+        def info(self, symbol):
+            return {}
+
+    class NoPages(NewsSource):
+        pass
+
+    with pytest.raises(TypeError, match="history"):
+        QuotesOnly()
+    with pytest.raises(TypeError, match="fetch_page"):
+        NoPages()
+
+
+def test_fakes_implement_every_provider_method():
+    assert isinstance(FakeMarketData(), MarketData)
+    assert isinstance(FakeNewsSource(), NewsSource)
@@ -0,0 +1,57 @@
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from api import main
+
+
+def test_single_symbol_route_normalizes_the_symbol():
+    with TestClient(main.app) as client:
+        single = client.get("/api/stocks/ lowq1 ")
+        hits = main.quote_cache.stats["hits"]
+        multi = client.get("/api/stocks", params={"symbols": "LOWQ1"})
+
+    assert single.json()["symbol"] == "LOWQ1"
+    assert multi.json()["results"][0]["symbol"] == "LOWQ1"
+    assert main.quote_cache.stats["hits"] > hits  # served from the entries the first request filled
+
+
+def test_only_symbols_with_data_are_kept_warm(monkeypatch):
+    real_history = main.market_data.history
+
+    def history(symbol, *args, **kwargs):
+        if symbol == "BROKEN":
+            raise RuntimeError("upstream down")
+        return pd.DataFrame() if symbol == "NOSUCH" else real_history(symbol, *args, **kwargs)
+
+    monkeypatch.setattr(main.market_data, "history", history)
+    with TestClient(main.app) as client:
+        client.get("/api/stocks/nosuch")
+        client.get("/api/stocks/BROKEN")
+        client.get("/api/stocks", params={"symbols": "warm1,NOSUCH"})
+
+    assert "WARM1" in main.refresh_scheduler._requested
+    assert not {"NOSUCH", "nosuch", "BROKEN"} & set(main.refresh_scheduler._requested)
+
+
+def test_too_many_symbols_is_a_400():
+    symbols = ",".join(f"S{i}" for i in range(main.MAX_SYMBOLS + 1))
+    with TestClient(main.app) as client:
+        response = client.get("/api/stocks", params={"symbols": symbols})
+
+    assert response.status_code == 400
+    assert str(main.MAX_SYMBOLS) in response.json()["detail"]
+
+
+def test_parse_symbols_dedupes_and_normalizes():
+    assert main.parse_symbols(" aapl,MSFT,,AAPL ,msft") == ["AAPL", "MSFT"]
+
+
+def test_slow_requests_are_logged_with_their_stacks(monkeypatch, tmp_path, caplog):
+    monkeypatch.setattr(main, "PROFILE_THRESHOLD", 0.0)
+    monkeypatch.setattr(main, "PROFILE_DIR", tmp_path)
+    with caplog.at_level("WARNING", logger="api.main"), TestClient(main.app) as client:
+        client.get("/api/stocks/SLOW1")
+
+    [record] = [r for r in caplog.records if r.name == "api.main"]
+    assert record.getMessage().startswith("Slow request GET /api/stocks/SLOW1 took ")
+    assert list(tmp_path.glob("*.folded"))
@@ -0,0 +1,59 @@
+import asyncio
+
+from api.rate_limit import TokenBucket
+from api.scheduler import RefreshPolicy, RefreshScheduler
+
+
+def make_scheduler(policy=None, **kwargs):
+    async def job(symbol):
+        pass
+
+    return RefreshScheduler(
+        {"quote": job, "news": job}, policy or RefreshPolicy(), TokenBucket(1000, 1000), **kwargs
+    )
+
+
+def test_news_jobs_only_for_pinned_symbols():
+    scheduler = make_scheduler(pinned_only={"news"})
+    scheduler.pin("news", ["aapl"])
+    scheduler.touch(["msft"])
+    scheduler._plan()
+
+    assert sorted(scheduler._due) == [("AAPL", "news"), ("MSFT", "quote")]
+
+
+def test_touching_warm_symbols_does_not_replan():
+    calls = []
+    policy = RefreshPolicy(volatility=lambda symbol: calls.append(symbol))
+    scheduler = make_scheduler(policy, pinned_only={"news"})
+    scheduler.touch(["AAA", "BBB"])
+    scheduler._plan()
+    planned, calls[:] = scheduler._planned, []
+
+    scheduler.touch(["AAA"])
+    assert not scheduler._arrived
+    assert scheduler._planned == planned
+
+    scheduler.touch(["CCC"])
+    scheduler._add_arrived()
+    assert calls == ["CCC"]
+    assert ("CCC", "quote") in scheduler._due
+    assert ("CCC", "news") not in scheduler._due
+
+
+def test_new_symbols_run_without_waiting_for_the_next_plan():
+    ran = []
+
+    async def job(symbol):
+        ran.append(symbol)
+
+    async def main():
+        scheduler = RefreshScheduler({"quote": job}, RefreshPolicy(), TokenBucket(1000, 1000), plan_every=60)
+        scheduler.start()
+        await asyncio.sleep(0.05)
+        scheduler.touch(["NEW"])
+        await asyncio.sleep(0.1)
+        await scheduler.stop()
+
+    asyncio.run(main())
+    assert ran == ["NEW"]
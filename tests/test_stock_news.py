@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from api.providers import FakeNewsSource, FakeQuestionModel
+from api.stock_news import StockNewsAPI
+
+
+@pytest.fixture
+def news_api(tmp_path):
+    return StockNewsAPI(
+        stocks=["AAPL", "MSFT"],
+        news_source=FakeNewsSource(10),
+        question_model=FakeQuestionModel(),
+        newsdata_limit=(10 ** 9, 1),
+        gemini_limit=(10 ** 9, 1),
+        store_path=tmp_path / "news.sqlite",
+        question_cache_path=tmp_path / "questions.sqlite",
+    )
+
+
+def test_ingest_stores_relevant_articles(news_api):
+    stored = asyncio.run(news_api.ingest())
+
+    assert {stock: len(articles) for stock, articles in stored.items()} == {"AAPL": 10, "MSFT": 10}
+    assert asyncio.run(news_api.ingest()) == {"AAPL": [], "MSFT": []}
+
+
+def test_failed_ingest_leaves_no_tasks_behind(news_api, monkeypatch):
+    def fail(items):
+        raise RuntimeError("store down")
+
+    monkeypatch.setattr(news_api.store, "add", lambda stock, articles: fail(articles))
+
+    async def main():
+        with pytest.raises(RuntimeError, match="store down"):
+            await news_api.ingest()
+        await asyncio.sleep(0)
+        return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    assert asyncio.run(main()) == []
+
+
+def test_relevance_keeps_no_per_article_state(news_api):
+    mentions = {"title": "Apple (AAPL) beats estimates", "description": "Microsoft was flat."}
+
+    assert news_api.is_relevant("AAPL", mentions)
+    assert news_api.is_relevant("msft", mentions)
+    assert not news_api.is_relevant("AAPL", {"title": "apple pie recipes", "description": None})
+    assert not hasattr(news_api, "entity_index")